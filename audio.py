@@ -0,0 +1,146 @@
+import _thread
+from array import array
+from time import sleep_ms, ticks_ms, ticks_add, ticks_diff
+
+import scheduler
+
+NOTE_QUEUE_SIZE = 16  # must be a power of 2
+AUDIO_IDLE_POLL_MS = 5
+AUDIO_SLICE_MS = 5  # a playing note checks this often whether it was cut off
+MAX_COALESCED_NOTE_MS = 1000
+
+BUZZ_DEFAULT_DUTY = 512
+
+# melodies are flat (freq_hz, duty, duration_ms) triplets, a 0 Hz note is a rest.
+# the frequencies are the equal-tempered notes rounded to whole Hz
+MELODY_SUCCESS = array('H', [
+    262, 256, 100,  # C4 - short, soft note for anticipation
+    330, 256, 125,  # E4 - rising notes, longer for a sense of accomplishment
+    392, 256, 150,  # G4
+    523, 204, 200,  # C5 - longest
+])
+
+MELODY_FAILURE = array('H', [
+    277, 307, 200,  # C#4 - softer, longer
+    0, 0, 50,
+    262, 256, 150,  # C4 - softer, shorter
+    0, 0, 100,  # pause for emphasis
+    233, 358, 250,  # B3 - slightly louder, longer
+])
+
+MELODY_GAME_OVER = array('H', [
+    392, 307, 300,  # G4 - longer, slightly loud
+    330, 256, 200,  # E4 - medium, softer
+    262, 204, 500,  # C4 - longest, softest
+])
+
+
+class AudioSequencer:
+    # a single long lived worker owns the buzzer pwm and plays notes from a bounded queue,
+    # so callers never block on sound and never spawn threads. the worker is either a thread
+    # (start()) or a scheduler task (run_async())
+
+    def __init__(self, pwm, queue_size=NOTE_QUEUE_SIZE):
+        self.pwm = pwm
+        self.lock = _thread.allocate_lock()
+        self.freqs = array('H', [0] * queue_size)
+        self.duties = array('H', [0] * queue_size)
+        self.durations = array('H', [0] * queue_size)
+        self.mask = queue_size - 1
+        self.head = 0
+        self.tail = 0
+        self.generation = 0  # bumped on every cut off, stops the note being played
+        self.note_generation = 0
+        self.note_end_tick = 0
+        self.dropped = 0
+        self.running = False
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            _thread.start_new_thread(self.run, ())
+
+    def _push(self, freq, duty, duration_ms):
+        # caller holds the lock
+        head = self.head
+        next_head = (head + 1) & self.mask
+        if next_head == self.tail:
+            self.dropped += 1
+            return
+        self.freqs[head] = freq
+        self.duties[head] = duty
+        self.durations[head] = duration_ms
+        self.head = next_head
+
+    def _cut_off(self):
+        # caller holds the lock
+        self.tail = self.head
+        self.generation += 1
+
+    def beep(self, duration_ms, frequency, volume=BUZZ_DEFAULT_DUTY, cut_off=False):
+        self.lock.acquire()
+        if cut_off:
+            self._cut_off()
+        last = (self.head - 1) & self.mask
+        if self.head != self.tail and self.freqs[last] == frequency and self.duties[last] == volume:
+            # same tone still waiting to be played - just make it longer
+            self.durations[last] = min(self.durations[last] + duration_ms, MAX_COALESCED_NOTE_MS)
+        else:
+            self._push(frequency, volume, duration_ms)
+        self.lock.release()
+
+    def play(self, melody, cut_off=True):
+        self.lock.acquire()
+        if cut_off:
+            self._cut_off()
+        for i in range(0, len(melody), 3):
+            self._push(melody[i], melody[i + 1], melody[i + 2])
+        self.lock.release()
+
+    def stop(self):
+        self.lock.acquire()
+        self._cut_off()
+        self.lock.release()
+
+    def _take_note(self):
+        # pops the next note and starts playing it, returns its duration or -1 if there is none
+        self.lock.acquire()
+        if self.head == self.tail:
+            self.lock.release()
+            return -1
+        tail = self.tail
+        freq = self.freqs[tail]
+        duty = self.duties[tail]
+        duration_ms = self.durations[tail]
+        self.note_generation = self.generation
+        self.tail = (tail + 1) & self.mask
+        self.lock.release()
+
+        if freq:
+            self.pwm.freq(freq)
+            self.pwm.duty(duty)
+        self.note_end_tick = ticks_add(ticks_ms(), duration_ms)
+        return duration_ms
+
+    def run(self):
+        while self.running:
+            remaining = self._take_note()
+            if remaining < 0:
+                sleep_ms(AUDIO_IDLE_POLL_MS)
+                continue
+            while remaining > 0 and self.note_generation == self.generation:
+                sleep_ms(min(remaining, AUDIO_SLICE_MS))
+                remaining = ticks_diff(self.note_end_tick, ticks_ms())
+            self.pwm.duty(0)
+
+    async def run_async(self):
+        self.running = True
+        while self.running:
+            remaining = self._take_note()
+            if remaining < 0:
+                await scheduler.sleep_ms(AUDIO_IDLE_POLL_MS)
+                continue
+            while remaining > 0 and self.note_generation == self.generation:
+                await scheduler.sleep_ms(min(remaining, AUDIO_SLICE_MS))
+                remaining = ticks_diff(self.note_end_tick, ticks_ms())
+            self.pwm.duty(0)
@@ -0,0 +1,91 @@
+# what typical frames cost on each display bus, on the host simulator with its bus time model:
+#   python bench/bench_display_bus.py [--bus-khz 400] [--frames 200]
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import sim  # noqa: E402
+from sim import machine  # noqa: E402
+
+WIDTH = 128
+HEIGHT = 64
+
+
+def make_buses():
+    from display_bus import I2CBus, SPIBus, MemoryBus
+    from machine import Pin, I2C, SoftI2C, SPI
+    import settings
+
+    soft_i2c = SoftI2C(scl=Pin(settings.DISPLAY_SCL_PIN), sda=Pin(settings.DISPLAY_SDA_PIN))
+    i2c = I2C(settings.DISPLAY_I2C_ID, scl=Pin(settings.DISPLAY_SCL_PIN), sda=Pin(settings.DISPLAY_SDA_PIN))
+    spi = SPI(settings.DISPLAY_SPI_ID)
+    return (I2CBus(soft_i2c, name='soft i2c'),
+            I2CBus(i2c, name='i2c'),
+            SPIBus(spi, Pin(settings.DISPLAY_DC_PIN), Pin(settings.DISPLAY_CS_PIN), Pin(settings.DISPLAY_RES_PIN)),
+            MemoryBus(WIDTH, HEIGHT // 8))
+
+
+def draw_letter(display, rng):
+    # a glyph typed into the code line
+    display.fill_rect(rng.randrange(WIDTH - 8), 24, 8, 8, rng.randrange(2))
+
+
+def draw_column(display, rng):
+    # something tall moving, a little on every page
+    display.vline(rng.randrange(WIDTH), 0, HEIGHT, rng.randrange(2))
+
+
+def draw_scatter(display, rng):
+    # a few pixels on pages far apart, the pages each get their own window
+    for _ in range(4):
+        display.pixel(rng.randrange(WIDTH), rng.randrange(HEIGHT), 1)
+    display.pixel(rng.randrange(WIDTH), rng.randrange(HEIGHT), 0)
+
+
+def draw_screen(display, rng):
+    # a new screen, every byte changes
+    display.fill(rng.randrange(2))
+    display.text('{:04}'.format(rng.randrange(10000)), rng.randrange(WIDTH - 32), rng.randrange(HEIGHT - 8), 2)
+
+
+FRAMES = (('letter', draw_letter), ('column', draw_column), ('scatter', draw_scatter), ('screen', draw_screen))
+
+
+def bench(clock, display, bus, draw, frames):
+    rng = random.Random(1)
+    display.fill(0)
+    display.show()
+    bus.reset_counters()
+    start_us = clock.now_us
+    for _ in range(frames):
+        draw(display, rng)
+        display.show()
+    return bus.transactions / frames, bus.bytes / frames, (clock.now_us - start_us) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description='frame cost on every display bus')
+    parser.add_argument('--bus-khz', type=int, default=400)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    clock = sim.install()
+    machine.bus_hz = args.bus_khz * 1000
+    from oled import DirtyPageDisplay
+
+    print('{:>10} {:>10} {:>14} {:>10} {:>10}'.format('bus', 'frame', 'transactions', 'bytes', 'bus us'))
+    for bus in make_buses():
+        display = DirtyPageDisplay(WIDTH, HEIGHT, bus)
+        for name, draw in FRAMES:
+            transactions, wire_bytes, bus_us = bench(clock, display, bus, draw, args.frames)
+            print('{:>10} {:>10} {:>14.1f} {:>10.1f} {:>10.0f}'.format(bus.name, name, transactions, wire_bytes,
+                                                                        bus_us))
+    machine.bus_hz = 0
+    sim.uninstall()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# free keying decode cost per symbol, the decoder's tree against a reverse dict of the code strings:
+#   python bench/bench_morse_decode.py [characters]
+# on the host the decoder's method calls cost more than a string append does. on the board the
+# string building allocates on every symbol and the tree walk never does
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from morse_code import MORSE_LETTERS, MORSE_DIGITS, MORSE_PUNCTUATION, LONG_SYMBOL, SHORT_SYMBOL  # noqa: E402
+from morse_decoder import MorseDecoder, UNKNOWN_CHAR, UNKNOWN_ORD, DECODER_TEXT_SIZE, ROOT_NODE, \
+    decode_node  # noqa: E402
+
+DEFAULT_CHARACTERS = 100000
+ROUNDS = 5
+
+# the keyed stream as the classifier's events would give it
+DOT = 0
+DASH = 1
+LETTER_END = 2
+WORD_END = 3
+
+
+def morse_table():
+    table = dict(MORSE_LETTERS)
+    table.update(MORSE_DIGITS)
+    table.update(MORSE_PUNCTUATION)
+    return table
+
+
+def keyed_stream(table, characters):
+    rng = random.Random(1)
+    chars = sorted(table)
+    stream = []
+    text = []
+    for _ in range(characters):
+        if text and text[-1] != ' ' and rng.random() < 0.15:
+            stream.append(WORD_END)
+            text.append(' ')
+            continue
+        char = rng.choice(chars)
+        for symbol in table[char]:
+            stream.append(DASH if symbol == LONG_SYMBOL else DOT)
+        stream.append(LETTER_END)
+        text.append(char)
+    return stream, ''.join(text)
+
+
+def decode_tree(stream):
+    decoder = MorseDecoder()
+    out = []
+    for event in stream:
+        if event == DOT:
+            decoder.symbol(SHORT_SYMBOL)
+        elif event == DASH:
+            decoder.symbol(LONG_SYMBOL)
+        elif event == LETTER_END:
+            decoder.letter_end()
+            out.append(decoder.char_at(decoder.count - 1))
+        else:
+            decoder.word_end()
+            out.append(decoder.char_at(decoder.count - 1))
+    return bytes(out).decode()
+
+
+def decode_tree_inline(stream):
+    # the same tree walk without the decoder's method calls, what the step itself costs
+    node = ROOT_NODE
+    out = bytearray()
+    for event in stream:
+        if event <= DASH:
+            node = node << 1 | event
+        elif event == LETTER_END:
+            out.append(decode_node(node) or UNKNOWN_ORD)
+            node = ROOT_NODE
+        else:
+            out.append(32)
+    return out.decode()
+
+
+def decode_reverse_dict(stream, reverse):
+    # the naive way: build the code string symbol by symbol, look it up at the letter end
+    code = ''
+    out = []
+    for event in stream:
+        if event == DOT:
+            code += SHORT_SYMBOL
+        elif event == DASH:
+            code += LONG_SYMBOL
+        elif event == LETTER_END:
+            out.append(reverse.get(code, UNKNOWN_CHAR))
+            code = ''
+        else:
+            out.append(' ')
+    return ''.join(out)
+
+
+def best_us(decode, stream):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        text = decode(stream)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return text, best * 1000000
+
+
+def main():
+    characters = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHARACTERS
+    table = morse_table()
+    reverse = {code: char for char, code in table.items()}
+    stream, text = keyed_stream(table, characters)
+    symbols = sum(1 for event in stream if event <= DASH)
+
+    tree_text, tree_us = best_us(decode_tree, stream)
+    inline_text, inline_us = best_us(decode_tree_inline, stream)
+    dict_text, dict_us = best_us(lambda s: decode_reverse_dict(s, reverse), stream)
+    if tree_text != text or inline_text != text or dict_text != text:
+        sys.exit('decoded text differs from the keyed one')
+
+    print('{} characters, {} symbols, {} events, {} byte text ring'.format(characters, symbols, len(stream),
+                                                                            DECODER_TEXT_SIZE))
+    print('{:>14} {:>12} {:>12}'.format('', 'us/event', 'us/char'))
+    for name, us in (('decoder', tree_us), ('tree inline', inline_us), ('reverse dict', dict_us)):
+        print('{:>14} {:>12.3f} {:>12.3f}'.format(name, us / len(stream), us / characters))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# open answer check cost per symbol as the word bank grows, the morse trie against rescanning the
+# candidate words at every symbol:
+#   python bench/bench_morse_trie.py [answers]
+# the trie's step is two array lookups whatever the bank's size, the rescan goes through every word
+# still possible - the whole bank at the first symbol
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from morse_code import translate_to_morse  # noqa: E402
+from morse_trie import MorseTrie, ROOT_NODE, NO_NODE  # noqa: E402
+
+BANK_SIZES = (1000, 10000, 100000)
+DEFAULT_ANSWERS = 2000
+RESCAN_MAX_BANK = 10000  # the rescan takes minutes past this
+
+
+def random_words(count):
+    rng = random.Random(count)
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))))
+    return sorted(words)
+
+
+def answers(words, count):
+    # half are words of the bank, half are keyed wrong somewhere
+    rng = random.Random(1)
+    codes = []
+    for i in range(count):
+        code = translate_to_morse(rng.choice(words))
+        if i & 1:
+            pos = rng.randrange(len(code))
+            code = code[:pos] + rng.choice('.- ') + code[pos:]
+        codes.append(code)
+    return codes
+
+
+def check_trie(trie, codes):
+    # symbols looked at and the answers that were words
+    symbols = 0
+    right = 0
+    for code in codes:
+        node = ROOT_NODE
+        for symbol in code:
+            symbols += 1
+            node = trie.child(node, symbol)
+            if node == NO_NODE:
+                break
+        if node != NO_NODE and trie.is_word(node):
+            right += 1
+    return symbols, right
+
+
+def check_rescan(bank_codes, codes):
+    symbols = 0
+    right = 0
+    for code in codes:
+        candidates = bank_codes
+        for i in range(len(code)):
+            symbols += 1
+            prefix = code[:i + 1]
+            candidates = [c for c in candidates if c.startswith(prefix)]
+            if not candidates:
+                break
+        if candidates and code in candidates:
+            right += 1
+    return symbols, right
+
+
+def bench(size, answer_count, tmp_dir):
+    words = random_words(size)
+    bank_codes = [translate_to_morse(word) for word in words]
+    codes = answers(words, answer_count)
+
+    start = time.perf_counter()
+    trie = MorseTrie.build(bank_codes)
+    build_ms = (time.perf_counter() - start) * 1000
+    path = os.path.join(tmp_dir, 'trie_{}.bin'.format(size))
+    with open(path, 'wb') as f:
+        trie.write(f)
+    start = time.perf_counter()
+    trie = MorseTrie.load(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    symbols, right = check_trie(trie, codes)
+    trie_us = (time.perf_counter() - start) * 1000000 / symbols
+
+    rescan_us = None
+    if size <= RESCAN_MAX_BANK:
+        start = time.perf_counter()
+        rescan_symbols, rescan_right = check_rescan(bank_codes, codes)
+        rescan_us = (time.perf_counter() - start) * 1000000 / rescan_symbols
+        if (rescan_symbols, rescan_right) != (symbols, right):
+            sys.exit('the trie and the rescan disagree')
+    return len(trie), os.path.getsize(path), build_ms, load_ms, trie_us, rescan_us
+
+
+def main():
+    answer_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ANSWERS
+    print('{} answers per bank, half of them wrong'.format(answer_count))
+    print('{:>8} {:>8} {:>9} {:>10} {:>9} {:>14} {:>14}'.format('words', 'nodes', 'bytes', 'build ms', 'load ms',
+                                                               'trie us/sym', 'rescan us/sym'))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in BANK_SIZES:
+            nodes, size_bytes, build_ms, load_ms, trie_us, rescan_us = bench(size, answer_count, tmp_dir)
+            print('{:>8} {:>8} {:>9} {:>10.1f} {:>9.2f} {:>14.3f} {:>14}'.format(
+                size, nodes, size_bytes, build_ms, load_ms, trie_us,
+                '-' if rescan_us is None else '{:.3f}'.format(rescan_us)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# selection cost and heap use of the on-flash word dictionary as it grows:
+#   python bench/bench_word_dict.py [picks]
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from word_dict import WordDict, write_word_dict, DIFFICULTY_EASY, DIFFICULTY_HARD  # noqa: E402
+
+DICT_SIZES = (1000, 10000, 100000, 1000000)
+DEFAULT_PICKS = 20000
+
+
+def random_words(count, min_len, max_len):
+    rng = random.Random(count)
+    return [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+            for _ in range(count)]
+
+
+def bench(size, picks, tmp_dir):
+    path = os.path.join(tmp_dir, 'words_{}.bin'.format(size))
+    with open(path, 'wb') as f:
+        write_word_dict(f, {DIFFICULTY_EASY: random_words(size // 2, 3, 4),
+                            DIFFICULTY_HARD: random_words(size - size // 2, 5, 9)})
+
+    tracemalloc.start()
+    word_dict = WordDict(path)
+    heap_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(picks):
+        word_dict.random_word(DIFFICULTY_HARD)
+    pick_us = (time.perf_counter() - start) * 1000000 / picks
+    word_dict.close()
+    return os.path.getsize(path), heap_bytes, pick_us
+
+
+def main():
+    picks = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PICKS
+    print('{:>10} {:>12} {:>10} {:>10}'.format('words', 'file bytes', 'heap', 'pick us'))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in DICT_SIZES:
+            file_bytes, heap_bytes, pick_us = bench(size, picks, tmp_dir)
+            print('{:>10} {:>12} {:>10} {:>10.2f}'.format(size, file_bytes, heap_bytes, pick_us))
+
+
+if __name__ == '__main__':
+    main()
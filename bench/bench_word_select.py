@@ -0,0 +1,76 @@
+# adaptive word selection cost as the word bank grows, against rescoring every word per pick:
+#   python bench/bench_word_select.py [picks]
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from word_select import AdaptiveSampler, letter_weights, distinct_letters  # noqa: E402
+from stats_store import STATS_LETTERS  # noqa: E402
+
+BANK_SIZES = (1000, 10000, 100000, 1000000)
+DEFAULT_PICKS = 20000
+RESCORE_PICKS = 20
+
+
+def random_words(count, min_len, max_len):
+    rng = random.Random(count)
+    return [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+            for _ in range(count)]
+
+
+def rescore_pick(words, weights):
+    # the naive way: score every word, then one weighted pick
+    scores = []
+    for word in words:
+        scores.append(sum(weights[letter] for letter in distinct_letters(word)))
+    return random.choices(range(len(words)), scores)[0]
+
+
+def bench(size, picks):
+    words = random_words(size, 3, 9)
+    rng = random.Random(1)
+    hits = [rng.randrange(50) for _ in range(STATS_LETTERS)]
+    misses = [rng.randrange(10) for _ in range(STATS_LETTERS)]
+    weights = letter_weights(hits, misses)
+
+    start = time.perf_counter()
+    sampler = AdaptiveSampler(words, weights)
+    build_ms = (time.perf_counter() - start) * 1000
+    # what the sampler keeps, the word list itself isn't counted
+    heap_bytes = sys.getsizeof(sampler.postings) + sys.getsizeof(sampler.offsets) + sys.getsizeof(sampler.tree.tree)
+
+    start = time.perf_counter()
+    for _ in range(picks):
+        sampler.sample()
+    pick_us = (time.perf_counter() - start) * 1000000 / picks
+
+    start = time.perf_counter()
+    for i in range(picks):
+        weights[i % STATS_LETTERS] = 8 + i % 200
+        sampler.update_letter(i % STATS_LETTERS)
+    update_us = (time.perf_counter() - start) * 1000000 / picks
+
+    rescore_picks = max(1, RESCORE_PICKS * 1000 // size)
+    start = time.perf_counter()
+    for _ in range(rescore_picks):
+        rescore_pick(words, weights)
+    rescore_us = (time.perf_counter() - start) * 1000000 / rescore_picks
+    return build_ms, heap_bytes, pick_us, update_us, rescore_us
+
+
+def main():
+    picks = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PICKS
+    print('{:>10} {:>10} {:>10} {:>10} {:>10} {:>12}'.format('words', 'build ms', 'heap', 'pick us', 'update us',
+                                                             'rescore us'))
+    for size in BANK_SIZES:
+        build_ms, heap_bytes, pick_us, update_us, rescore_us = bench(size, picks)
+        print('{:>10} {:>10.1f} {:>10} {:>10.2f} {:>10.2f} {:>12.0f}'.format(size, build_ms, heap_bytes, pick_us,
+                                                                              update_us, rescore_us))
+
+
+if __name__ == '__main__':
+    main()
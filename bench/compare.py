@@ -0,0 +1,31 @@
+# compares two benchmark runs from a results file (default: the last two):
+#   python bench/compare.py bench_results.json [old_index new_index]
+import json
+import sys
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'bench_results.json'
+    with open(path) as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    old_idx, new_idx = (int(sys.argv[2]), int(sys.argv[3])) if len(sys.argv) > 3 else (-2, -1)
+    old, new = runs[old_idx], runs[new_idx]
+    old_results = {r['name']: r for r in old['results']}
+
+    print('{} ({}) -> {} ({})'.format(old['label'] or old_idx, old['platform'], new['label'] or new_idx,
+                                      new['platform']))
+    print('{:<32} {:>12} {:>12} {:>8} {:>10}'.format('benchmark', 'old us', 'new us', 'change', 'alloc B'))
+    for result in new['results']:
+        before = old_results.get(result['name'])
+        if before is None:
+            print('{:<32} {:>12} {:>12.1f}'.format(result['name'], '-', result['us_per_op']))
+            continue
+        change = (result['us_per_op'] - before['us_per_op']) * 100 / before['us_per_op']
+        alloc = result['alloc_bytes_per_op']
+        print('{:<32} {:>12.1f} {:>12.1f} {:>+7.1f}% {:>10}'.format(
+            result['name'], before['us_per_op'], result['us_per_op'], change,
+            '-' if alloc is None else '{:.0f}'.format(alloc)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+# runs the benchmark suite on a host against the simulated display:
+#   python bench/run_host.py [--label my-change] [--out bench_results.json]
+import argparse
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+import sim  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='run the benchmark suite on the host simulator')
+    parser.add_argument('--label', default='')
+    parser.add_argument('--out', default='bench_results.json')
+    args = parser.parse_args()
+    out = os.path.abspath(args.out)
+
+    # the game keeps its stats file in the working directory
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        sim.install()
+        sim.load_main()
+        sys.path.insert(0, BENCH_DIR)
+        import suite
+
+        suite.main(out, args.label)
+    sim.uninstall()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+# benchmarks of the rendering, encoding and game engine hot paths. runs on the board under
+# micropython (copy this file next to the game modules, then `import suite; suite.main()`) and on a host
+# against the simulated display (python bench/run_host.py). results are appended to a json file
+# as one line per run, compare two runs with bench/compare.py
+import gc
+import json
+import sys
+import time
+
+try:
+    from time import perf_counter  # a host, where time.ticks_us() is the simulator's virtual clock
+
+    def now_us():
+        return int(perf_counter() * 1000000)
+
+    def elapsed_us(start_us):
+        return now_us() - start_us
+except ImportError:
+    from time import ticks_us as now_us
+
+    def elapsed_us(start_us):
+        return time.ticks_diff(now_us(), start_us)
+
+import game
+import render
+from engine import GameEngine
+from morse_code import translate_to_morse, code_pixel_count, code_x_position
+
+BENCH_RESULTS_FILE_NAME = 'bench_results.json'
+BENCH_MIN_TIME_US = 200000
+BENCH_MAX_ROUNDS = 2000
+CIRCLE_RADII = (1, 5, 10, 20)
+BENCH_WORD = 'hello'
+
+
+def mem_alloc():
+    try:
+        return gc.mem_alloc()
+    except AttributeError:
+        return None
+
+
+class CountingDisplay:
+    # forwards to the real display and counts drawing primitives and the pixels they cover
+    def __init__(self, display):
+        self.display = display
+        self.primitives = 0
+        self.pixels = 0
+
+    def __getattr__(self, name):
+        return getattr(self.display, name)
+
+    def _count(self, pixels):
+        self.primitives += 1
+        self.pixels += pixels
+
+    def fill(self, c):
+        self._count(self.display.width * self.display.height)
+        self.display.fill(c)
+
+    def pixel(self, x, y, c=None):
+        if c is None:
+            return self.display.pixel(x, y)
+        self._count(1)
+        self.display.pixel(x, y, c)
+
+    def hline(self, x, y, w, c):
+        self._count(abs(w))
+        self.display.hline(x, y, w, c)
+
+    def vline(self, x, y, h, c):
+        self._count(abs(h))
+        self.display.vline(x, y, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        self._count(max(abs(x2 - x1), abs(y2 - y1)) + 1)
+        self.display.line(x1, y1, x2, y2, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        self._count(w * h if f else 2 * (w + h))
+        self.display.rect(x, y, w, h, c, f)
+
+    def fill_rect(self, x, y, w, h, c):
+        self._count(abs(w * h))
+        self.display.fill_rect(x, y, w, h, c)
+
+    def text(self, s, x, y, c=1):
+        self._count(len(s) * 64)
+        self.display.text(s, x, y, c)
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        self._count(0)
+        if palette is None:
+            self.display.blit(fbuf, x, y, key)
+        else:
+            self.display.blit(fbuf, x, y, key, palette)
+
+    def show(self):
+        self._count(0)
+        self.display.show()
+
+
+def measure(name, fn, results):
+    # runs fn until BENCH_MIN_TIME_US has passed, then reports per-call figures
+    counter = CountingDisplay(render.display)
+    real_display = render.display
+    render.display = counter
+    try:
+        fn()  # warm up (first-call caches, lazy allocations)
+        counter.primitives = 0
+        counter.pixels = 0
+        gc.collect()
+        alloc_start = mem_alloc()
+        rounds = 0
+        start_us = now_us()
+        spent_us = 0
+        while spent_us < BENCH_MIN_TIME_US and rounds < BENCH_MAX_ROUNDS:
+            fn()
+            rounds += 1
+            spent_us = elapsed_us(start_us)
+        alloc_end = mem_alloc()
+    finally:
+        render.display = real_display
+
+    result = {
+        'name': name,
+        'rounds': rounds,
+        'us_per_op': spent_us / rounds,
+        'ops_per_sec': rounds * 1000000 / spent_us if spent_us else 0,
+        'primitives_per_op': counter.primitives / rounds,
+        'pixels_per_op': counter.pixels / rounds,
+        # a gc run during the measurement makes the delta come out low
+        'alloc_bytes_per_op': None if alloc_start is None else (alloc_end - alloc_start) / rounds,
+    }
+    results.append(result)
+    print('{:<32} {:>10.1f} us {:>10.0f} ops/s {:>8.1f} prims {:>8.0f} px {:>8} B'.format(
+        name, result['us_per_op'], result['ops_per_sec'], result['primitives_per_op'], result['pixels_per_op'],
+        '-' if result['alloc_bytes_per_op'] is None else '{:.0f}'.format(result['alloc_bytes_per_op'])))
+    return result
+
+
+def engine_with_word(word):
+    ge = GameEngine(game.MENU_ITEM_EASY)
+    ge.word = word
+    ge.code = translate_to_morse(word)
+    ge.code_x_pos = code_x_position(code_pixel_count(ge.code), game.SCREEN_WIDTH)
+    return ge
+
+
+def key_code(ge):
+    # keys the whole code of the engine's word, the same calls main_game_loop makes
+    ge.captured_len = 0
+    ge.captured_pixel_count = 0
+    ge.cur_char_idx = 0
+    ge.cur_letter_idx = 0
+    ge.code_complete = False
+    ge.wrong_code = False
+    for symbol in ge.code[:-1]:
+        ge.register_code_input(symbol)
+
+
+def run_all():
+    game.init()
+    results = []
+    all_words = GameEngine.easy_words + GameEngine.hard_words
+
+    for radius in CIRCLE_RADII:
+        # cached sprite blit against the segment drawing it replaces
+        measure('draw_circle r={}'.format(radius),
+                lambda: render.draw_circle(render.SIGNAL_CENTER_X, render.SIGNAL_CENTER_Y, radius), results)
+        measure('draw_circle_segments r={}'.format(radius),
+                lambda: render.draw_circle_segments(render.display, render.SIGNAL_CENTER_X, render.SIGNAL_CENTER_Y, radius),
+                results)
+    measure('draw_signal_tower', render.draw_signal_tower, results)
+
+    ge = engine_with_word(BENCH_WORD)
+    key_code(ge)
+    ge.captured_len = len(ge.code) // 2
+    measure('draw_code_pixels', lambda: render.draw_code_pixels(ge, ge.code_x_pos, 50), results)
+    measure('draw_game_screen', lambda: render.draw_game_screen(ge, ge.code_x_pos, 12), results)
+    measure('draw_main_menu', lambda: render.draw_main_menu(49, 35, [game.MENU_ITEM_EASY, game.MENU_ITEM_HARD], 0,
+                                                          0, 123, False), results)
+
+    def translate_all():
+        for word in all_words:
+            translate_to_morse(word)
+
+    measure('translate_to_morse x{}'.format(len(all_words)), translate_all, results)
+    measure('calculate_code_pixel_count code', lambda: ge.calculate_code_pixel_count(False), results)
+    measure('calculate_code_pixel_count capt', lambda: ge.calculate_code_pixel_count(True), results)
+
+    keyed = engine_with_word(BENCH_WORD)
+    measure('register_code_input "{}"'.format(BENCH_WORD), lambda: key_code(keyed), results)
+    return results
+
+
+def main(results_file=BENCH_RESULTS_FILE_NAME, label=''):
+    results = run_all()
+    run = {
+        'platform': sys.platform,
+        'implementation': sys.implementation.name,
+        'label': label,
+        'time': time.time(),
+        'results': results,
+    }
+    with open(results_file, 'a') as f:
+        f.write(json.dumps(run))
+        f.write('\n')
+    print('results appended to ' + results_file)
+    return run
@@ -0,0 +1,213 @@
+from array import array
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    # plain python on a host - emulate the micropython ticks api
+    import time
+
+    TICKS_PERIOD = 1 << 30
+    TICKS_HALF_PERIOD = TICKS_PERIOD // 2
+
+    def ticks_us():
+        return int(time.perf_counter() * 1000000) & (TICKS_PERIOD - 1)
+
+    def ticks_diff(ticks1, ticks2):
+        return ((ticks1 - ticks2 + TICKS_HALF_PERIOD) & (TICKS_PERIOD - 1)) - TICKS_HALF_PERIOD
+
+EDGE_RELEASE = 0
+EDGE_PRESS = 1
+
+EVENT_NONE = 0
+EVENT_SHORT = 1
+EVENT_LONG = 2
+EVENT_SPACE = 3
+EVENT_TIMEOUT = 4
+
+EDGE_QUEUE_SIZE = 32  # must be a power of 2
+BUTTON_DEBOUNCE_US = 15000
+
+
+class EdgeQueue:
+    # single producer (the pin irq) / single consumer (the main loop) ring buffer of
+    # (edge, ticks_us) pairs, preallocated so pushing never allocates
+
+    def __init__(self, size=EDGE_QUEUE_SIZE):
+        self.edges = bytearray(size)
+        self.ticks = array('i', [0] * size)
+        self.mask = size - 1
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+
+    def push(self, edge, t_us):
+        head = self.head
+        next_head = (head + 1) & self.mask
+        if next_head == self.tail:
+            self.dropped += 1
+            return False
+        self.edges[head] = edge
+        self.ticks[head] = t_us
+        self.head = next_head
+        return True
+
+    def pending(self):
+        return self.head != self.tail
+
+    def peek_ticks(self):
+        return self.ticks[self.tail]
+
+    def pop_edge(self):
+        # drops the oldest edge and returns its kind, its time is peek_ticks() - no tuple to allocate
+        edge = self.edges[self.tail]
+        self.tail = (self.tail + 1) & self.mask
+        return edge
+
+    def pop(self):
+        tail = self.tail
+        edge = self.edges[tail]
+        t_us = self.ticks[tail]
+        self.tail = (tail + 1) & self.mask
+        return edge, t_us
+
+    def clear(self):
+        self.tail = self.head
+
+
+class ButtonCapture:
+    # timestamps the edges of an active-low button from the pin irq and debounces them:
+    # an edge is only accepted if it changes the state and the previous accepted edge is
+    # at least debounce_us old
+
+    def __init__(self, pin, queue, debounce_us=BUTTON_DEBOUNCE_US):
+        self.pin = pin
+        self.queue = queue
+        self.debounce_us = debounce_us
+        self.pressed = pin.value() == 0
+        self.last_edge_us = ticks_us()
+        self.irq_handler = self.on_irq  # keep the bound method, binding allocates
+        pin.irq(handler=self.irq_handler, trigger=pin.IRQ_FALLING | pin.IRQ_RISING)
+
+    def on_irq(self, pin):
+        self.feed(pin.value() == 0, ticks_us())
+
+    def feed(self, pressed, t_us):
+        if pressed == self.pressed:
+            return
+        if ticks_diff(t_us, self.last_edge_us) < self.debounce_us:
+            return
+        self.pressed = pressed
+        self.last_edge_us = t_us
+        self.queue.push(EDGE_PRESS if pressed else EDGE_RELEASE, t_us)
+
+
+class PressClassifier:
+    # turns timestamped edges into dot/dash/space/timeout events using the edge times
+    # themselves, so a slow frame only delays an event and never changes it
+
+    def __init__(self, short_thr_ms, space_thr_ms, timeout_thr_ms):
+        self.short_thr_us = short_thr_ms * 1000
+        self.space_thr_us = space_thr_ms * 1000
+        self.timeout_thr_us = timeout_thr_ms * 1000
+        self.pressed = False
+        self.press_start_us = 0
+        self.release_us = 0
+        self.input_started = False
+        self.space_sent = False
+        self.timeout_sent = False
+        self.last_press_dur_us = 0
+        self.last_poll_us = 0
+        self.recorder = None  # gets the edges, events and resets when a trace is recorded
+        self.speed = None  # a KeyingSpeed that learns from the presses and sets the thresholds
+
+    def use_speed(self, speed):
+        self.speed = speed
+        self.update_thresholds()
+
+    def update_thresholds(self):
+        speed = self.speed
+        if speed is not None:
+            self.short_thr_us = speed.short_thr_us
+            self.space_thr_us = speed.space_thr_us
+            self.timeout_thr_us = speed.timeout_thr_us
+
+    def reset(self, now_us, pressed=False):
+        # a press already in progress counts from now, like a freshly seen press
+        self.pressed = pressed
+        self.press_start_us = now_us
+        self.release_us = now_us
+        self.input_started = False
+        self.space_sent = False
+        self.timeout_sent = False
+        self.last_press_dur_us = 0
+        self.last_poll_us = now_us
+        if self.recorder is not None:
+            self.recorder.reset(now_us, pressed)
+
+    def held_us(self, now_us):
+        if not self.pressed:
+            return 0
+        return ticks_diff(now_us, self.press_start_us)
+
+    def feed(self, edge, t_us):
+        if edge == EDGE_PRESS:
+            if not self.pressed:
+                self.pressed = True
+                self.press_start_us = t_us
+                # a gap that ran into the timeout was taken as a stall already
+                if self.speed is not None and self.input_started and not self.timeout_sent:
+                    self.speed.gap(ticks_diff(t_us, self.release_us))
+                    self.update_thresholds()
+            return EVENT_NONE
+
+        if not self.pressed:
+            return EVENT_NONE
+        self.pressed = False
+        self.release_us = t_us
+        self.input_started = True
+        self.space_sent = False
+        self.timeout_sent = False
+        self.last_press_dur_us = ticks_diff(t_us, self.press_start_us)
+        event = EVENT_SHORT if self.last_press_dur_us <= self.short_thr_us else EVENT_LONG
+        if self.speed is not None:
+            # learned after the press is classified, the next one gets the new threshold
+            self.speed.press(self.last_press_dur_us)
+            self.update_thresholds()
+        return event
+
+    def poll(self, now_us):
+        if self.pressed or not self.input_started or self.timeout_sent:
+            return EVENT_NONE
+        gap = ticks_diff(now_us, self.release_us)
+        if not self.space_sent and gap > self.space_thr_us:
+            self.space_sent = True
+            return EVENT_SPACE
+        if gap > self.timeout_thr_us:
+            self.timeout_sent = True
+            if self.speed is not None:
+                self.speed.stall()
+                self.update_thresholds()
+            return EVENT_TIMEOUT
+        return EVENT_NONE
+
+    def next_event(self, queue, now_us):
+        # gap events are evaluated at the next edge's time before that edge is applied
+        while queue.pending():
+            event = self.poll(queue.peek_ticks())
+            if event != EVENT_NONE:
+                return self.emit(event)
+            t_us = queue.peek_ticks()
+            edge = queue.pop_edge()
+            if self.recorder is not None:
+                self.recorder.edge(edge, t_us)
+            event = self.feed(edge, t_us)
+            if event != EVENT_NONE:
+                return self.emit(event)
+        # with the edges known, the events only depend on the time of the last poll
+        self.last_poll_us = now_us
+        return self.emit(self.poll(now_us))
+
+    def emit(self, event):
+        if event != EVENT_NONE and self.recorder is not None:
+            self.recorder.event(event)
+        return event
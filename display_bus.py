@@ -0,0 +1,165 @@
+from time import ticks_us, ticks_diff, sleep_ms
+
+# the wires under the display. every bus takes a run of commands from its cmd_buf and data from any
+# buffer, each as one transaction, and counts the transactions, the bytes on the wire and the time
+# spent in them - compare the buses of a board with bench/bench_display_bus.py
+CMD_BUFFER_SIZE = 8  # the longest command run sent at once, a column + page window is 6
+
+# ssd1306 commands followed by arguments, for the memory bus
+COMMAND_ARG_COUNTS = {
+    0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0xA8: 1, 0xD3: 1, 0xDA: 1, 0xD5: 1, 0xD9: 1, 0xDB: 1, 0x8D: 1, 0xAD: 1,
+}
+SET_COL_ADDR = 0x21
+SET_PAGE_ADDR = 0x22
+
+
+class DisplayBus:
+    name = 'bus'
+    # what a transaction costs in bytes on top of its payload (start, address, stop, the call
+    # itself), the display weighs one big write against several small ones with it
+    transaction_cost = 0
+
+    def __init__(self):
+        self.transactions = 0
+        self.bytes = 0
+        self.busy_us = 0
+
+    def reset_counters(self):
+        self.transactions = 0
+        self.bytes = 0
+        self.busy_us = 0
+
+    def count(self, wire_bytes, start_us):
+        self.transactions += 1
+        self.bytes += wire_bytes
+        self.busy_us += ticks_diff(ticks_us(), start_us)
+
+    def stats(self):
+        text = '{}: {} transactions, {} bytes in {} ms'.format(self.name, self.transactions, self.bytes,
+                                                              self.busy_us // 1000)
+        if self.busy_us > 0:
+            text += ' ({} kB/s)'.format(self.bytes * 1000 // self.busy_us)
+        return text
+
+
+class I2CBus(DisplayBus):
+    # machine.I2C or machine.SoftI2C. commands go out as one stream behind a single control byte,
+    # the data behind another - two transactions per window instead of one per command byte
+    transaction_cost = 3
+
+    def __init__(self, i2c, addr=0x3C, name='i2c'):
+        super().__init__()
+        self.i2c = i2c
+        self.addr = addr
+        self.name = name
+        self.cmd_tx = bytearray(1 + CMD_BUFFER_SIZE)  # Co=0, D/C#=0, then the commands
+        tx_view = memoryview(self.cmd_tx)
+        self.cmd_buf = tx_view[1:]
+        self.cmd_views = tuple(tx_view[:1 + n] for n in range(CMD_BUFFER_SIZE + 1))
+        self.data_list = [b'\x40', None]  # Co=0, D/C#=1
+
+    def write_cmds(self, n):
+        start_us = ticks_us()
+        self.i2c.writeto(self.addr, self.cmd_views[n])
+        self.count(n + 2, start_us)  # address and control byte
+
+    def write_data(self, buf):
+        start_us = ticks_us()
+        self.data_list[1] = buf
+        self.i2c.writevto(self.addr, self.data_list)
+        self.count(len(buf) + 2, start_us)
+
+
+class SPIBus(DisplayBus):
+    # a 4-wire spi module: the dc pin tells commands from data, no address or control bytes
+    name = 'spi'
+    transaction_cost = 1
+
+    def __init__(self, spi, dc, cs, res=None):
+        super().__init__()
+        self.spi = spi
+        self.dc = dc
+        self.cs = cs
+        self.cmd_buf = bytearray(CMD_BUFFER_SIZE)
+        cmd_view = memoryview(self.cmd_buf)
+        self.cmd_views = tuple(cmd_view[:n] for n in range(CMD_BUFFER_SIZE + 1))
+        cs.init(cs.OUT, value=1)
+        dc.init(dc.OUT, value=0)
+        if res is not None:
+            res.init(res.OUT, value=1)
+            sleep_ms(1)
+            res(0)
+            sleep_ms(10)
+            res(1)
+
+    def write(self, is_data, buf):
+        start_us = ticks_us()
+        self.cs(1)
+        self.dc(is_data)
+        self.cs(0)
+        self.spi.write(buf)
+        self.cs(1)
+        self.count(len(buf), start_us)
+
+    def write_cmds(self, n):
+        self.write(0, self.cmd_views[n])
+
+    def write_data(self, buf):
+        self.write(1, buf)
+
+
+class MemoryBus(DisplayBus):
+    # no wires, the display ram is kept here - for the host, and on the board for the cost of
+    # everything but the bus
+    name = 'memory'
+
+    def __init__(self, width=128, pages=8):
+        super().__init__()
+        self.width = width
+        self.pages = pages
+        self.gram = bytearray(width * pages)
+        self.cmd_buf = bytearray(CMD_BUFFER_SIZE)
+        self.pending_cmd = 0
+        self.pending_args = bytearray(2)
+        self.pending_count = 0
+        self.col_start = 0
+        self.col_end = width - 1
+        self.page_start = 0
+        self.page_end = pages - 1
+        self.col = 0
+        self.page = 0
+
+    def write_cmds(self, n):
+        start_us = ticks_us()
+        for i in range(n):
+            self.command(self.cmd_buf[i])
+        self.count(n, start_us)
+
+    def command(self, b):
+        # arguments may come in later transactions, the driver sends every command byte on its own
+        if self.pending_cmd:
+            self.pending_args[self.pending_count] = b
+            self.pending_count += 1
+            if self.pending_count == COMMAND_ARG_COUNTS[self.pending_cmd]:
+                if self.pending_cmd == SET_COL_ADDR:
+                    self.col_start = self.col = self.pending_args[0]
+                    self.col_end = self.pending_args[1]
+                elif self.pending_cmd == SET_PAGE_ADDR:
+                    self.page_start = self.page = self.pending_args[0]
+                    self.page_end = self.pending_args[1]
+                self.pending_cmd = 0
+        elif b in COMMAND_ARG_COUNTS:
+            self.pending_cmd = b
+            self.pending_count = 0
+
+    def write_data(self, buf):
+        # horizontal addressing, wrapping inside the column and page windows
+        start_us = ticks_us()
+        for b in buf:
+            self.gram[self.page * self.width + self.col] = b
+            if self.col >= self.col_end:
+                self.col = self.col_start
+                self.page = self.page_start if self.page >= self.page_end else self.page + 1
+            else:
+                self.col += 1
+        self.count(len(buf), start_us)
@@ -0,0 +1,438 @@
+import random
+from micropython import const
+from array import array
+
+from settings import *
+from words import EASY_WORDS, HARD_WORDS
+from morse_code import MORSE_LETTERS, SHORT_SYMBOL, LONG_SYMBOL, SPACE_SYMBOL, translate_to_morse, \
+    code_pixel_count, symbol_pixel_count, code_x_position, CODE_MIN_X_POS
+from morse_decoder import MorseDecoder
+from morse_trie import MorseTrie, MorseTrieError, ROOT_NODE, NO_NODE, TRIE_SHORT, TRIE_LONG, symbol_bit
+from word_dict import WordDict, WordDictError, DIFFICULTY_EASY, DIFFICULTY_HARD, DIFFICULTY_OPEN
+from stats_store import StatsStore, letter_index
+from word_select import AdaptiveSampler, letter_weights, letter_weight, accept_word
+from button_input import EVENT_SHORT, EVENT_LONG, EVENT_SPACE, EVENT_TIMEOUT
+from keying_speed import KeyingSpeed
+import log
+
+LOG_DEBUG = const(0)  # 1 to print every captured symbol, compiled out otherwise
+
+CAPTURED_SEQUENCE_SIZE = 64
+SPACE_SYMBOL_ORD = ord(SPACE_SYMBOL)
+
+# how a round ended
+OUTCOME_COMPLETE = 0
+OUTCOME_WRONG = 1
+OUTCOME_TIME_UP = 2
+
+
+class GameEngine:
+    # fixed attribute set, the captured symbols live in a preallocated bytearray and the progress bar
+    # width is updated per symbol instead of rescanning the capture every frame
+    __slots__ = ('wrong_code', 'code_complete', 'timer_expired', 'word', 'code', 'code_width', 'code_x_pos',
+                 'points', 'difficulty', 'captured', 'captured_len', 'captured_pixel_count', 'cur_char_idx',
+                 'cur_letter_idx', 'record_stats', 'speed')
+    letters_dict = MORSE_LETTERS
+    easy_words = EASY_WORDS
+    hard_words = HARD_WORDS
+    open_answer = False
+
+    def __init__(self, difficulty, record_stats=True, adaptive_keying=ADAPTIVE_KEYING):
+        self.wrong_code = False
+        self.code_complete = False
+        self.timer_expired = False
+        self.word = ""
+        self.code = ""
+        self.code_width = 0
+        self.code_x_pos = 0
+        self.points = 0
+        self.difficulty = difficulty
+        self.captured = bytearray(CAPTURED_SEQUENCE_SIZE)
+        self.captured_len = 0
+        self.captured_pixel_count = 0
+        self.cur_char_idx = 0
+        self.cur_letter_idx = 0
+        self.record_stats = record_stats  # off for replays, they must not count as the player's
+        # learns the player's keying speed over the game, the classifier takes its thresholds from it
+        self.speed = KeyingSpeed(*keying_thresholds(difficulty)) if adaptive_keying else None
+
+    def gen_new_word(self):
+        dict_difficulty = DIFFICULTY_IDS[self.difficulty]
+        if word_dict is not None and word_dict.count(dict_difficulty) > 0:
+            word = word_dict.random_word(dict_difficulty)
+            if ADAPTIVE_WORDS:
+                tries = 1
+                while tries < WORD_DICT_ADAPTIVE_TRIES and not accept_word(word, letter_weight_table):
+                    word = word_dict.random_word(dict_difficulty)
+                    tries += 1
+            self.start_word(word)
+        else:
+            bank = word_banks[self.difficulty]
+            idx = bank.sampler.sample() if ADAPTIVE_WORDS else bank.random_index()
+            self.start_word(bank.words[idx], bank.codes[idx], bank.pixel_widths[idx], bank.x_positions[idx])
+
+    def start_word(self, word, code=None, code_width=None, code_x_pos=None):
+        # a new round for word, its code, the code's width and position are worked out unless given
+        if code is None:
+            code = translate_to_morse(word)
+        if code_width is None:
+            code_width = code_pixel_count(code)
+        if code_x_pos is None:
+            code_x_pos = code_x_position(code_width, SCREEN_WIDTH)
+        self.word = word
+        self.code = code
+        self.code_width = code_width
+        self.code_x_pos = code_x_pos
+        self.wrong_code = False
+        self.code_complete = False
+        self.timer_expired = False
+        if len(self.code) > len(self.captured):
+            self.captured = bytearray(len(self.code))
+        self.captured_len = 0
+        self.captured_pixel_count = 0
+        self.cur_char_idx = 0
+        self.cur_letter_idx = 0
+
+    @property
+    def captured_sequence(self):
+        # debugging aid only - allocates a new string
+        return bytes(self.captured[:self.captured_len]).decode()
+
+    @classmethod
+    def translate_to_morse(cls, word):
+        return translate_to_morse(word)
+
+    def calculate_code_pixel_count(self, captured):
+        if captured:
+            return self.captured_pixel_count
+        return self.code_width
+
+    def is_code_input_started(self):
+        return self.captured_len > 0
+
+    def is_last_symbol_space(self):
+        if self.captured_len == 0:
+            return False
+
+        return self.captured[self.captured_len - 1] == SPACE_SYMBOL_ORD
+
+    def current_letter(self):
+        # stats index of the letter being keyed
+        return letter_index(self.word[self.cur_letter_idx])
+
+    def letter_done(self, hit):
+        if self.record_stats:
+            record_letter(self.current_letter(), hit)
+
+    def register_event(self, event, press_ms=0):
+        # a classified button event while the word is keyed, returns the symbol it registered
+        if event == EVENT_SHORT:
+            self.register_code_input(SHORT_SYMBOL, press_ms)
+            return SHORT_SYMBOL
+        if event == EVENT_LONG:
+            self.register_code_input(LONG_SYMBOL, press_ms)
+            return LONG_SYMBOL
+        if event == EVENT_SPACE:
+            self.register_code_input(SPACE_SYMBOL)
+            return SPACE_SYMBOL
+        if event == EVENT_TIMEOUT:
+            self.register_input_timeout()
+        return None
+
+    def check_early_wrong(self, classifier):
+        # the code is wrong as soon as a press starts where the letter should end, or is held past
+        # the short click threshold where a dot is due - no need to wait for the release or the gap
+        if not classifier.pressed or self.wrong_code or self.code_complete:
+            return False
+        expected = self.code[self.cur_char_idx]
+        if expected == SPACE_SYMBOL or (expected == SHORT_SYMBOL and
+                                        classifier.held_us(classifier.last_poll_us) > classifier.short_thr_us):
+            if LOG_DEBUG:
+                log.debug('wrong code, early')
+            self.letter_done(False)
+            self.wrong_code = True
+            return True
+        return False
+
+    def capture(self, symbol):
+        # a wrong symbol ends the round, so we never capture more than the code is long
+        if self.captured_len < len(self.captured):
+            self.captured[self.captured_len] = ord(symbol)
+            self.captured_len += 1
+            self.captured_pixel_count += symbol_pixel_count(symbol)
+
+    def register_code_input(self, symbol, press_ms=0):
+        if press_ms and self.record_stats:
+            stats.record_press(self.current_letter(), press_ms)
+        self.capture(symbol)
+        if LOG_DEBUG:
+            log.debug(self.captured_sequence)
+
+        if self.code[self.cur_char_idx] == symbol:
+            self.cur_char_idx += 1
+
+            if self.difficulty == MENU_ITEM_EASY:
+                self.points += 1
+            else:
+                self.points += 2
+            if self.cur_char_idx == len(self.code) - 1:
+                self.letter_done(True)
+                self.code_complete = True
+            elif symbol == SPACE_SYMBOL:
+                self.letter_done(True)
+                self.cur_letter_idx += 1
+                if self.code[self.cur_char_idx] == SPACE_SYMBOL:
+                    # the gap between the words of a phrase is keyed as a letter gap
+                    self.capture(SPACE_SYMBOL)
+                    self.cur_char_idx += 1
+                    self.cur_letter_idx += 1
+
+        else:
+            if LOG_DEBUG:
+                log.debug('wrong code')
+            self.letter_done(False)
+            self.wrong_code = True
+
+    def register_input_timeout(self):
+        if self.is_code_input_started():
+            if LOG_DEBUG:
+                log.debug('time out - wrong code')
+            self.letter_done(False)
+            self.wrong_code = True
+
+    def add_points_upon_code_complete(self):
+        if self.difficulty is MENU_ITEM_EASY:
+            self.points += EASY_POINTS_MODIFY
+        else:
+            self.points += HARD_POINTS_MODIFY
+
+    def reduce_points_upon_wrong_code(self):
+        if self.difficulty is MENU_ITEM_EASY:
+            self.points -= EASY_POINTS_MODIFY
+        else:
+            self.points -= HARD_POINTS_MODIFY
+
+        if self.points < 0:
+            self.points = 0
+
+    def finish_round(self):
+        # scores the round once its keying is over, returns the OUTCOME_
+        if self.code_complete:
+            self.add_points_upon_code_complete()
+            return OUTCOME_COMPLETE
+        if self.wrong_code:
+            self.reduce_points_upon_wrong_code()
+            return OUTCOME_WRONG
+        return OUTCOME_TIME_UP
+
+    def is_code_completed(self):
+        return self.code_complete
+
+    def is_code_wrong(self):
+        return self.wrong_code
+
+    def register_expired_timer(self):
+        self.timer_expired = True
+
+    def is_game_over(self):
+        return self.timer_expired
+
+
+class OpenAnswerEngine(GameEngine):
+    # the word shown is a first letter and any word of the trie starting with it counts. the trie
+    # is walked a symbol at a time, so a symbol no word goes on with is wrong at once - one lookup
+    # however big the bank is. the code is only the first letter's, the strip shows what was keyed
+    __slots__ = ('trie', 'node', 'clue_code', 'clue_letters', 'decoder')
+    open_answer = True
+
+    def __init__(self, trie, record_stats=False, adaptive_keying=ADAPTIVE_KEYING):
+        super().__init__(MENU_ITEM_OPEN, record_stats, adaptive_keying)
+        self.trie = trie
+        self.node = ROOT_NODE
+        self.clue_code = ""
+        # only the letters some word starts with
+        self.clue_letters = tuple(letter for letter in sorted(self.letters_dict)
+                                  if trie.walk(translate_to_morse(letter)) != NO_NODE)
+        self.decoder = MorseDecoder()
+
+    def gen_new_word(self):
+        self.start_word(random.choice(self.clue_letters) + OPEN_CLUE_SUFFIX)
+
+    def start_word(self, word, code=None, code_width=None, code_x_pos=None):
+        # word is the clue, its first letter is the one asked for
+        self.clue_code = translate_to_morse(word[0])
+        super().start_word(word, self.clue_code, 0, CODE_MIN_X_POS)
+        if len(self.captured) < CAPTURED_SEQUENCE_SIZE:
+            self.captured = bytearray(CAPTURED_SEQUENCE_SIZE)
+        self.node = ROOT_NODE
+        self.decoder.reset()
+
+    def next_node(self, symbol):
+        # the trie node after symbol, NO_NODE if no word starting with the clue goes on with it
+        if self.cur_char_idx < len(self.clue_code) and self.clue_code[self.cur_char_idx] != symbol:
+            return NO_NODE
+        return self.trie.child(self.node, symbol)
+
+    def answer(self):
+        # the word keyed, built once the round is over
+        return bytes(self.decoder.char_at(i) for i in range(self.decoder.count)).decode()
+
+    def check_early_wrong(self, classifier):
+        # wrong as soon as a press starts where no word has a symbol next, or is held past the short
+        # click threshold where no word goes on with a dash
+        if not classifier.pressed or self.wrong_code or self.code_complete:
+            return False
+        flags = self.trie.flags[self.node]
+        if self.cur_char_idx < len(self.clue_code):
+            flags &= symbol_bit(self.clue_code[self.cur_char_idx])
+        if not flags & TRIE_LONG and (not flags & TRIE_SHORT or
+                                      classifier.held_us(classifier.last_poll_us) > classifier.short_thr_us):
+            if LOG_DEBUG:
+                log.debug('wrong code, early')
+            self.wrong_code = True
+            return True
+        return False
+
+    def register_code_input(self, symbol, press_ms=0):
+        if self.captured_len < len(self.captured):
+            self.captured[self.captured_len] = ord(symbol)
+            self.captured_len += 1
+        self.captured_pixel_count += symbol_pixel_count(symbol)
+        self.code_width = self.captured_pixel_count  # the strip is what was keyed, it scrolls as it grows
+        if LOG_DEBUG:
+            log.debug(self.captured_sequence)
+
+        node = self.next_node(symbol)
+        if node == NO_NODE:
+            if LOG_DEBUG:
+                log.debug('no word goes on')
+            self.wrong_code = True
+            return
+        self.node = node
+        self.cur_char_idx += 1
+        self.points += 2
+        if symbol == SPACE_SYMBOL:
+            self.decoder.letter_end()
+            # a word no other word goes on from needn't wait for the timeout
+            if self.trie.is_word(node) and not self.trie.has_children(node):
+                self.code_complete = True
+        else:
+            self.decoder.symbol(symbol)
+
+    def register_input_timeout(self):
+        if self.trie.is_word(self.node):
+            self.code_complete = True
+        elif self.is_code_input_started():
+            if LOG_DEBUG:
+                log.debug('time out - no word')
+            self.wrong_code = True
+
+
+class WordBank:
+    # morse code, pixel width and x position of every word, computed once at boot so picking a word
+    # is just an index lookup. duplicates are dropped, a code too wide for the screen scrolls
+    def __init__(self, words):
+        seen = set()
+        kept_words = []
+        kept_codes = []
+        self.pixel_widths = array('H')
+        self.x_positions = array('B')
+
+        for word in words:
+            if word.lower() in seen:
+                continue
+            seen.add(word.lower())
+
+            code = translate_to_morse(word)
+            pixel_width = code_pixel_count(code)
+            x_pos = code_x_position(pixel_width, SCREEN_WIDTH)
+            kept_words.append(word)
+            kept_codes.append(code)
+            self.pixel_widths.append(pixel_width)
+            self.x_positions.append(x_pos)
+
+        self.words = tuple(kept_words)
+        self.codes = tuple(kept_codes)
+        self.sampler = None  # set up once the letter stats are loaded
+
+    def __len__(self):
+        return len(self.words)
+
+    def random_index(self):
+        return random.randrange(len(self.words))
+
+
+# the difficulty ids of the word dictionary and the stats store
+DIFFICULTY_IDS = {
+    MENU_ITEM_EASY: DIFFICULTY_EASY,
+    MENU_ITEM_HARD: DIFFICULTY_HARD,
+    MENU_ITEM_OPEN: DIFFICULTY_OPEN,
+}
+
+# set up by init()
+word_banks = None
+word_dict = None
+stats = None
+letter_weight_table = None
+morse_trie = None  # the open answer mode's, loaded on its first game
+
+
+def keying_thresholds(difficulty):
+    # short click, space and sequence end thresholds in ms
+    if difficulty == MENU_ITEM_EASY:
+        return SHORT_CLICK_THR_MS, SPACE_THR_MS_EASY, SEQUENCE_END_THR_MS_EASY
+    return SHORT_CLICK_THR_MS, SPACE_THR_MS_HARD, SEQUENCE_END_THR_MS_HARD
+
+
+def load_word_dict(filename):
+    # the big on-flash dictionary is optional - without it we play the built in word banks
+    try:
+        return WordDict(filename)
+    except (OSError, WordDictError):
+        return None
+
+
+def new_game_engine(difficulty, record_stats=True, adaptive_keying=ADAPTIVE_KEYING):
+    if difficulty == MENU_ITEM_OPEN:
+        # the letters keyed are no letters of a known word, so no letter stats
+        return OpenAnswerEngine(open_answer_trie(), False, adaptive_keying)
+    return GameEngine(difficulty, record_stats, adaptive_keying)
+
+
+def open_answer_trie():
+    # the trie file is optional too - without it the trie is built from the built in word banks
+    global morse_trie
+    if morse_trie is None:
+        try:
+            morse_trie = MorseTrie.load(MORSE_TRIE_FILE_NAME)
+        except (OSError, MorseTrieError, MemoryError):
+            morse_trie = MorseTrie.build(translate_to_morse(word) for word in
+                                         GameEngine.easy_words + GameEngine.hard_words)
+    return morse_trie
+
+
+def init():
+    # builds the word banks and loads the dictionary and the player stats, once
+    global word_banks, word_dict, stats, letter_weight_table
+    if word_banks is not None:
+        return
+    word_banks = {
+        MENU_ITEM_EASY: WordBank(GameEngine.easy_words),
+        MENU_ITEM_HARD: WordBank(GameEngine.hard_words),
+    }
+    word_dict = load_word_dict(WORD_DICT_FILE_NAME)
+    stats = StatsStore(STATS_FILE_NAME, DEFAULT_HIGH_SCORE, HIGH_SCORE_FILE_NAME)  # loaded once, written between games
+
+    # per-letter word selection weights from the error rates, updated with every finished letter
+    letter_weight_table = letter_weights(stats.hits, stats.misses)
+    for bank in word_banks.values():
+        bank.sampler = AdaptiveSampler(bank.words, letter_weight_table)
+
+
+def record_letter(letter, hit):
+    stats.record_letter(letter, hit)
+    if letter < 0:
+        return
+    letter_weight_table[letter] = letter_weight(stats.hits[letter], stats.misses[letter])
+    for bank in word_banks.values():
+        bank.sampler.update_letter(letter)
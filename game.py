@@ -0,0 +1,392 @@
+import random
+import time
+
+from settings import *
+from morse_code import SHORT_SYMBOL, LONG_SYMBOL
+from audio import MELODY_SUCCESS, MELODY_FAILURE, MELODY_GAME_OVER
+from button_input import PressClassifier, EVENT_NONE, EVENT_SHORT, EVENT_LONG, EVENT_SPACE, EVENT_TIMEOUT
+import scheduler
+from scheduler import FramePacer, sleep_ms
+import log
+import hardware
+from heap import HeapMonitor
+import engine
+from engine import DIFFICULTY_IDS, OUTCOME_COMPLETE, OUTCOME_WRONG, keying_thresholds
+from input_trace import TraceRecorder
+from keying_speed import KeyingSpeed
+from morse_decoder import MorseDecoder
+from render_thread import RenderPipeline
+import render
+from render import prof, draw_main_menu, draw_game_screen, draw_end_game_splash_screen, draw_free_keying_screen, \
+    profile_frame_done
+
+PHASE_NEW_WORD = 0
+PHASE_KEYING = 1
+PHASE_FEEDBACK = 2
+PHASE_GAME_OVER = 3
+
+# built once, picking one doesn't concatenate a new string per word
+POSITIVE_FEEDBACK = tuple("-" + word + "-" for word in POSITIVE_WORDS)
+NEGATIVE_FEEDBACK = tuple("-" + word + "-" for word in NEGATIVE_WORDS)
+
+heap_monitor = HeapMonitor(HEAP_STATS)
+
+boot_ticks = None  # (main.py started, imports done, init done) in ticks_ms, reported after the first frame
+recorder = None  # records the input of every game when TRACE_RECORDING is on
+render_pipeline = None  # owns the display with RENDER_THREAD, render draws on its canvas
+
+
+def init(start_ms=None):
+    # creates the hardware and everything built from data, nothing of it happens at import time
+    global boot_ticks, recorder, render_pipeline
+    imported_ms = time.ticks_ms()
+    hardware.init()
+    if RENDER_THREAD:
+        if render_pipeline is None:
+            render_pipeline = RenderPipeline(hardware.display)
+        render.init(render_pipeline.canvas)
+        render_pipeline.start()
+    else:
+        render.init(hardware.display)
+    engine.init()
+    if TRACE_RECORDING and recorder is None:
+        recorder = TraceRecorder(TRACE_FILE_NAME)
+    boot_ticks = (imported_ms if start_ms is None else start_ms, imported_ms, time.ticks_ms())
+
+
+def report_boot_time():
+    # ticks_ms counts from reset, so the first frame's ticks are the whole boot
+    global boot_ticks
+    if boot_ticks is None:
+        return
+    start_ms, imported_ms, init_ms = boot_ticks
+    boot_ticks = None
+    now_ms = time.ticks_ms()
+    log.info('boot: first frame at {} ms, main.py took {} ms (imports {} ms, init {} ms, first frame {} ms)'.format(
+        now_ms, time.ticks_diff(now_ms, start_ms), time.ticks_diff(imported_ms, start_ms),
+        time.ticks_diff(init_ms, imported_ms), time.ticks_diff(now_ms, init_ms)))
+
+
+def buzz_success():
+    # upward arpeggio with a triumphant feel (C4 - E4 - G4 - C5)
+    hardware.audio.play(MELODY_SUCCESS)
+
+
+def buzz_failure():
+    hardware.audio.play(MELODY_FAILURE)
+
+
+def buzz_game_over():
+    hardware.audio.play(MELODY_GAME_OVER)
+
+
+class MenuState:
+    # shared by the menu flow and its input task
+
+    def __init__(self, items):
+        self.items = items
+        self.selector_index = 0
+        self.fill_width = 0
+        self.sound_on = False
+        self.selected = False
+        self.listening = True  # the input task leaves the button alone while a game runs
+
+
+async def menu_input_task(menu, classifier):
+    while True:
+        if menu.listening:
+            with prof[PROF_INPUT]:
+                event = classifier.next_event(hardware.button_edges, time.ticks_us())
+                while event != EVENT_NONE:
+                    if event == EVENT_SHORT:
+                        menu.selector_index += 1
+                        if menu.selector_index > len(menu.items) - 1:
+                            menu.selector_index = 0
+                        if menu.sound_on:
+                            hardware.audio.beep(BUZZ_SHORT_CLICK_DUR_MS, BUZZ_MENU_SHORT_CLICK_FREQ_HZ)
+                    if event == EVENT_SHORT or event == EVENT_LONG:
+                        menu.fill_width = 0
+                    event = classifier.next_event(hardware.button_edges, time.ticks_us())
+
+                # mark the selection in the ui for as long as the button is held - the fill follows the held
+                # time, so it grows at the same speed whatever the frame rate
+                held_ms = classifier.held_us(time.ticks_us()) // 1000
+                if held_ms > SHORT_CLICK_THR_MS and not menu.selected:
+                    selected_item_width = len(menu.items[menu.selector_index]) * 8
+                    menu.fill_width = (held_ms - SHORT_CLICK_THR_MS) * selected_item_width * 2 // MENU_CLICK_LONG_THR_MS
+                    if menu.fill_width > selected_item_width:
+                        menu.selected = True
+        await sleep_ms(INPUT_POLL_MS)
+
+
+async def main_menu_loop():
+    menu = MenuState([MENU_ITEM_EASY, MENU_ITEM_HARD, MENU_ITEM_OPEN, MENU_ITEM_FREE])
+    # the menu only tells short clicks from holds, the gap events are ignored
+    classifier = PressClassifier(SHORT_CLICK_THR_MS, MENU_CLICK_LONG_THR_MS, MENU_CLICK_LONG_THR_MS)
+    reset_button_input(classifier)
+    scheduler.create_task(menu_input_task(menu, classifier))
+
+    hardware.audio.beep(1, BUZZ_MENU_SHORT_CLICK_FREQ_HZ)
+
+    pacer = FramePacer(REFRESH_RATE_MS)
+    while True:
+        if menu.selected:
+            item = menu.items[menu.selector_index]
+            log.info(item + ' selected')
+
+            if item == MENU_ITEM_FREE:
+                menu.listening = False
+                await free_keying_loop(menu.sound_on)
+                reset_button_input(classifier)
+                render.restart_menu_animation()
+                menu.listening = True
+                pacer.restart()
+            elif item in (MENU_ITEM_EASY, MENU_ITEM_HARD, MENU_ITEM_OPEN):
+                menu.listening = False
+                await main_game_loop(item, menu.sound_on)
+                # we fall back here once the game has ended - write its stats and init some stuff
+                engine.stats.flush()
+                if GC_AT_SAFE_POINTS:
+                    heap_monitor.collect()
+                if HEAP_STATS:
+                    print(heap_monitor.stats())
+                    heap_monitor.reset()
+                if render_pipeline is not None and log.enabled(log.LEVEL_DEBUG):
+                    log.debug(render_pipeline.stats())
+                reset_button_input(classifier)
+                render.restart_menu_animation()
+                menu.listening = True
+                pacer.restart()
+            menu.selected = False
+            menu.fill_width = 0
+
+        # the high score shown is the one of the selected difficulty, free keying has none
+        difficulty_id = DIFFICULTY_IDS.get(menu.items[menu.selector_index])
+        high_score = engine.stats.high_score(difficulty_id) if difficulty_id is not None else None
+        heap_monitor.frame_start()
+        draw_main_menu(SCREEN_WIDTH // 2 - 15, 29, menu.items, menu.selector_index, menu.fill_width,
+                       high_score, menu.sound_on)
+        heap_monitor.frame_done()
+        profile_frame_done()
+        report_boot_time()
+        await pacer.wait()
+
+
+class GameSession:
+    # shared by the game flow and its input, timer and render tasks
+
+    def __init__(self, difficulty, sound_on):
+        self.ge = engine.new_game_engine(difficulty)
+        self.sound_on = sound_on
+        short_threshold_ms, space_threshold_ms, timeout_threshold_ms = keying_thresholds(difficulty)
+        self.classifier = PressClassifier(short_threshold_ms, space_threshold_ms, timeout_threshold_ms)
+        self.classifier.recorder = recorder
+        self.start_game_tick = time.ticks_ms()
+        self.elapsed_sec = 0
+        self.time_up = False
+        self.phase = PHASE_NEW_WORD
+        self.feedback_text = ''
+        self.skip = False  # a click skips the feedback and the end splash
+
+
+async def game_input_task(session):
+    # the events carry the exact edge times, so a late poll can't turn a dot into a dash
+    ge = session.ge
+    classifier = session.classifier
+    while True:
+        with prof[PROF_INPUT]:
+            event = classifier.next_event(hardware.button_edges, time.ticks_us())
+            while event != EVENT_NONE:
+                if session.phase == PHASE_KEYING:
+                    if not ge.is_code_wrong() and not ge.is_code_completed():
+                        with prof[PROF_LOGIC]:
+                            symbol = ge.register_event(event, classifier.last_press_dur_us // 1000)
+                        if session.sound_on:
+                            if symbol == SHORT_SYMBOL:
+                                hardware.audio.beep(BUZZ_SHORT_CLICK_DUR_MS, BUZZ_SHORT_CLICK_FREQ_HZ)
+                            elif symbol == LONG_SYMBOL:
+                                hardware.audio.beep(BUZZ_LONG_CLICK_DUR_MS, BUZZ_LONG_CLICK_FREQ_HZ)
+                elif event == EVENT_SHORT or event == EVENT_LONG:
+                    session.skip = True
+                event = classifier.next_event(hardware.button_edges, time.ticks_us())
+            if EARLY_WRONG_CODE and session.phase == PHASE_KEYING:
+                ge.check_early_wrong(classifier)
+        await sleep_ms(INPUT_POLL_MS)
+
+
+async def game_timer_task(session):
+    while True:
+        session.elapsed_sec = time.ticks_diff(time.ticks_ms(), session.start_game_tick) // 1000
+        if session.elapsed_sec > GAME_TIMER_S:
+            session.time_up = True
+            return
+        await sleep_ms(INPUT_POLL_MS)
+
+
+async def game_render_task(session):
+    ge = session.ge
+    pacer = FramePacer(REFRESH_RATE_MS)
+    while True:
+        # nothing is drawn between words, the last feedback stays up
+        heap_monitor.frame_start()
+        if session.phase == PHASE_KEYING or session.phase == PHASE_FEEDBACK:
+            draw_game_screen(ge, ge.code_x_pos, session.elapsed_sec, session.feedback_text)
+        elif session.phase == PHASE_GAME_OVER:
+            draw_end_game_splash_screen(ge)
+        heap_monitor.frame_done()
+        profile_frame_done()
+        await pacer.wait()
+
+
+async def wait_or_skip(session, duration_ms):
+    session.skip = False
+    end_tick = time.ticks_add(time.ticks_ms(), duration_ms)
+    while not session.skip and time.ticks_diff(end_tick, time.ticks_ms()) > 0:
+        await sleep_ms(INPUT_POLL_MS)
+
+
+async def main_game_loop(difficulty, sound_on):
+    session = GameSession(difficulty, sound_on)
+    ge = session.ge
+    if recorder is not None:
+        # a known seed, so a replay on the board picks the same words from the same stats
+        seed = time.ticks_us()
+        random.seed(seed)
+        recorder.game_start(DIFFICULTY_IDS[difficulty], seed, time.ticks_us())
+    tasks = (scheduler.create_task(game_input_task(session)), scheduler.create_task(game_timer_task(session)),
+             scheduler.create_task(game_render_task(session)))
+
+    while not session.time_up:
+        session.phase = PHASE_NEW_WORD
+        ge.gen_new_word()
+        render.prepare_word(ge)
+        if recorder is not None:
+            recorder.flush()
+            recorder.word(ge.word)
+        delay_ms = NEW_WORD_DELAY_MS
+        if GC_AT_SAFE_POINTS:
+            # nothing is drawn between words, the pause is taken out of the delay
+            delay_ms -= heap_monitor.collect() // 1000
+        await sleep_ms(delay_ms if delay_ms > 0 else 0)
+
+        reset_button_input(session.classifier)
+        # the speed is only learned from the keying, not from the clicks that skip the feedback
+        session.classifier.use_speed(ge.speed)
+        session.feedback_text = ''
+        session.phase = PHASE_KEYING
+        while not (ge.is_code_completed() or ge.is_code_wrong() or session.time_up):
+            await sleep_ms(INPUT_POLL_MS)
+        session.classifier.use_speed(None)
+
+        outcome = ge.finish_round()
+        if recorder is not None:
+            recorder.round_end(session.classifier.last_poll_us, outcome, ge.points)
+        if outcome == OUTCOME_COMPLETE:
+            # in the open answer mode the word that was keyed
+            session.feedback_text = '-' + ge.answer() + '-' if ge.open_answer else random.choice(POSITIVE_FEEDBACK)
+            # TODO Here we need to highlight the points user got
+            if sound_on:
+                buzz_success()
+        elif outcome == OUTCOME_WRONG:
+            session.feedback_text = random.choice(NEGATIVE_FEEDBACK)
+            # TODO we need to show points reduction
+            if sound_on:
+                buzz_failure()
+        else:
+            break
+        session.phase = PHASE_FEEDBACK
+        await wait_or_skip(session, FEEDBACK_DISPLAY_MS)
+
+    # time is up - show splash and kill the game
+    ge.register_expired_timer()
+    session.phase = PHASE_GAME_OVER
+    if sound_on:
+        buzz_game_over()
+    # only kept in ram here, the menu flushes the stats once the splash is gone
+    engine.stats.record_game(DIFFICULTY_IDS[difficulty], ge.points)
+    if ge.speed is not None and log.enabled(log.LEVEL_DEBUG):
+        log.debug(ge.speed.stats())
+    if recorder is not None:
+        recorder.game_end(ge.points)
+    await wait_or_skip(session, GAME_OVER_SPLASH_SCREEN_DISPLAY_MS)
+    if recorder is not None:
+        recorder.flush()
+
+    for task in tasks:
+        task.cancel()
+    if PRINT_SPRITE_CACHE_STATS:
+        print(render.sprite_cache.stats())
+    return ge.points
+
+
+class FreeKeyingSession:
+    # shared by free keying and its input task
+
+    def __init__(self, sound_on):
+        self.decoder = MorseDecoder()
+        self.sound_on = sound_on
+        thresholds = keying_thresholds(MENU_ITEM_EASY)
+        self.classifier = PressClassifier(*thresholds)
+        self.speed = KeyingSpeed(*thresholds) if ADAPTIVE_KEYING else None
+        self.done = False
+
+
+async def free_keying_input_task(session):
+    # a letter ends at the space gap and a word at the timeout, a long hold leaves
+    decoder = session.decoder
+    classifier = session.classifier
+    while True:
+        with prof[PROF_INPUT]:
+            event = classifier.next_event(hardware.button_edges, time.ticks_us())
+            while event != EVENT_NONE:
+                if event == EVENT_SHORT:
+                    decoder.symbol(SHORT_SYMBOL)
+                    if session.sound_on:
+                        hardware.audio.beep(BUZZ_SHORT_CLICK_DUR_MS, BUZZ_SHORT_CLICK_FREQ_HZ)
+                elif event == EVENT_LONG:
+                    decoder.symbol(LONG_SYMBOL)
+                    if session.sound_on:
+                        hardware.audio.beep(BUZZ_LONG_CLICK_DUR_MS, BUZZ_LONG_CLICK_FREQ_HZ)
+                elif event == EVENT_SPACE:
+                    decoder.letter_end()
+                elif event == EVENT_TIMEOUT:
+                    decoder.word_end()
+                event = classifier.next_event(hardware.button_edges, time.ticks_us())
+            if classifier.held_us(classifier.last_poll_us) > FREE_KEYING_EXIT_HOLD_MS * 1000:
+                session.done = True
+        await sleep_ms(INPUT_POLL_MS)
+
+
+async def free_keying_loop(sound_on):
+    session = FreeKeyingSession(sound_on)
+    # the hold that selected free keying is no dash
+    while hardware.button_capture.pressed:
+        await sleep_ms(INPUT_POLL_MS)
+    reset_button_input(session.classifier)
+    session.classifier.use_speed(session.speed)
+    input_task = scheduler.create_task(free_keying_input_task(session))
+    pacer = FramePacer(REFRESH_RATE_MS)
+    while not session.done:
+        heap_monitor.frame_start()
+        wpm = session.speed.wpm() if session.speed is not None and session.speed.dots else 0
+        draw_free_keying_screen(session.decoder, wpm)
+        heap_monitor.frame_done()
+        profile_frame_done()
+        await pacer.wait()
+    input_task.cancel()
+    # nor must the hold that leaves select a menu item
+    while hardware.button_capture.pressed:
+        await sleep_ms(INPUT_POLL_MS)
+    if log.enabled(log.LEVEL_DEBUG):
+        log.debug('free keying: {} characters, {} unknown'.format(session.decoder.count, session.decoder.unknown))
+
+
+def reset_button_input(classifier):
+    # drop the edges captured while nobody was listening (splashes, sounds) and start from the current state
+    hardware.button_edges.clear()
+    classifier.reset(time.ticks_us(), hardware.button_capture.pressed)
+
+
+async def app():
+    scheduler.create_task(hardware.audio.run_async())
+    await main_menu_loop()
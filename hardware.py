@@ -0,0 +1,44 @@
+from machine import Pin, SoftI2C, I2C, SPI, PWM
+
+from settings import *
+from oled import DirtyPageDisplay
+from display_bus import I2CBus, SPIBus, MemoryBus
+from audio import AudioSequencer
+from button_input import EdgeQueue, ButtonCapture
+
+# created by init(), importing this module touches no hardware
+i2c = None  # the display's i2c, None when it is wired otherwise
+display_bus = None  # counts the transactions, bytes and time of the display writes
+display = None  # pushes only the changed pages
+button = None
+button_edges = None
+button_capture = None  # timestamps button edges from the pin irq
+buzzer_pwm = None
+audio = None  # the only owner of buzzer_pwm, runs as a task started by game.app()
+
+
+def init():
+    global i2c, display_bus, display, button, button_edges, button_capture, buzzer_pwm, audio
+    if display is not None:
+        return
+    display_bus = make_display_bus()
+    display = DirtyPageDisplay(SCREEN_WIDTH, SCREEN_HEIGHT, display_bus)
+    button = Pin(4, Pin.IN, Pin.PULL_UP)
+    button_edges = EdgeQueue()
+    button_capture = ButtonCapture(button, button_edges)
+    buzzer_pwm = PWM(Pin(23, Pin.OUT))
+    audio = AudioSequencer(buzzer_pwm)
+
+
+def make_display_bus():
+    global i2c
+    if DISPLAY_BUS == DISPLAY_BUS_I2C:
+        i2c = I2C(DISPLAY_I2C_ID, scl=Pin(DISPLAY_SCL_PIN), sda=Pin(DISPLAY_SDA_PIN), freq=DISPLAY_I2C_FREQ)
+        return I2CBus(i2c, name='i2c')
+    if DISPLAY_BUS == DISPLAY_BUS_SPI:
+        spi = SPI(DISPLAY_SPI_ID, baudrate=DISPLAY_SPI_BAUDRATE, sck=Pin(DISPLAY_SCK_PIN), mosi=Pin(DISPLAY_MOSI_PIN))
+        return SPIBus(spi, Pin(DISPLAY_DC_PIN), Pin(DISPLAY_CS_PIN), Pin(DISPLAY_RES_PIN))
+    if DISPLAY_BUS == DISPLAY_BUS_MEMORY:
+        return MemoryBus(SCREEN_WIDTH, SCREEN_HEIGHT // 8)
+    i2c = SoftI2C(scl=Pin(DISPLAY_SCL_PIN), sda=Pin(DISPLAY_SDA_PIN), freq=DISPLAY_SOFT_I2C_FREQ)
+    return I2CBus(i2c, name='soft i2c')
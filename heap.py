@@ -0,0 +1,68 @@
+import gc
+from time import ticks_us, ticks_diff
+
+try:
+    mem_alloc = gc.mem_alloc
+except AttributeError:
+    # cpython has no heap counters - every frame looks allocation free on a host
+    def mem_alloc():
+        return 0
+
+
+class HeapMonitor:
+    # counts the gc heap bytes allocated by every frame and times the collections we schedule.
+    # the heap only shrinks when the gc ran, so a frame that ends with less allocated than it
+    # started with was hit by an automatic collection - exactly the hitch the safe points avoid
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.frame_start_bytes = 0
+        self.last_frame_bytes = 0
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.alloc_frames = 0  # frames that allocated anything at all
+        self.total_bytes = 0
+        self.max_frame_bytes = 0
+        self.auto_collections = 0
+        self.collections = 0
+        self.total_pause_us = 0
+        self.max_pause_us = 0
+
+    def frame_start(self):
+        if self.enabled:
+            self.frame_start_bytes = mem_alloc()
+
+    def frame_done(self):
+        if not self.enabled:
+            return
+        frame_bytes = mem_alloc() - self.frame_start_bytes
+        self.frames += 1
+        if frame_bytes < 0:
+            # what the frame allocated is lost in the collection
+            self.auto_collections += 1
+            frame_bytes = 0
+        self.last_frame_bytes = frame_bytes
+        if frame_bytes:
+            self.alloc_frames += 1
+            self.total_bytes += frame_bytes
+            if frame_bytes > self.max_frame_bytes:
+                self.max_frame_bytes = frame_bytes
+
+    def collect(self):
+        # a scheduled collection at a point where a pause can't be seen, always runs
+        start_us = ticks_us()
+        gc.collect()
+        pause_us = ticks_diff(ticks_us(), start_us)
+        self.collections += 1
+        self.total_pause_us += pause_us
+        if pause_us > self.max_pause_us:
+            self.max_pause_us = pause_us
+        return pause_us
+
+    def stats(self):
+        return 'heap: {} of {} frames allocated, {} bytes ({} max/frame), {} auto gc, ' \
+               '{} scheduled gc ({} us max, {} us total)'.format(
+                   self.alloc_frames, self.frames, self.total_bytes, self.max_frame_bytes, self.auto_collections,
+                   self.collections, self.max_pause_us, self.total_pause_us)
@@ -0,0 +1,278 @@
+import os
+from time import ticks_diff, ticks_add
+
+import log
+from button_input import EDGE_PRESS, EDGE_RELEASE
+
+# compact binary input trace, appended game after game:
+#   header  : magic
+#   records : tag byte and its payload. times are zigzag varint deltas (us) to the previous timed
+#             record, the GAME record sets the base
+#     GAME       difficulty byte, rng seed u32, ticks_us u32
+#     WORD       length byte, letters
+#     RESET      pressed byte, time      keying starts, the classifier is reset
+#     PRESS      time                    a button edge as the classifier consumed it, with its
+#     RELEASE    time                    timestamp from the pin irq
+#     EVENT + n                          the classifier emitted event n (EVENT_SHORT, ...)
+#     ROUND_END  time of the last input poll, outcome byte (engine.OUTCOME_*), points varint
+#     GAME_END   points varint
+#     LOST                               the buffer was full, the rest of the round is missing
+# records are only ever appended, a torn write at the end loses just the last records
+TRACE_MAGIC = b'MTR1'
+TRACE_GAME = 1
+TRACE_WORD = 2
+TRACE_RESET = 3
+TRACE_PRESS = 4
+TRACE_RELEASE = 5
+TRACE_ROUND_END = 6
+TRACE_GAME_END = 7
+TRACE_LOST = 8
+TRACE_EVENT = 16  # + the event
+
+TRACE_BUFFER_SIZE = 512  # a keyed round takes some 100 bytes
+TRACE_MAX_FILE_BYTES = 65536
+VARINT_MAX_SIZE = 5  # 32 bits
+
+
+class TraceError(Exception):
+    pass
+
+
+class TraceRecorder:
+    # records go into a preallocated buffer that only flush() writes to flash - the game calls it
+    # between words. a full buffer drops the rest of the round instead of writing in the middle of it
+
+    def __init__(self, filename, buffer_size=TRACE_BUFFER_SIZE, max_file_bytes=TRACE_MAX_FILE_BYTES):
+        self.filename = filename
+        self.buffer = bytearray(buffer_size)
+        self.used = 0
+        self.last_us = 0
+        self.active = False  # edges and events are only recorded while a word is keyed
+        self.lost = False
+        self.dropped = 0  # records lost to a full buffer or a full trace file
+        self.max_file_bytes = max_file_bytes
+        try:
+            self.file_bytes = os.stat(filename)[6]
+        except OSError:
+            self.file_bytes = 0
+
+    def _room(self, size):
+        # one byte always stays free for the LOST marker
+        if self.lost:
+            self.dropped += 1
+            return False
+        if self.used + size >= len(self.buffer):
+            self.buffer[self.used] = TRACE_LOST
+            self.used += 1
+            self.lost = True
+            self.dropped += 1
+            return False
+        return True
+
+    def _put(self, value):
+        self.buffer[self.used] = value
+        self.used += 1
+
+    def _put_u32(self, value):
+        for _ in range(4):
+            self._put(value & 0xFF)
+            value >>= 8
+
+    def _put_varint(self, value):
+        while value > 0x7F:
+            self._put((value & 0x7F) | 0x80)
+            value >>= 7
+        self._put(value)
+
+    def _put_time(self, t_us):
+        delta = ticks_diff(t_us, self.last_us)
+        self.last_us = t_us
+        self._put_varint(delta << 1 if delta >= 0 else ((-delta) << 1) - 1)
+
+    def game_start(self, difficulty, seed, t_us):
+        if not self._room(10):
+            return
+        self._put(TRACE_GAME)
+        self._put(difficulty)
+        self._put_u32(seed)
+        self._put_u32(t_us)
+        self.last_us = t_us
+
+    def word(self, word):
+        if not self._room(2 + len(word)):
+            return
+        self._put(TRACE_WORD)
+        self._put(len(word))
+        for ch in word:
+            self._put(ord(ch))
+
+    def reset(self, t_us, pressed):
+        self.active = True
+        if not self._room(2 + VARINT_MAX_SIZE):
+            return
+        self._put(TRACE_RESET)
+        self._put(1 if pressed else 0)
+        self._put_time(t_us)
+
+    def edge(self, edge, t_us):
+        if not self.active or not self._room(1 + VARINT_MAX_SIZE):
+            return
+        self._put(TRACE_PRESS if edge == EDGE_PRESS else TRACE_RELEASE)
+        self._put_time(t_us)
+
+    def event(self, event):
+        if not self.active or not self._room(1):
+            return
+        self._put(TRACE_EVENT + event)
+
+    def round_end(self, last_poll_us, outcome, points):
+        self.active = False
+        if not self._room(2 + 2 * VARINT_MAX_SIZE):
+            return
+        self._put(TRACE_ROUND_END)
+        self._put_time(last_poll_us)
+        self._put(outcome)
+        self._put_varint(points)
+
+    def game_end(self, points):
+        self.active = False
+        if not self._room(1 + VARINT_MAX_SIZE):
+            return
+        self._put(TRACE_GAME_END)
+        self._put_varint(points)
+
+    def flush(self):
+        # writes to flash - only between words or after a game
+        used = self.used
+        self.used = 0
+        self.lost = False
+        if used == 0:
+            return
+        header = self.file_bytes == 0
+        size = used + (len(TRACE_MAGIC) if header else 0)
+        if self.file_bytes + size > self.max_file_bytes:
+            self.dropped += 1
+            return
+        try:
+            with open(self.filename, 'ab') as f:
+                if header:
+                    f.write(TRACE_MAGIC)
+                f.write(memoryview(self.buffer)[:used])
+        except OSError as e:
+            log.error('trace: {}'.format(e))
+            self.dropped += 1
+            return
+        self.file_bytes += size
+
+
+class TraceRound:
+    def __init__(self, word):
+        self.word = word
+        self.reset_us = 0
+        self.pressed = False
+        self.edges = []  # (edge, ticks_us) as the classifier consumed them
+        self.events = bytearray()  # what the classifier emitted
+        self.end_us = 0  # the last input poll of the round
+        self.outcome = -1  # -1 if the round never ended in the trace
+        self.points = 0
+        self.lost = False
+
+
+class TraceGame:
+    def __init__(self, difficulty, seed, start_us):
+        self.difficulty = difficulty
+        self.seed = seed
+        self.start_us = start_us
+        self.rounds = []
+        self.points = -1  # -1 if the game never ended in the trace
+
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+def read_time(data, pos, last_us):
+    zigzag, pos = read_varint(data, pos)
+    delta = zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+    return ticks_add(last_us, delta), pos
+
+
+def parse_trace(data):
+    # the games of a trace, a torn record at the end is ignored
+    if data[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+        raise TraceError('not a trace')
+    games = []
+    game = None
+    rnd = None
+    last_us = 0
+    pos = len(TRACE_MAGIC)
+    try:
+        while pos < len(data):
+            tag = data[pos]
+            pos += 1
+            if tag == TRACE_GAME:
+                if pos + 9 > len(data):
+                    break
+                difficulty = data[pos]
+                seed = int.from_bytes(data[pos + 1:pos + 5], 'little')
+                last_us = int.from_bytes(data[pos + 5:pos + 9], 'little')
+                pos += 9
+                game = TraceGame(difficulty, seed, last_us)
+                games.append(game)
+                rnd = None
+            elif tag == TRACE_WORD:
+                length = data[pos]
+                if pos + 1 + length > len(data):
+                    break
+                rnd = TraceRound(bytes(data[pos + 1:pos + 1 + length]).decode())
+                pos += 1 + length
+                if game is not None:
+                    game.rounds.append(rnd)
+            elif tag == TRACE_RESET:
+                pressed = data[pos] != 0
+                reset_us, pos = read_time(data, pos + 1, last_us)
+                last_us = reset_us
+                if rnd is not None:
+                    rnd.pressed = pressed
+                    rnd.reset_us = reset_us
+            elif tag == TRACE_PRESS or tag == TRACE_RELEASE:
+                last_us, pos = read_time(data, pos, last_us)
+                if rnd is not None:
+                    rnd.edges.append((EDGE_PRESS if tag == TRACE_PRESS else EDGE_RELEASE, last_us))
+            elif tag == TRACE_ROUND_END:
+                end_us, pos = read_time(data, pos, last_us)
+                last_us = end_us
+                outcome = data[pos]
+                points, pos = read_varint(data, pos + 1)
+                if rnd is not None:
+                    rnd.end_us = end_us
+                    rnd.outcome = outcome
+                    rnd.points = points
+            elif tag == TRACE_GAME_END:
+                points, pos = read_varint(data, pos)
+                if game is not None:
+                    game.points = points
+            elif tag == TRACE_LOST:
+                if rnd is not None:
+                    rnd.lost = True
+            elif tag >= TRACE_EVENT:
+                if rnd is not None:
+                    rnd.events.append(tag - TRACE_EVENT)
+            else:
+                raise TraceError('bad record {} at {}'.format(tag, pos - 1))
+    except IndexError:
+        pass  # torn at the end
+    return games
+
+
+def read_trace(filename):
+    with open(filename, 'rb') as f:
+        return parse_trace(f.read())
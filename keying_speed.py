@@ -0,0 +1,123 @@
+from settings import *
+
+# learns the player's keying speed while they play. press durations and the gaps between presses
+# are each split into two clusters - dots and dashes, gaps within a letter and gaps between letters -
+# at the middle between the clusters' running averages, and every new sample moves its cluster's
+# average 1 / 2**KEYING_EMA_SHIFT of the way. a cluster nothing was seen of yet follows the other
+# one at morse's 1:3 ratio, and the gaps start out at the dot and the dash length - so a player
+# far off the fixed thresholds is still split right. the thresholds then sit in the middle between
+# the clusters. the sequence end is set like a retransmission timeout, the average letter gap plus
+# KEYING_TIMEOUT_DEVIATIONS times its average deviation - and as a gap that ran into it is never
+# seen whole, the timeout itself counts as a letter gap then, or a too short timeout would only
+# ever see the letter gaps shorter than itself and keep shrinking. all times are integer us,
+# feeding a sample never allocates
+MORSE_UNIT_US_AT_1_WPM = 1200000  # the dot of PARIS keyed once a minute
+
+
+def clamp(value, lo, hi):
+    if value < lo:
+        return lo
+    if value > hi:
+        return hi
+    return value
+
+
+class KeyingSpeed:
+
+    def __init__(self, short_thr_ms, space_thr_ms, timeout_thr_ms):
+        # the fixed thresholds stay in use until both clusters of their kind were seen and
+        # KEYING_WARMUP_SAMPLES samples of the kind taken
+        self.default_short_thr_us = short_thr_ms * 1000
+        self.default_space_thr_us = space_thr_ms * 1000
+        self.default_timeout_thr_us = timeout_thr_ms * 1000
+        self.reset()
+
+    def reset(self):
+        self.short_thr_us = self.default_short_thr_us
+        self.space_thr_us = self.default_space_thr_us
+        self.timeout_thr_us = self.default_timeout_thr_us
+        self.dot_us = self.short_thr_us // 2
+        self.dash_us = self.short_thr_us * 3 // 2
+        self.symbol_gap_us = self.dot_us
+        self.letter_gap_us = self.dash_us
+        self.letter_gap_dev_us = self.letter_gap_us // 4
+        self.dots = 0
+        self.dashes = 0
+        self.symbol_gaps = 0
+        self.letter_gaps = 0
+
+    def press(self, duration_us):
+        if duration_us * 2 <= self.dot_us + self.dash_us:
+            self.dot_us = self.average(self.dot_us, duration_us, self.dots)
+            self.dots += 1
+        else:
+            self.dash_us = self.average(self.dash_us, duration_us, self.dashes)
+            self.dashes += 1
+        if not self.dashes:
+            self.dash_us = self.dot_us * 3
+        elif not self.dots:
+            self.dot_us = self.dash_us // 3
+        if not self.symbol_gaps and not self.letter_gaps:
+            self.symbol_gap_us = self.dot_us
+            self.letter_gap_us = self.dash_us
+            self.letter_gap_dev_us = self.letter_gap_us // 4
+        if self.dots and self.dashes and self.dots + self.dashes >= KEYING_WARMUP_SAMPLES:
+            self.short_thr_us = clamp((self.dot_us + self.dash_us) // 2, KEYING_MIN_SHORT_MS * 1000,
+                                      KEYING_MAX_SHORT_MS * 1000)
+
+    def gap(self, duration_us):
+        # a gap between the release of a press and the next press of the same word
+        if duration_us * 2 <= self.symbol_gap_us + self.letter_gap_us:
+            self.symbol_gap_us = self.average(self.symbol_gap_us, duration_us, self.symbol_gaps)
+            self.symbol_gaps += 1
+        else:
+            self.letter_gap(duration_us)
+        if not self.letter_gaps:
+            self.letter_gap_us = self.symbol_gap_us * 3
+            self.letter_gap_dev_us = self.letter_gap_us // 4
+        elif not self.symbol_gaps:
+            self.symbol_gap_us = self.letter_gap_us // 3
+        self.update_gap_thresholds()
+
+    def stall(self):
+        # the timeout ran out, the gap was at least that long. only the average takes it, with the
+        # deviation as well every stall in a row would double the timeout's margin
+        self.letter_gap_us = self.average(self.letter_gap_us, self.timeout_thr_us, self.letter_gaps)
+        self.letter_gaps += 1
+        self.update_gap_thresholds()
+
+    def letter_gap(self, duration_us):
+        deviation_us = duration_us - self.letter_gap_us
+        if deviation_us < 0:
+            deviation_us = -deviation_us
+        if self.letter_gaps:
+            self.letter_gap_dev_us += (deviation_us - self.letter_gap_dev_us) >> KEYING_EMA_SHIFT
+        else:
+            self.letter_gap_dev_us = duration_us // 4
+        self.letter_gap_us = self.average(self.letter_gap_us, duration_us, self.letter_gaps)
+        self.letter_gaps += 1
+
+    def update_gap_thresholds(self):
+        if self.symbol_gaps and self.letter_gaps and self.symbol_gaps + self.letter_gaps >= KEYING_WARMUP_SAMPLES:
+            self.space_thr_us = clamp((self.symbol_gap_us + self.letter_gap_us) // 2, KEYING_MIN_SPACE_MS * 1000,
+                                      KEYING_MAX_SPACE_MS * 1000)
+            timeout_us = self.letter_gap_us + KEYING_TIMEOUT_DEVIATIONS * self.letter_gap_dev_us
+            if timeout_us < self.space_thr_us + KEYING_MIN_TIMEOUT_MARGIN_MS * 1000:
+                timeout_us = self.space_thr_us + KEYING_MIN_TIMEOUT_MARGIN_MS * 1000
+            self.timeout_thr_us = clamp(timeout_us, KEYING_MIN_TIMEOUT_MS * 1000, KEYING_MAX_TIMEOUT_MS * 1000)
+
+    @staticmethod
+    def average(mean_us, sample_us, count):
+        # the first sample replaces the prior
+        if count == 0:
+            return sample_us
+        return mean_us + ((sample_us - mean_us) >> KEYING_EMA_SHIFT)
+
+    def wpm(self):
+        return MORSE_UNIT_US_AT_1_WPM // self.dot_us if self.dot_us > 0 else 0
+
+    def stats(self):
+        return 'keying: {} wpm, dot {} dash {} ms, gaps {} / {}~{} ms -> short {} space {} timeout {} ms'.format(
+            self.wpm(), self.dot_us // 1000, self.dash_us // 1000, self.symbol_gap_us // 1000,
+            self.letter_gap_us // 1000, self.letter_gap_dev_us // 1000, self.short_thr_us // 1000, self.space_thr_us // 1000,
+            self.timeout_thr_us // 1000)
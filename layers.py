@@ -0,0 +1,33 @@
+import framebuf
+
+
+class SliceMaker:
+    def __getitem__(self, key):
+        return key
+
+
+WHOLE = SliceMaker()[:]  # built once - buffer[:] would allocate a new slice object every frame
+
+
+class Layer:
+    # a pre-rendered full screen background in the display's own MONO_VLSB layout. it is only
+    # redrawn when its key (the parameters its content depends on) changes, every other frame
+    # it is one buffer copy that replaces the display.fill(0) as well
+
+    def __init__(self, width, height, render):
+        self.buffer = bytearray(width * height // 8)
+        self.fb = framebuf.FrameBuffer(self.buffer, width, height, framebuf.MONO_VLSB)
+        self.render = render  # render(fb, key) draws the content
+        self.key = None
+        self.renders = 0
+
+    def invalidate(self):
+        self.key = None
+
+    def copy_to(self, display, key=True):
+        if key != self.key:
+            self.fb.fill(0)
+            self.render(self.fb, key)
+            self.key = key
+            self.renders += 1
+        display.buffer[WHOLE] = self.buffer
@@ -0,0 +1,41 @@
+# levelled debug output. messages are printed over the usb uart, which blocks, so anything on a
+# hot path should also sit behind a const() flag in the calling module, e.g.
+#     LOG_DEBUG = const(0)
+#     ...
+#     if LOG_DEBUG:
+#         log.debug('captured {}'.format(...))
+# the micropython compiler drops such a block completely, message formatting included
+LEVEL_OFF = 0
+LEVEL_ERROR = 1
+LEVEL_INFO = 2
+LEVEL_DEBUG = 3
+
+LEVEL_NAMES = ('', 'E', 'I', 'D')
+
+level = LEVEL_INFO
+
+
+def set_level(new_level):
+    global level
+    level = new_level
+
+
+def enabled(msg_level):
+    return msg_level <= level
+
+
+def log(msg_level, msg):
+    if msg_level <= level:
+        print(LEVEL_NAMES[msg_level], msg)
+
+
+def error(msg):
+    log(LEVEL_ERROR, msg)
+
+
+def info(msg):
+    log(LEVEL_INFO, msg)
+
+
+def debug(msg):
+    log(LEVEL_DEBUG, msg)
@@ -0,0 +1,110 @@
+SHORT_SYMBOL = '.'
+LONG_SYMBOL = '-'
+SPACE_SYMBOL = ' '
+
+CODE_PIXEL_BLOCK_SIZE = 4
+CODE_MIN_X_POS = 3
+
+MORSE_LETTERS = {
+    'A': '.-',
+    'B': '-...',
+    'C': '-.-.',
+    'D': '-..',
+    'E': '.',
+    'F': '..-.',
+    'G': '--.',
+    'H': '....',
+    'I': '..',
+    'J': '.---',
+    'K': '-.-',
+    'L': '.-..',
+    'M': '--',
+    'N': '-.',
+    'O': '---',
+    'P': '.--.',
+    'Q': '--.-',
+    'R': '.-.',
+    'S': '...',
+    'T': '-',
+    'U': '..-',
+    'V': '...-',
+    'W': '.--',
+    'X': '-..-',
+    'Y': '-.--',
+    'Z': '--..',
+}
+
+MORSE_DIGITS = {
+    '0': '-----',
+    '1': '.----',
+    '2': '..---',
+    '3': '...--',
+    '4': '....-',
+    '5': '.....',
+    '6': '-....',
+    '7': '--...',
+    '8': '---..',
+    '9': '----.',
+}
+
+MORSE_PUNCTUATION = {
+    '.': '.-.-.-',
+    ',': '--..--',
+    '?': '..--..',
+    "'": '.----.',
+    '!': '-.-.--',
+    '/': '-..-.',
+    '(': '-.--.',
+    ')': '-.--.-',
+    '&': '.-...',
+    ':': '---...',
+    ';': '-.-.-.',
+    '=': '-...-',
+    '+': '.-.-.',
+    '-': '-....-',
+    '_': '..--.-',
+    '"': '.-..-.',
+    '$': '...-..-',
+    '@': '.--.-.',
+}
+
+
+def translate_to_morse(word):
+    # a space between the words of a phrase is a second space symbol after the letter's, the strip
+    # shows the wider gap and the engine takes it with the letter gap
+    code = []
+    for c in word:
+        if c != ' ':
+            code.append(MORSE_LETTERS.get(c.upper()))
+        code.append(SPACE_SYMBOL)
+
+    return "".join(str(x) for x in code)
+
+
+def symbol_pixel_count(symbol):
+    if symbol == SHORT_SYMBOL:
+        return CODE_PIXEL_BLOCK_SIZE + 1
+    if symbol == LONG_SYMBOL:
+        return 2*CODE_PIXEL_BLOCK_SIZE + 1
+    if symbol == SPACE_SYMBOL:
+        return CODE_PIXEL_BLOCK_SIZE
+    return 0
+
+
+def code_pixel_count(code):
+    x = 0
+    for c in code:
+        x += symbol_pixel_count(c)
+
+    return x
+
+
+def code_view_width(screen_width):
+    return screen_width - 2 * CODE_MIN_X_POS
+
+
+def code_x_position(pixel_width, screen_width):
+    # centred, or at the left margin when the strip is wider than the screen and scrolls
+    if pixel_width > code_view_width(screen_width):
+        return CODE_MIN_X_POS
+    return int((screen_width - pixel_width) / 2)
@@ -0,0 +1,96 @@
+from morse_code import MORSE_LETTERS, MORSE_DIGITS, MORSE_PUNCTUATION, LONG_SYMBOL
+
+# decodes freely keyed morse as it comes in. the codes are a binary tree laid out in a bytearray
+# like a heap: the root is node 1, a dot goes from node n to 2n and a dash to 2n + 1, so a node's
+# index is its code with a leading 1 bit and the character there is one index away. every symbol
+# is a shift and an or - no strings built, no dict lookups, nothing allocated
+MAX_CODE_LENGTH = 7  # '$' is the longest
+DECODE_TREE_SIZE = 1 << (MAX_CODE_LENGTH + 1)
+MAX_PENDING_SYMBOLS = 16  # symbols kept of a letter that went on too long, the node stays a small int
+ROOT_NODE = 1
+UNKNOWN_CHAR = '*'  # a letter no code matched
+DECODER_TEXT_SIZE = 32  # decoded characters kept, must be a power of 2
+
+
+def code_node(code):
+    node = ROOT_NODE
+    for symbol in code:
+        node = node << 1 | (symbol == LONG_SYMBOL)
+    return node
+
+
+def build_decode_tree():
+    tree = bytearray(DECODE_TREE_SIZE)
+    for table in (MORSE_LETTERS, MORSE_DIGITS, MORSE_PUNCTUATION):
+        for char, code in table.items():
+            tree[code_node(code)] = ord(char)
+    return tree
+
+
+DECODE_TREE = build_decode_tree()
+UNKNOWN_ORD = ord(UNKNOWN_CHAR)
+SPACE_ORD = ord(' ')
+
+
+def decode_node(node):
+    # the character code of a node, 0 if there is none
+    return DECODE_TREE[node] if node < DECODE_TREE_SIZE else 0
+
+
+class MorseDecoder:
+    # the decoded text is a ring of the last DECODER_TEXT_SIZE character codes, count is how many
+    # were decoded in all. node and depth are the letter being keyed
+
+    def __init__(self):
+        self.text = bytearray(DECODER_TEXT_SIZE)
+        self.mask = DECODER_TEXT_SIZE - 1
+        self.count = 0
+        self.node = ROOT_NODE
+        self.depth = 0
+        self.unknown = 0
+
+    def reset(self):
+        self.count = 0
+        self.node = ROOT_NODE
+        self.depth = 0
+        self.unknown = 0
+
+    def symbol(self, symbol):
+        if self.depth < MAX_PENDING_SYMBOLS:
+            self.node = self.node << 1 | (symbol == LONG_SYMBOL)
+            self.depth += 1
+
+    def letter_end(self):
+        # the gap after a letter, returns its character code - 0 if nothing was keyed
+        if self.depth == 0:
+            return 0
+        char = decode_node(self.node)
+        if not char:
+            char = UNKNOWN_ORD
+            self.unknown += 1
+        self.append(char)
+        self.node = ROOT_NODE
+        self.depth = 0
+        return char
+
+    def word_end(self):
+        # the gap after a word, one space however long it was
+        self.letter_end()
+        if self.count and self.char_at(self.count - 1) != SPACE_ORD:
+            self.append(SPACE_ORD)
+
+    def append(self, char):
+        self.text[self.count & self.mask] = char
+        self.count += 1
+
+    def char_at(self, i):
+        # character code i of all decoded, only the last DECODER_TEXT_SIZE are kept
+        return self.text[i & self.mask]
+
+    def pending_char(self):
+        # what the letter keyed so far would decode to, 0 if nothing (yet)
+        return decode_node(self.node) if self.depth else 0
+
+    def pending_dash(self, i):
+        # 1 if symbol i of the letter being keyed is a dash, 0 for a dot
+        return self.node >> (self.depth - 1 - i) & 1
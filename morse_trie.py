@@ -0,0 +1,137 @@
+import struct
+from array import array
+
+from morse_code import SHORT_SYMBOL, LONG_SYMBOL, SPACE_SYMBOL
+
+# every morse code of a word bank (the codes of translate_to_morse, a space after every letter) in
+# one trie of flat arrays. the nodes are numbered breadth first, so the children of a node are
+# next to each other: flags[node] has a bit per symbol that has a child and TRIE_WORD if a code
+# ends there, first[node] is the index of its first child and the child of a symbol is that plus
+# the number of children before it. a step is two lookups and nothing is allocated. on flash,
+# little endian:
+#   header : magic, index size (2 or 4), node count
+#   flags  : a byte per node
+#   first  : an index per node
+# both arrays are read straight into their buffers on load
+MORSE_TRIE_MAGIC = b'MTR1'
+MORSE_TRIE_HEADER_FORMAT = '<4sBxxxI'
+MORSE_TRIE_HEADER_SIZE = struct.calcsize(MORSE_TRIE_HEADER_FORMAT)
+
+# the children of a node are in the order of the code strings - ' ' < '-' < '.'
+TRIE_SPACE = 0x01
+TRIE_LONG = 0x02
+TRIE_SHORT = 0x04
+TRIE_WORD = 0x08
+TRIE_CHILDREN = TRIE_SPACE | TRIE_LONG | TRIE_SHORT
+CHILDREN_BELOW = bytes((0, 0, 1, 0, 3))  # by a symbol's bit, the mask of the symbols ordered before it
+CHILD_COUNTS = bytes((0, 1, 1, 2, 1, 2, 2, 3))  # by a mask, the children in it
+ROOT_NODE = 0
+NO_NODE = -1
+
+
+class MorseTrieError(Exception):
+    pass
+
+
+def symbol_bit(symbol):
+    if symbol == SHORT_SYMBOL:
+        return TRIE_SHORT
+    if symbol == LONG_SYMBOL:
+        return TRIE_LONG
+    if symbol == SPACE_SYMBOL:
+        return TRIE_SPACE
+    return 0
+
+
+class MorseTrie:
+
+    def __init__(self, flags, first):
+        self.flags = flags
+        self.first = first
+
+    def __len__(self):
+        return len(self.flags)
+
+    def child(self, node, symbol):
+        # the node after symbol, NO_NODE if no code goes on with it
+        flags = self.flags[node]
+        bit = symbol_bit(symbol)
+        if not flags & bit:
+            return NO_NODE
+        return self.first[node] + CHILD_COUNTS[flags & CHILDREN_BELOW[bit]]
+
+    def walk(self, code, node=ROOT_NODE):
+        for symbol in code:
+            node = self.child(node, symbol)
+            if node == NO_NODE:
+                break
+        return node
+
+    def is_word(self, node):
+        return self.flags[node] & TRIE_WORD
+
+    def has_children(self, node):
+        return self.flags[node] & TRIE_CHILDREN
+
+    def byte_size(self):
+        return len(self.flags) * (1 + self.first.itemsize)
+
+    @staticmethod
+    def build(codes):
+        # level by level over the sorted codes: the codes of a node are next to each other in the
+        # sort, and so are the nodes of a level, in breadth first order
+        codes = sorted(set(codes))
+        flags = bytearray(1)
+        first = array('I', [0])
+        nodes = array('i', [ROOT_NODE] * len(codes))  # the node every code is at, -1 once it ended
+        depth = 0
+        while True:
+            parent = NO_NODE
+            bit = 0
+            node = NO_NODE
+            advanced = False
+            for i in range(len(codes)):
+                if nodes[i] == NO_NODE:
+                    continue
+                code = codes[i]
+                if len(code) == depth:
+                    flags[nodes[i]] |= TRIE_WORD
+                    nodes[i] = NO_NODE
+                    continue
+                symbol = symbol_bit(code[depth])
+                if not symbol:
+                    raise MorseTrieError('not a morse code: ' + code)
+                if nodes[i] != parent or symbol != bit:
+                    if nodes[i] != parent:
+                        parent = nodes[i]
+                        first[parent] = len(flags)
+                    bit = symbol
+                    flags[parent] |= bit
+                    node = len(flags)
+                    flags.append(0)
+                    first.append(0)
+                nodes[i] = node
+                advanced = True
+            if not advanced:
+                break
+            depth += 1
+        if len(flags) <= 0x10000:
+            first = array('H', first)
+        return MorseTrie(flags, first)
+
+    def write(self, f):
+        f.write(struct.pack(MORSE_TRIE_HEADER_FORMAT, MORSE_TRIE_MAGIC, self.first.itemsize, len(self.flags)))
+        f.write(self.flags)
+        f.write(self.first)
+
+    @staticmethod
+    def load(filename):
+        with open(filename, 'rb') as f:
+            magic, index_size, count = struct.unpack(MORSE_TRIE_HEADER_FORMAT, f.read(MORSE_TRIE_HEADER_SIZE))
+            if magic != MORSE_TRIE_MAGIC or index_size not in (2, 4):
+                raise MorseTrieError('not a morse trie: ' + filename)
+            flags = bytearray(count)
+            first = array('H' if index_size == 2 else 'I', bytearray(count * index_size))
+            if f.readinto(flags) != count or f.readinto(first) != count * index_size:
+                raise MorseTrieError('truncated morse trie: ' + filename)
+        return MorseTrie(flags, first)
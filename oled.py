@@ -0,0 +1,160 @@
+from array import array
+
+import ssd1306
+
+try:
+    from micropython import native
+except ImportError:
+    # running on a host - no native code emitter
+    def native(f):
+        return f
+
+SET_COL_ADDR = 0x21
+SET_PAGE_ADDR = 0x22
+
+WINDOW_CMD_BYTES = 6  # column + page address window
+DATA_VIEW_CACHE_SIZE = 48  # column runs kept as memoryviews, a steady screen keeps sending the same ones
+
+
+@native
+def first_dirty_col(buf, sent, start, end):
+    while start < end and buf[start] == sent[start]:
+        start += 1
+    return start
+
+
+@native
+def last_dirty_col(buf, sent, start, end):
+    # assumes at least one dirty column in [start, end]
+    while buf[end] == sent[end]:
+        end -= 1
+    return end
+
+
+@native
+def copy_cols(buf, sent, start, end):
+    while start <= end:
+        sent[start] = buf[start]
+        start += 1
+
+
+class DirtyPageDisplay(ssd1306.SSD1306):
+    # keeps a copy of what the panel currently shows and on show() only pushes the changed column
+    # range of every 8-row page that differs from it - or, when that is cheaper on its bus, all
+    # pages from the first to the last changed one as a single window. the wires are a display_bus
+
+    def __init__(self, width, height, bus, external_vcc=False):
+        # base init calls show(), so our state has to exist before it
+        self.bus = bus
+        self.sent_buffer = bytearray((height // 8) * width)
+        self.runs = array('h', [0] * (height // 8 * 2))  # first and last dirty column of every page
+        self.force_full_frame = True
+        self.frame_bytes = 0
+        self.frame_windows = 0
+        self.total_bytes = 0
+        self.frame_count = 0
+        self.mv = None
+        self.data_views = {}  # x0 << 10 | x1 -> view of buffer[x0:x1 + 1]
+        super().__init__(width, height, external_vcc)
+
+    def write_cmd(self, cmd):
+        self.bus.cmd_buf[0] = cmd
+        self.bus.write_cmds(1)
+
+    def write_data(self, buf):
+        self.bus.write_data(buf)
+
+    def write_window(self, x0, x1, page0, page1):
+        col_offset = (128 - self.width) // 2  # narrow displays use centred columns
+        cmd = self.bus.cmd_buf
+        cmd[0] = SET_COL_ADDR
+        cmd[1] = col_offset + x0
+        cmd[2] = col_offset + x1
+        cmd[3] = SET_PAGE_ADDR
+        cmd[4] = page0
+        cmd[5] = page1
+        self.bus.write_cmds(WINDOW_CMD_BYTES)
+
+    def invalidate(self):
+        # next show() pushes the whole framebuffer (e.g. after the panel lost its ram)
+        self.force_full_frame = True
+
+    def poweron(self):
+        super().poweron()
+        self.invalidate()
+
+    def data_view(self, x0, x1):
+        # slicing a memoryview allocates, so the views of the runs seen so far are kept
+        key = x0 << 10 | x1
+        view = self.data_views.get(key)
+        if view is None:
+            view = self.mv[x0:x1 + 1]
+            if len(self.data_views) < DATA_VIEW_CACHE_SIZE:
+                self.data_views[key] = view
+        return view
+
+    def show(self):
+        buf = self.buffer
+        sent = self.sent_buffer
+        runs = self.runs
+        width = self.width
+        full = self.force_full_frame
+        if self.mv is None:
+            self.mv = memoryview(buf)
+        bus = self.bus
+        start_bytes = bus.bytes
+        first_page = -1
+        last_page = -1
+        run_bytes = 0
+        run_count = 0
+
+        for page in range(self.pages):
+            start = page * width
+            end = start + width
+            if full:
+                x0 = start
+                x1 = end - 1
+            else:
+                x0 = first_dirty_col(buf, sent, start, end)
+                if x0 == end:
+                    runs[2 * page] = -1
+                    continue
+                x1 = last_dirty_col(buf, sent, start, end - 1)
+            runs[2 * page] = x0
+            runs[2 * page + 1] = x1
+            if first_page < 0:
+                first_page = page
+            last_page = page
+            run_bytes += x1 + 1 - x0
+            run_count += 1
+
+        windows = 0
+        if first_page >= 0:
+            # a window costs its commands and two transactions, one big window sends the clean
+            # columns and pages in between as well
+            window_cost = WINDOW_CMD_BYTES + 2 * bus.transaction_cost
+            span_bytes = (last_page + 1 - first_page) * width
+            if span_bytes + window_cost <= run_bytes + run_count * window_cost:
+                x0 = first_page * width
+                x1 = (last_page + 1) * width - 1
+                self.write_window(0, width - 1, first_page, last_page)
+                bus.write_data(self.data_view(x0, x1))
+                copy_cols(buf, sent, x0, x1)
+                windows = 1
+            else:
+                for page in range(first_page, last_page + 1):
+                    x0 = runs[2 * page]
+                    if x0 < 0:
+                        continue
+                    x1 = runs[2 * page + 1]
+                    start = page * width
+                    self.write_window(x0 - start, x1 - start, page, page)
+                    bus.write_data(self.data_view(x0, x1))
+                    copy_cols(buf, sent, x0, x1)
+                    windows += 1
+
+        self.force_full_frame = False
+        self.frame_bytes = bus.bytes - start_bytes
+        self.frame_windows = windows
+        self.total_bytes += self.frame_bytes
+        self.frame_count += 1
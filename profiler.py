@@ -0,0 +1,125 @@
+from array import array
+from time import ticks_us, ticks_ms, ticks_diff
+
+# log2 histogram buckets: bucket 0 holds samples below PROFILE_BUCKET_BASE_US, bucket i holds
+# samples below PROFILE_BUCKET_BASE_US << i and the last bucket everything longer
+PROFILE_BUCKETS = 12
+PROFILE_BUCKET_BASE_US = 64
+PROFILE_WINDOW_MS = 1000
+
+
+def bucket_of(duration_us):
+    bucket = 0
+    duration_us //= PROFILE_BUCKET_BASE_US
+    while duration_us and bucket < PROFILE_BUCKETS - 1:
+        duration_us >>= 1
+        bucket += 1
+    return bucket
+
+
+class ProfileSection:
+    # context manager timing one section, created once per section so entering it doesn't allocate
+
+    def __init__(self, profiler, idx):
+        self.profiler = profiler
+        self.idx = idx
+        self.start_us = 0
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self.start_us = ticks_us()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.profiler.enabled:
+            self.profiler.add_sample(self.idx, ticks_diff(ticks_us(), self.start_us))
+        return False
+
+
+class Profiler:
+    # fixed-size per-section histograms plus frame rate / worst frame over a sliding window
+
+    def __init__(self, section_names, enabled=False):
+        count = len(section_names)
+        self.enabled = enabled
+        self.section_names = section_names
+        self.sections = [ProfileSection(self, i) for i in range(count)]
+        self.histograms = array('I', [0] * (count * PROFILE_BUCKETS))
+        self.samples = array('I', [0] * count)
+        self.total_us = array('Q', [0] * count)
+        self.max_us = array('I', [0] * count)
+
+        self.last_frame_us = ticks_us()
+        self.window_start_ms = ticks_ms()
+        self.window_frames = 0
+        self.window_worst_us = 0
+        self.fps = 0
+        self.worst_frame_us = 0
+        self.overlay_text = ''
+        self.last_dump_ms = ticks_ms()
+
+    def add_sample(self, idx, duration_us):
+        self.histograms[idx * PROFILE_BUCKETS + bucket_of(duration_us)] += 1
+        self.samples[idx] += 1
+        self.total_us[idx] += duration_us
+        if duration_us > self.max_us[idx]:
+            self.max_us[idx] = duration_us
+
+    def frame_done(self):
+        if not self.enabled:
+            return
+        now_us = ticks_us()
+        frame_us = ticks_diff(now_us, self.last_frame_us)
+        self.last_frame_us = now_us
+        self.window_frames += 1
+        if frame_us > self.window_worst_us:
+            self.window_worst_us = frame_us
+
+        now_ms = ticks_ms()
+        window_ms = ticks_diff(now_ms, self.window_start_ms)
+        if window_ms >= PROFILE_WINDOW_MS:
+            # the overlay text is only rebuilt once per window
+            self.fps = self.window_frames * 1000 // window_ms
+            self.worst_frame_us = self.window_worst_us
+            self.overlay_text = '{}f {}ms'.format(self.fps, self.worst_frame_us // 1000)
+            self.window_start_ms = now_ms
+            self.window_frames = 0
+            self.window_worst_us = 0
+
+    def draw_overlay(self, display, x, y):
+        if not self.enabled or not self.overlay_text:
+            return
+        display.fill_rect(x - 1, y, len(self.overlay_text) * 8 + 2, 8, 0)
+        display.text(self.overlay_text, x, y, 1)
+
+    def reset(self):
+        for i in range(len(self.histograms)):
+            self.histograms[i] = 0
+        for i in range(len(self.samples)):
+            self.samples[i] = 0
+            self.total_us[i] = 0
+            self.max_us[i] = 0
+
+    def maybe_dump(self, filename, interval_ms):
+        if not self.enabled:
+            return False
+        if ticks_diff(ticks_ms(), self.last_dump_ms) < interval_ms:
+            return False
+        self.dump(filename)
+        return True
+
+    def dump(self, filename):
+        # one csv line per section: name, samples, total us, max us, then the histogram buckets
+        with open(filename, 'w') as f:
+            f.write('section,samples,total_us,max_us')
+            for i in range(PROFILE_BUCKETS):
+                f.write(',lt{}us'.format(PROFILE_BUCKET_BASE_US << i) if i < PROFILE_BUCKETS - 1 else ',longer')
+            f.write('\n')
+            for idx in range(len(self.section_names)):
+                f.write('{},{},{},{}'.format(self.section_names[idx], self.samples[idx], self.total_us[idx],
+                                             self.max_us[idx]))
+                base = idx * PROFILE_BUCKETS
+                for i in range(PROFILE_BUCKETS):
+                    f.write(',{}'.format(self.histograms[base + i]))
+                f.write('\n')
+        self.last_dump_ms = ticks_ms()
@@ -0,0 +1,608 @@
+import math
+import random
+import framebuf
+from array import array
+
+from settings import *
+from morse_code import SHORT_SYMBOL, LONG_SYMBOL, SPACE_SYMBOL, CODE_PIXEL_BLOCK_SIZE, CODE_MIN_X_POS, code_pixel_count, \
+    symbol_pixel_count, code_view_width
+from morse_decoder import UNKNOWN_CHAR
+from profiler import Profiler
+from layers import Layer
+from sprites import SpriteCache
+import hardware
+
+SPRITE_WORD = 0
+SPRITE_CODE = 1
+SPRITE_POINTS = 2
+SPRITE_TIMER = 3
+SPRITE_TIMER_ALERT = 4
+POINTS_LABEL_WIDTH = 64
+TIMER_LABEL_WIDTH = 33
+TIMER_LABEL_HEIGHT = 9
+WORD_Y = SCREEN_HEIGHT // 2 + 2
+CODE_Y = SCREEN_HEIGHT // 2 + 18
+FEEDBACK_Y = 20
+FREE_TEXT_X = 4
+FREE_TEXT_COLUMNS = (SCREEN_WIDTH - 2 * FREE_TEXT_X) // 8  # the last one is the letter being keyed
+CODE_VIEW_WIDTH = code_view_width(SCREEN_WIDTH)
+SHORT_SYMBOL_WIDTH = symbol_pixel_count(SHORT_SYMBOL)
+LONG_SYMBOL_WIDTH = symbol_pixel_count(LONG_SYMBOL)
+SHORT_SYMBOL_ORD = ord(SHORT_SYMBOL)
+LONG_SYMBOL_ORD = ord(LONG_SYMBOL)
+
+# str(n) allocates, drawing these one digit at a time doesn't
+DIGIT_CHARS = ('0', '1', '2', '3', '4', '5', '6', '7', '8', '9')
+ASCII_CHARS = tuple(chr(i) for i in range(128))  # a decoded character code to its text
+
+profiler = Profiler(PROFILE_SECTION_NAMES, PROFILING)
+prof = profiler.sections  # prof[PROF_...] times the block of a with statement
+
+# set up by init()
+display = None
+menu_layer = None
+game_layer = None
+circle_sprites = ()
+sprite_cache = None
+
+
+def init(target_display):
+    # everything here draws on target_display, the static layers and sprites are built once
+    global display, menu_layer, game_layer, circle_sprites, sprite_cache
+    display = target_display
+    if menu_layer is not None:
+        return
+    # static backgrounds, drawn once and copied into the display buffer every frame
+    menu_layer = Layer(SCREEN_WIDTH, SCREEN_HEIGHT, render_menu_layer)
+    game_layer = Layer(SCREEN_WIDTH, SCREEN_HEIGHT, render_game_layer)
+    circle_sprites = build_circle_sprites(SIGNAL_CENTER_X, SIGNAL_CENTER_Y, SIGNAL_ANIMATION_MAX_RADIUS)
+    sprite_cache = SpriteCache(SPRITE_CACHE_BUDGET_BYTES)  # pre-rendered labels and code strips
+
+
+def restart_menu_animation():
+    global line_length
+    line_length = 0
+
+
+def draw_main_menu(x_pos, y_pos, items, selector_index, menu_selection_fill_width, high_score, sound_on):
+    global line_length
+    with prof[PROF_BACKGROUND]:
+        # the title joins the static layer once its underline has finished growing
+        menu_layer.copy_to(display, line_length >= MENU_TITLE_LINE_MAX_LENGTH)
+
+    with prof[PROF_MENU_ITEMS]:
+        # only MENU_VISIBLE_ITEMS fit under the title, the window keeps the selected one in it
+        first = max(0, min(selector_index - MENU_VISIBLE_ITEMS + 1, len(items) - MENU_VISIBLE_ITEMS))
+        y = y_pos
+        for i in range(first, min(len(items), first + MENU_VISIBLE_ITEMS)):
+            display.text(items[i], x_pos, y, 1)
+            y += MAIN_MENU_TEXT_PAD
+
+    with prof[PROF_SELECTOR]:
+        draw_menu_selector(x_pos, y_pos, selector_index - first)
+    with prof[PROF_FILL_BAR]:
+        draw_selector_fill_bar(x_pos, y_pos, selector_index - first, menu_selection_fill_width, sound_on)
+    with prof[PROF_SIGNAL_TOWER]:
+        draw_signal_tower()
+    with prof[PROF_HIGHSCORE]:
+        draw_highscore(high_score)
+    with prof[PROF_MENU_TITLE]:
+        if line_length < MENU_TITLE_LINE_MAX_LENGTH:
+            draw_menu_title(display)
+            line_length += 1
+    # draw_sound_icon(SCREEN_WIDTH - 16, 4, 12, sound_on)
+    draw_profile_overlay()
+    with prof[PROF_SHOW]:
+        display.show()
+    print_display_tx_bytes('menu')
+
+
+def draw_sound_icon(x_pos, y_pos, size, sound_on):
+    # sound_on = False
+    y_div = int(size / 3)
+    x_div = int(size / 2)
+    x_offset = int(size / 6) + 1
+
+    if sound_on:
+        display.fill_rect(x_pos + x_offset, y_pos + y_div, x_div, y_div, 1)
+
+        for i in range(y_div-1):
+            display.line(x_pos + x_div + i, y_pos + y_div - i, x_pos + x_div + i, y_pos + 2*y_div + i, 1)
+    else:
+        display.line(x_pos + x_offset, y_pos + y_div, x_pos + x_offset + x_div, y_pos + y_div, 1)
+        display.line(x_pos + x_offset, y_pos + y_div, x_pos + x_offset, y_pos + 2*y_div, 1)
+        display.line(x_pos + x_div, y_pos + y_div, x_pos + x_div, y_pos + 2*y_div, 1)
+        display.line(x_pos + x_offset, y_pos + 2*y_div, x_pos + x_offset + x_div, y_pos + 2*y_div, 1)
+
+        display.line(x_pos + x_div, y_pos + y_div, x_pos + 2*x_div, y_pos, 1)
+        display.line(x_pos + 2*x_div, y_pos, x_pos + 2*x_div, y_pos + 3*y_div, 1)
+        display.line(x_pos + x_div, y_pos + 2*y_div, x_pos + 2 * x_div, y_pos + 3*y_div, 1)
+
+line_length = 0
+def draw_menu_title(fb):
+    fb.text("MORSE", 20, 8, 1)
+    fb.text("ATTACK", 45, 19, 1)
+
+    fb.line(55, 17, 55 + line_length, 17, 1)
+    fb.line(55, 17, 55 - line_length, 17, 1)
+
+
+SIGNAL_TOWER_BASE_LEFT = SCREEN_WIDTH - 30
+SIGNAL_TOWER_BASE_RIGHT = SCREEN_WIDTH - 10
+SIGNAL_TOWER_HEIGHT = SCREEN_HEIGHT - 30
+SIGNAL_CENTER_X = SCREEN_WIDTH - (SIGNAL_TOWER_BASE_RIGHT - SIGNAL_TOWER_BASE_LEFT)
+SIGNAL_CENTER_Y = SIGNAL_TOWER_HEIGHT - 5
+
+
+def draw_signal_tower_base(fb):
+    base_left = SIGNAL_TOWER_BASE_LEFT
+    base_right = SIGNAL_TOWER_BASE_RIGHT
+    height = SIGNAL_TOWER_HEIGHT
+
+    fb.line(base_left, SCREEN_HEIGHT, SCREEN_WIDTH - (base_right - base_left), SCREEN_HEIGHT - height, 1)
+    fb.line(base_right, SCREEN_HEIGHT, SCREEN_WIDTH - (base_right - base_left), SCREEN_HEIGHT - height, 1)
+
+    fb.fill_rect(SCREEN_WIDTH - (base_right - base_left) - 1, SCREEN_HEIGHT - height - 3, 3, 3, 1)
+
+    fb.line(base_left + 2, SCREEN_HEIGHT - 8, base_right - 6, height + 8, 1)
+    fb.line(base_right - 2, SCREEN_HEIGHT - 8, base_left + 6, height + 8, 1)
+
+
+signal_radius = 1
+def draw_signal_tower():
+    # the tower itself is part of the menu layer, only its signal is animated
+    global signal_radius
+    with prof[PROF_CIRCLE]:
+        draw_circle(SIGNAL_CENTER_X, SIGNAL_CENTER_Y, signal_radius)
+    signal_radius += ANIMATION_SPEED
+    if signal_radius > SIGNAL_ANIMATION_MAX_RADIUS - random.randrange(0, 10):
+        signal_radius = 1
+
+
+def draw_circle(center_x, center_y, radius):
+    # one transparent blit of the pre-rendered outline, no trig and no line calls per frame
+    if center_x == SIGNAL_CENTER_X and center_y == SIGNAL_CENTER_Y and 0 < radius < len(circle_sprites):
+        display.blit(circle_sprites[radius], center_x - radius, center_y - radius, 0)
+    else:
+        draw_circle_fixed(display, center_x, center_y, radius)
+
+
+CIRCLE_SEGMENTS = 40
+CIRCLE_FRAC_BITS = 14
+
+
+def circle_angle(i):
+    # the last point closes the outline at exactly 2 pi, like draw_circle_segments()
+    return 2 * math.pi * (i / CIRCLE_SEGMENTS) if i < CIRCLE_SEGMENTS - 1 else 2 * math.pi
+
+
+# the segment end points on the unit circle in fixed point, computed once so drawing needs no floats
+CIRCLE_COS = array('h', [round(math.cos(circle_angle(i)) * (1 << CIRCLE_FRAC_BITS)) for i in range(CIRCLE_SEGMENTS)])
+CIRCLE_SIN = array('h', [round(math.sin(circle_angle(i)) * (1 << CIRCLE_FRAC_BITS)) for i in range(CIRCLE_SEGMENTS)])
+
+
+def draw_circle_fixed(fb, center_x, center_y, radius):
+    # integer only version of draw_circle_segments(). it rounds down where that one truncates the
+    # float, so a pixel can differ where the float lands within an ulp of a whole number
+    cx = center_x << CIRCLE_FRAC_BITS
+    cy = center_y << CIRCLE_FRAC_BITS
+    prev_x = (cx + radius * CIRCLE_COS[0]) >> CIRCLE_FRAC_BITS
+    prev_y = (cy + radius * CIRCLE_SIN[0]) >> CIRCLE_FRAC_BITS
+    for i in range(1, CIRCLE_SEGMENTS):
+        x = (cx + radius * CIRCLE_COS[i]) >> CIRCLE_FRAC_BITS
+        y = (cy + radius * CIRCLE_SIN[i]) >> CIRCLE_FRAC_BITS
+        fb.line(prev_x, prev_y, x, y, 1)
+        prev_x = x
+        prev_y = y
+
+
+def draw_circle_segments(fb, center_x, center_y, radius, origin_x=0, origin_y=0):
+    for i in range(CIRCLE_SEGMENTS):
+        angle = circle_angle(i)
+        x = center_x + radius * math.cos(angle)
+        y = center_y + radius * math.sin(angle)
+
+        if i > 0:
+            fb.line(int(prev_x) - origin_x, int(prev_y) - origin_y, int(x) - origin_x, int(y) - origin_y, 1)
+
+        prev_x, prev_y = x, y
+
+
+def build_circle_sprites(center_x, center_y, max_radius):
+    # the outline of every radius rendered once by the segment code itself, at the same centre and
+    # shifted into the sprite afterwards - the float rounding then matches too and blitting a sprite
+    # at that centre is pixel-identical to drawing the segments there
+    sprites = [None]
+    for radius in range(1, max_radius + 1):
+        size = 2 * radius + 1
+        sprite = framebuf.FrameBuffer(bytearray(size * ((size + 7) // 8)), size, size, framebuf.MONO_VLSB)
+        draw_circle_segments(sprite, center_x, center_y, radius, center_x - radius, center_y - radius)
+        sprites.append(sprite)
+    return sprites
+
+
+def draw_highscore(high_score):
+    if high_score is None:
+        return
+    draw_number(display, 8, SCREEN_HEIGHT - 8 - 8, high_score, 1)
+
+
+def number_length(value):
+    # len(str(value)) without building the string
+    length = 1
+    if value < 0:
+        length = 2
+        value = -value
+    while value >= 10:
+        value //= 10
+        length += 1
+    return length
+
+
+def draw_number(fb, x, y, value, color):
+    # same pixels as fb.text(str(value), x, y, color), drawn from the last digit backwards
+    if value < 0:
+        fb.text('-', x, y, color)
+        x += 8
+        value = -value
+    x += (number_length(value) - 1) * 8
+    while True:
+        fb.text(DIGIT_CHARS[value % 10], x, y, color)
+        value //= 10
+        if not value:
+            return
+        x -= 8
+
+
+def draw_menu_selector(x_pos, y_pos, selector_index):
+    x = x_pos - 10
+    y = y_pos + 1 + selector_index * MAIN_MENU_TEXT_PAD
+
+    display.line(x, y, x + 4, y + 2, 1)
+    display.line(x, y, x, y + 4, 1)
+    display.line(x, y + 4, x + 4, y + 2, 1)
+
+
+def draw_selector_fill_bar(x_pos, y_pos, selector_index, fill_width, sound_on):
+    x = x_pos
+    y = y_pos + selector_index * MAIN_MENU_TEXT_PAD - 3
+    fill = int(fill_width)
+    if fill == 0:
+        return
+    if sound_on:
+        # a newer fill tone replaces the one still waiting in the queue
+        hardware.audio.beep(REFRESH_RATE_MS // 2, fill * 200, cut_off=True)
+    display.line(x, y, x + fill, y, 1)
+    display.line(x, y + MENU_ITEM_MAX_HEIGHT + 3, x + fill, y + MENU_ITEM_MAX_HEIGHT + 3, 1)
+
+
+def draw_selector_fill_bar3(x_pos, y_pos, selector_index, fill_width):
+    x = x_pos - 2
+    y = y_pos + selector_index * MAIN_MENU_TEXT_PAD - 2
+    fill = int(fill_width)
+    if fill == 0:
+        return
+
+    print(fill)
+
+    if fill < MENU_ITEM_MAX_WIDTH:
+        display.line(x, y, x + fill, y, 1)
+    elif fill < (MENU_ITEM_MAX_WIDTH + MENU_ITEM_MAX_HEIGHT):
+        display.line(x, y, x + MENU_ITEM_MAX_WIDTH, y, 1)
+        display.line(x + MENU_ITEM_MAX_WIDTH, y, x + MENU_ITEM_MAX_WIDTH, y + fill, 1)
+    elif fill < (2 * MENU_ITEM_MAX_WIDTH + MENU_ITEM_MAX_HEIGHT):
+        display.line(x, y, x + MENU_ITEM_MAX_WIDTH, y, 1)
+        display.line(x + MENU_ITEM_MAX_WIDTH, y, x + MENU_ITEM_MAX_WIDTH, y + MENU_ITEM_MAX_HEIGHT, 1)
+        display.line(x + MENU_ITEM_MAX_WIDTH, y + MENU_ITEM_MAX_HEIGHT, x + MENU_ITEM_MAX_WIDTH - fill,
+                     y + MENU_ITEM_MAX_HEIGHT, 1)
+    elif fill < (2 * MENU_ITEM_MAX_WIDTH + 2 * MENU_ITEM_MAX_HEIGHT):
+        display.line(x, y, x + MENU_ITEM_MAX_WIDTH, y, 1)
+        display.line(x + MENU_ITEM_MAX_WIDTH, y, x + MENU_ITEM_MAX_WIDTH, y + MENU_ITEM_MAX_HEIGHT, 1)
+        display.line(x + MENU_ITEM_MAX_WIDTH, y + MENU_ITEM_MAX_HEIGHT, x, y + MENU_ITEM_MAX_HEIGHT, 1)
+        display.line(x, y + MENU_ITEM_MAX_HEIGHT, x, y + MENU_ITEM_MAX_HEIGHT - fill, 1)
+
+
+def draw_selector_fill_bar2(x_pos, y_pos, selector_index, fill_width):
+    # y = y_pos + selector_index * MAIN_MENU_TEXT_PAD - 1
+    # display.rect(x_pos, y, MENU_PROGRESS_BAR_WIDTH, 5, 1)
+    # display.fill_rect(x_pos, y, int(fill_width), MAIN_MENU_TEXT_PAD, 1)
+    fill_width = int(fill_width)
+    if fill_width < SCREEN_WIDTH:
+        display.hline(0, 0, fill_width, 1)
+    elif fill_width < (SCREEN_WIDTH + SCREEN_HEIGHT):
+        fill_width -= SCREEN_WIDTH - 1
+        display.hline(0, 0, SCREEN_WIDTH - 1, 1)
+        display.vline(SCREEN_WIDTH - 1, 0, -fill_width, 1)
+    elif fill_width < (2 * SCREEN_WIDTH + SCREEN_HEIGHT):
+        fill_width -= (SCREEN_WIDTH - 1 + SCREEN_HEIGHT - 1)
+        display.hline(0, 0, SCREEN_WIDTH - 1, 1)
+        display.vline(SCREEN_WIDTH - 1, 0, -(SCREEN_HEIGHT - 1), 1)
+        display.hline(SCREEN_WIDTH - 1, SCREEN_HEIGHT - 1, -fill_width, 1)
+    else:
+        fill_width -= (2 * (SCREEN_WIDTH - 1) + SCREEN_HEIGHT - 1)
+        display.hline(0, 0, SCREEN_WIDTH - 1, 1)
+        display.vline(SCREEN_WIDTH - 1, 0, -(SCREEN_HEIGHT - 1), 1)
+        display.hline(SCREEN_WIDTH - 1, SCREEN_HEIGHT - 1, -(SCREEN_WIDTH - 1), 1)
+        display.vline(0, SCREEN_HEIGHT - 1, fill_width, 1)
+
+
+def draw_game_screen(ge, code_x_pos, elapsed_sec, feedback_text=''):
+    with prof[PROF_BACKGROUND]:
+        game_layer.copy_to(display)
+    with prof[PROF_POINTS]:
+        draw_points(ge)
+    with prof[PROF_TIMER]:
+        draw_timer(elapsed_sec)
+    with prof[PROF_WORD]:
+        draw_word(ge, WORD_Y)
+    with prof[PROF_CODE_PIXELS]:
+        code_x_pos -= scroll_code_strip(ge)
+        if ge.open_answer:
+            draw_captured_pixels(ge, code_x_pos, CODE_Y)
+        else:
+            draw_code_pixels(ge, code_x_pos, CODE_Y)
+    with prof[PROF_PROGRESS_BAR]:
+        draw_progress_bar(ge, code_x_pos, CODE_Y)
+        if ge.code_width > CODE_VIEW_WIDTH:
+            clear_code_margins(CODE_Y)
+    if feedback_text:
+        display.text(feedback_text, (SCREEN_WIDTH - len(feedback_text) * 8) // 2, FEEDBACK_Y, 1)
+    draw_profile_overlay()
+    with prof[PROF_SHOW]:
+        display.show()
+    print_display_tx_bytes('game')
+
+
+def draw_profile_overlay():
+    # fps and worst frame time of the last second, over the top border
+    if PROFILE_OVERLAY:
+        profiler.draw_overlay(display, 40, 0)
+
+
+def profile_frame_done():
+    profiler.frame_done()
+    profiler.maybe_dump(PROFILE_FILE_NAME, PROFILE_DUMP_INTERVAL_MS)
+
+
+def draw_end_game_splash_screen(ge):
+    txt_x_pos = (SCREEN_WIDTH - len(TIMES_UP_TEXT) * 8) // 2
+    score_x_pos = (SCREEN_WIDTH - (len(SCORE_TEXT) + number_length(ge.points)) * 8) // 2
+    game_layer.copy_to(display)
+    display.text(TIMES_UP_TEXT, txt_x_pos, 20, 1)
+    display.text(SCORE_TEXT, score_x_pos, SCREEN_HEIGHT - 20, 1)
+    draw_number(display, score_x_pos + len(SCORE_TEXT) * 8, SCREEN_HEIGHT - 20, ge.points, 1)
+    draw_profile_overlay()
+    display.show()
+
+
+def draw_free_keying_screen(decoder, wpm):
+    with prof[PROF_BACKGROUND]:
+        game_layer.copy_to(display)
+    display.text(MENU_ITEM_FREE, 8, 8, 1)
+    if wpm:
+        x = SCREEN_WIDTH - 8 - (number_length(wpm) + len(WPM_TEXT)) * 8
+        draw_number(display, x, 8, wpm, 1)
+        display.text(WPM_TEXT, x + number_length(wpm) * 8, 8, 1)
+    with prof[PROF_WORD]:
+        draw_decoded_text(decoder, FREE_TEXT_X, WORD_Y)
+    with prof[PROF_CODE_PIXELS]:
+        draw_pending_code(decoder, CODE_Y)
+    draw_profile_overlay()
+    with prof[PROF_SHOW]:
+        display.show()
+    print_display_tx_bytes('free')
+
+
+def draw_decoded_text(decoder, x, y):
+    # the newest characters, moving left as more come in. the letter being keyed follows them,
+    # underlined, as what it would decode to so far
+    shown = decoder.count if decoder.count < FREE_TEXT_COLUMNS else FREE_TEXT_COLUMNS - 1
+    for i in range(decoder.count - shown, decoder.count):
+        display.text(ASCII_CHARS[decoder.char_at(i)], x, y, 1)
+        x += 8
+    char = decoder.pending_char()
+    if char:
+        display.text(ASCII_CHARS[char], x, y, 1)
+    elif decoder.depth:
+        display.text(UNKNOWN_CHAR, x, y, 1)
+    display.hline(x, y + 9, 7, 1)
+
+
+def draw_pending_code(decoder, y):
+    # the symbols of the letter being keyed, centred, straight from the decoder's tree node
+    width = 0
+    for i in range(decoder.depth):
+        width += LONG_SYMBOL_WIDTH if decoder.pending_dash(i) else SHORT_SYMBOL_WIDTH
+    x = (SCREEN_WIDTH - width) // 2
+    for i in range(decoder.depth):
+        if decoder.pending_dash(i):
+            display.fill_rect(x, y, 2 * CODE_PIXEL_BLOCK_SIZE, CODE_PIXEL_BLOCK_SIZE, 1)
+            x += LONG_SYMBOL_WIDTH
+        else:
+            display.fill_rect(x, y, CODE_PIXEL_BLOCK_SIZE, CODE_PIXEL_BLOCK_SIZE, 1)
+            x += SHORT_SYMBOL_WIDTH
+
+
+def print_display_tx_bytes(screen_name):
+    # the panel's counters - with RENDER_THREAD they are the last frame the render thread sent
+    if PRINT_DISPLAY_TX_BYTES:
+        display = hardware.display
+        print('{} frame: {} bytes in {} windows ({} avg)'.format(
+            screen_name, display.frame_bytes, display.frame_windows, display.total_bytes // display.frame_count))
+
+
+def draw_frame(fb):
+    fb.line(0, 0, SCREEN_WIDTH - 1, 0, 1)
+    fb.line(0, 0, 0, SCREEN_HEIGHT - 1, 1)
+    fb.line(SCREEN_WIDTH - 1, 0, SCREEN_WIDTH - 1, SCREEN_HEIGHT - 1, 1)
+    fb.line(0, SCREEN_HEIGHT - 1, SCREEN_WIDTH - 1, SCREEN_HEIGHT - 1, 1)
+
+
+def render_menu_layer(fb, title_done):
+    draw_frame(fb)
+    draw_signal_tower_base(fb)
+    if title_done:
+        draw_menu_title(fb)
+
+
+def render_game_layer(fb, key):
+    draw_frame(fb)
+
+
+def draw_points(ge):
+    if ZERO_ALLOC_FRAMES:
+        render_points_label(display, 8, 8, ge.points)
+        return
+    sprite = sprite_cache.get(SPRITE_POINTS, ge.points)
+    if sprite is None:
+        sprite = sprite_cache.put(SPRITE_POINTS, ge.points, POINTS_LABEL_WIDTH, 8)
+        if sprite is None:
+            render_points_label(display, 8, 8, ge.points)
+            return
+        render_points_label(sprite, 0, 0, ge.points)
+    display.blit(sprite, 8, 8, 0)
+
+
+def render_points_label(fb, x, y, points):
+    fb.text("P:", x, y, 1)
+    draw_number(fb, x + 16, y, points, 1)
+
+
+blink_count = int((1/REFRESH_RATE_MS) * 1000)
+
+
+def draw_timer(elapsed_sec):
+    global blink_count
+    time_left = GAME_TIMER_S - elapsed_sec
+    if time_left < 0:
+        time_left = 0
+
+    # the last seconds are drawn inverted
+    if ZERO_ALLOC_FRAMES:
+        render_timer_label(display, SCREEN_WIDTH - 41, 7, time_left)
+        return
+    kind = SPRITE_TIMER if time_left > 5 else SPRITE_TIMER_ALERT
+    sprite = sprite_cache.get(kind, time_left)
+    if sprite is None:
+        sprite = sprite_cache.put(kind, time_left, TIMER_LABEL_WIDTH, TIMER_LABEL_HEIGHT)
+        if sprite is None:
+            render_timer_label(display, SCREEN_WIDTH - 41, 7, time_left)
+            return
+        render_timer_label(sprite, 0, 0, time_left)
+    display.blit(sprite, SCREEN_WIDTH - 41, 7, 0)
+
+
+def render_timer_label(fb, x, y, time_left):
+    color = 1
+    if time_left <= 5:
+        fb.fill_rect(x, y, TIMER_LABEL_WIDTH, TIMER_LABEL_HEIGHT, 1)
+        color = 0
+    fb.text("T:", x + 1, y + 1, color)
+    draw_number(fb, x + 17, y + 1, time_left, color)
+
+
+def prepare_word(ge):
+    # builds the sprites of a new word before its round starts, so its first frame doesn't allocate them
+    global code_scroll_x
+    code_scroll_x = 0
+    word_sprite(ge.word)
+    code_sprite(ge.code)
+
+
+def word_sprite(word):
+    sprite = sprite_cache.get(SPRITE_WORD, word)
+    if sprite is None:
+        sprite = sprite_cache.put(SPRITE_WORD, word, len(word) * 8, 8)
+        if sprite is not None:
+            sprite.text(word, 0, 0, 1)
+    return sprite
+
+
+def code_sprite(code):
+    # the strip of a word never changes during its round
+    sprite = sprite_cache.get(SPRITE_CODE, code)
+    if sprite is None:
+        sprite = sprite_cache.put(SPRITE_CODE, code, code_pixel_count(code), CODE_PIXEL_BLOCK_SIZE)
+        if sprite is not None:
+            render_code_pixels(sprite, code, 0, 0)
+    return sprite
+
+
+def draw_word(ge, y_pos):
+    x_pos = (SCREEN_WIDTH - len(ge.word) * 8) // 2
+    if x_pos < 0:
+        # wider than the screen, the letter being keyed stays in the middle
+        x_pos = SCREEN_WIDTH // 2 - 4 - ge.cur_letter_idx * 8
+        x_pos = max(SCREEN_WIDTH - len(ge.word) * 8, min(0, x_pos))
+    sprite = word_sprite(ge.word)
+    if sprite is None:
+        display.text(ge.word, x_pos, y_pos, 1)
+        return
+    display.blit(sprite, x_pos, y_pos, 0)
+
+
+code_scroll_x = 0
+
+
+def scroll_code_strip(ge):
+    # a code strip wider than the screen is shown through a viewport onto its sprite - the blit
+    # clips it, so a long strip costs no more per frame than a short one. the viewport follows the
+    # symbol being keyed a few pixels per frame, returns how far the strip is scrolled left
+    global code_scroll_x
+    max_scroll = ge.code_width - CODE_VIEW_WIDTH
+    if max_scroll <= 0:
+        return 0
+    target = max(0, min(max_scroll, ge.captured_pixel_count - CODE_SCROLL_LEAD_PX))
+    if code_scroll_x < target:
+        code_scroll_x = min(target, code_scroll_x + CODE_SCROLL_STEP_PX)
+    elif code_scroll_x > target:
+        code_scroll_x = max(target, code_scroll_x - CODE_SCROLL_STEP_PX)
+    return code_scroll_x
+
+
+def clear_code_margins(y):
+    # a scrolled strip and its progress bar run on under the margins, they end where a centred one would
+    height = CODE_PIXEL_BLOCK_SIZE + 6
+    display.fill_rect(1, y - 3, CODE_MIN_X_POS - 1, height, 0)
+    display.fill_rect(SCREEN_WIDTH - CODE_MIN_X_POS, y - 3, CODE_MIN_X_POS - 1, height, 0)
+
+
+def draw_code_pixels(ge, x, y):
+    sprite = code_sprite(ge.code)
+    if sprite is None:
+        render_code_pixels(display, ge.code, x, y)
+        return
+    display.blit(sprite, x, y, 0)
+
+
+def draw_captured_pixels(ge, x, y):
+    # the open answer mode has no code to show, the symbols keyed so far are drawn instead
+    captured = ge.captured
+    for i in range(ge.captured_len):
+        c = captured[i]
+        if c == SHORT_SYMBOL_ORD:
+            display.fill_rect(x, y, CODE_PIXEL_BLOCK_SIZE, CODE_PIXEL_BLOCK_SIZE, 1)
+            x += CODE_PIXEL_BLOCK_SIZE + 1
+        elif c == LONG_SYMBOL_ORD:
+            display.fill_rect(x, y, 2 * CODE_PIXEL_BLOCK_SIZE, CODE_PIXEL_BLOCK_SIZE, 1)
+            x += 2*CODE_PIXEL_BLOCK_SIZE + 1
+        else:
+            x += CODE_PIXEL_BLOCK_SIZE
+
+
+def render_code_pixels(fb, code, x, y):
+    for c in code:
+        if c == SHORT_SYMBOL:
+            fb.fill_rect(x, y, CODE_PIXEL_BLOCK_SIZE, CODE_PIXEL_BLOCK_SIZE, 1)
+            x += CODE_PIXEL_BLOCK_SIZE + 1
+        elif c == LONG_SYMBOL:
+            fb.fill_rect(x, y, 2 * CODE_PIXEL_BLOCK_SIZE, CODE_PIXEL_BLOCK_SIZE, 1)
+            x += 2*CODE_PIXEL_BLOCK_SIZE + 1
+        elif c == SPACE_SYMBOL:
+            x += CODE_PIXEL_BLOCK_SIZE
+
+
+def draw_progress_bar(ge, x, y):
+    fill_width = ge.calculate_code_pixel_count(True) - 1
+    display.line(x, y - 3, x + fill_width, y - 3, 1)
+    display.line(x, y + CODE_PIXEL_BLOCK_SIZE + 2, x + fill_width, y + CODE_PIXEL_BLOCK_SIZE + 2, 1)
@@ -0,0 +1,92 @@
+import _thread
+import framebuf
+from time import sleep_ms
+
+from layers import WHOLE
+import log
+
+RENDER_IDLE_POLL_MS = 2
+
+
+class FrameCanvas(framebuf.FrameBuffer):
+    # what the game draws on while a RenderPipeline drives the display: a framebuffer in the
+    # display's layout whose show() hands the finished frame over instead of sending it
+
+    def __init__(self, pipeline, width, height):
+        self.width = width
+        self.height = height
+        self.buffer = bytearray(width * height // 8)
+        super().__init__(self.buffer, width, height, framebuf.MONO_VLSB)
+        self.pipeline = pipeline
+
+    def show(self):
+        self.pipeline.submit(self.buffer)
+
+
+class RenderPipeline:
+    # a worker thread owns the display and sends it the frames the game thread draws, so the game
+    # thread never blocks on the bus and keeps sampling the button. a frame is handed over by
+    # copying it into the pending buffer under the lock; the worker copies it out into the
+    # display's own buffer and sends that. a frame still pending when the next one comes is
+    # dropped, the worker always sends the newest one
+
+    def __init__(self, display):
+        self.display = display
+        self.canvas = FrameCanvas(self, display.width, display.height)
+        self.pending = bytearray(len(display.buffer))
+        self.has_pending = False
+        self.lock = _thread.allocate_lock()
+        self.submitted = 0
+        self.shown = 0
+        self.dropped = 0
+        self.errors = 0
+        self.running = False
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            _thread.start_new_thread(self.run, ())
+
+    def stop(self):
+        self.running = False
+
+    def submit(self, frame):
+        self.lock.acquire()
+        if self.has_pending:
+            self.dropped += 1
+        self.pending[WHOLE] = frame
+        self.has_pending = True
+        self.submitted += 1
+        self.lock.release()
+
+    def take(self):
+        # moves the pending frame into the display's buffer, False if there is none
+        self.lock.acquire()
+        taken = self.has_pending
+        if taken:
+            self.display.buffer[WHOLE] = self.pending
+            self.has_pending = False
+        self.lock.release()
+        return taken
+
+    def show_pending(self):
+        if not self.take():
+            return False
+        try:
+            self.display.show()
+        except OSError as e:
+            # a glitch on the bus must not end the thread, the next frame is sent whole
+            self.errors += 1
+            self.display.invalidate()
+            log.error('display: {}'.format(e))
+        self.shown += 1
+        return True
+
+    def run(self):
+        while self.running:
+            if not self.show_pending():
+                sleep_ms(RENDER_IDLE_POLL_MS)
+
+    def stats(self):
+        return 'render thread: {} frames submitted, {} shown, {} dropped, {} bus errors'.format(
+            self.submitted, self.shown, self.dropped, self.errors)
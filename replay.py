@@ -0,0 +1,85 @@
+from settings import *
+from button_input import EdgeQueue, PressClassifier, EVENT_NONE
+from engine import DIFFICULTY_IDS, keying_thresholds, new_game_engine
+from input_trace import read_trace
+
+# feeds recorded traces back through the game's classifier and engine, on the board or on a host
+# (python tools/replay_trace.py). every round is replayed from its own recorded edges, so other
+# thresholds than the recorded ones can be tried - the player's later rounds stay what they were.
+# without thresholds the game's own keying is replayed, learning the player's speed with
+# ADAPTIVE_KEYING like the game did, given thresholds are used fixed. an open answer game is checked
+# against the morse trie there is now, not necessarily the one it was played with
+DIFFICULTY_ITEMS = {difficulty_id: item for item, difficulty_id in DIFFICULTY_IDS.items()}
+
+
+class RoundReplay:
+    def __init__(self, recorded, outcome, events, points):
+        self.recorded = recorded  # the TraceRound
+        self.outcome = outcome
+        self.events = events
+        self.points = points
+
+    def matches(self):
+        return (self.outcome == self.recorded.outcome and self.events == self.recorded.events
+                and self.points == self.recorded.points)
+
+
+def drain_events(ge, classifier, queue, now_us, events):
+    # the input task's loop, without the sound
+    event = classifier.next_event(queue, now_us)
+    while event != EVENT_NONE:
+        events.append(event)
+        if not ge.is_code_wrong() and not ge.is_code_completed():
+            ge.register_event(event, classifier.last_press_dur_us // 1000)
+        event = classifier.next_event(queue, now_us)
+    if EARLY_WRONG_CODE:
+        ge.check_early_wrong(classifier)
+
+
+def replay_round(ge, rnd, thresholds):
+    # ge keeps the points of the rounds before, like in the game
+    ge.start_word(rnd.word)
+    classifier = PressClassifier(*thresholds)
+    classifier.use_speed(ge.speed)
+    classifier.reset(rnd.reset_us, rnd.pressed)
+    queue = EdgeQueue(2)
+    events = bytearray()
+    for edge, t_us in rnd.edges:
+        queue.push(edge, t_us)
+        drain_events(ge, classifier, queue, t_us, events)
+    drain_events(ge, classifier, queue, rnd.end_us, events)
+    return RoundReplay(rnd, ge.finish_round(), events, ge.points)
+
+
+def replay_game(game, thresholds=None):
+    # a RoundReplay for every round that ended in the trace
+    difficulty = DIFFICULTY_ITEMS[game.difficulty]
+    ge = new_game_engine(difficulty, record_stats=False, adaptive_keying=ADAPTIVE_KEYING and thresholds is None)
+    if thresholds is None:
+        thresholds = keying_thresholds(difficulty)
+    replays = []
+    for rnd in game.rounds:
+        if rnd.outcome < 0:
+            break
+        replays.append(replay_round(ge, rnd, thresholds))
+    return replays
+
+
+def replay_file(filename, thresholds=None):
+    # (game, its round replays) of every game in the trace file
+    return [(game, replay_game(game, thresholds)) for game in read_trace(filename)]
+
+
+def summary(results):
+    rounds = 0
+    mismatched = 0
+    lost = 0
+    for game, replays in results:
+        for replay in replays:
+            rounds += 1
+            if replay.recorded.lost:
+                lost += 1
+            elif not replay.matches():
+                mismatched += 1
+    return '{} games, {} rounds replayed, {} differ from the recording, {} incomplete'.format(
+        len(results), rounds, mismatched, lost)
@@ -0,0 +1,51 @@
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from time import ticks_ms, ticks_add, ticks_diff
+
+try:
+    sleep_ms = asyncio.sleep_ms
+except AttributeError:
+    # cpython's asyncio
+    def sleep_ms(ms):
+        return asyncio.sleep(ms / 1000)
+
+
+class FramePacer:
+    # paces a loop against absolute deadlines, so the period doesn't stretch by the time the frame
+    # itself took. when a frame overran by whole periods those frames are skipped instead of being
+    # rushed out back to back
+
+    def __init__(self, period_ms):
+        self.period_ms = period_ms
+        self.next_deadline = ticks_add(ticks_ms(), period_ms)
+        self.frames = 0
+        self.skipped_frames = 0
+
+    def restart(self):
+        self.next_deadline = ticks_add(ticks_ms(), self.period_ms)
+
+    def wait(self):
+        # a plain function handing back sleep_ms()'s awaitable - an async def would allocate a new
+        # generator every frame, uasyncio's sleep_ms() reuses a single one
+        self.frames += 1
+        now = ticks_ms()
+        late_ms = ticks_diff(now, self.next_deadline)
+        if late_ms >= self.period_ms:
+            skip = late_ms // self.period_ms
+            self.skipped_frames += skip
+            self.next_deadline = ticks_add(self.next_deadline, skip * self.period_ms)
+        delay_ms = ticks_diff(self.next_deadline, now)
+        self.next_deadline = ticks_add(self.next_deadline, self.period_ms)
+        # always yield, so a late frame still lets the other tasks run
+        return sleep_ms(delay_ms if delay_ms > 0 else 0)
+
+
+def create_task(coro):
+    return asyncio.create_task(coro)
+
+
+def run(coro):
+    return asyncio.run(coro)
@@ -0,0 +1,138 @@
+# game settings, shared by every module of the game (from settings import *) - constants only,
+# so importing it costs nothing but the names
+SCREEN_WIDTH = 128
+SCREEN_HEIGHT = 64
+REFRESH_RATE_MS = 33
+INPUT_POLL_MS = 5  # the input and game logic tasks run this often, independent of the frame rate
+# send the frames to the display from a second thread (render_thread.py), the game thread then
+# only draws into a framebuffer and never waits for the bus
+RENDER_THREAD = False
+PRINT_DISPLAY_TX_BYTES = False
+
+# how the display is wired (display_bus.py), the pins are the board's
+DISPLAY_BUS_SOFT_I2C = 0
+DISPLAY_BUS_I2C = 1
+DISPLAY_BUS_SPI = 2
+DISPLAY_BUS_MEMORY = 3  # no display, for measuring everything but the bus
+DISPLAY_BUS = DISPLAY_BUS_SOFT_I2C
+DISPLAY_I2C_ID = 0
+DISPLAY_I2C_FREQ = 400000  # the hardware i2c
+DISPLAY_SOFT_I2C_FREQ = 4000000
+DISPLAY_SCL_PIN = 22
+DISPLAY_SDA_PIN = 21
+DISPLAY_SPI_ID = 1
+DISPLAY_SPI_BAUDRATE = 10000000
+DISPLAY_SCK_PIN = 14
+DISPLAY_MOSI_PIN = 13
+DISPLAY_DC_PIN = 27
+DISPLAY_CS_PIN = 15
+DISPLAY_RES_PIN = 26
+
+PROFILING = False  # per-section frame timing, fps overlay and periodic stats dumps
+PROFILE_OVERLAY = True
+PROFILE_FILE_NAME = 'morse_prof.csv'
+PROFILE_DUMP_INTERVAL_MS = 30000
+PROFILE_SECTION_NAMES = ('background', 'menu_items', 'selector', 'fill_bar', 'signal_tower', 'circle',
+                         'highscore', 'menu_title', 'points', 'timer', 'word', 'code_pixels', 'progress_bar',
+                         'show', 'input', 'logic')
+PROF_BACKGROUND = 0
+PROF_MENU_ITEMS = 1
+PROF_SELECTOR = 2
+PROF_FILL_BAR = 3
+PROF_SIGNAL_TOWER = 4
+PROF_CIRCLE = 5
+PROF_HIGHSCORE = 6
+PROF_MENU_TITLE = 7
+PROF_POINTS = 8
+PROF_TIMER = 9
+PROF_WORD = 10
+PROF_CODE_PIXELS = 11
+PROF_PROGRESS_BAR = 12
+PROF_SHOW = 13
+PROF_INPUT = 14
+PROF_LOGIC = 15
+
+SHORT_CLICK_THR_MS = 260
+SPACE_THR_MS_EASY = 600
+SPACE_THR_MS_HARD = 450
+SEQUENCE_END_THR_MS_EASY = 1450
+SEQUENCE_END_THR_MS_HARD = 1150
+# the thresholds above are where a game starts, with ADAPTIVE_KEYING they follow the player's own
+# dot, dash and gap lengths after a few presses (keying_speed.py)
+ADAPTIVE_KEYING = True
+KEYING_WARMUP_SAMPLES = 6  # presses, and gaps, before the learned thresholds are used
+KEYING_EMA_SHIFT = 2  # every sample moves its average 1/4 of the way
+KEYING_TIMEOUT_DEVIATIONS = 4  # the sequence ends this many average deviations after the usual letter gap
+KEYING_MIN_TIMEOUT_MARGIN_MS = 250  # ...but at least this long after the space
+KEYING_MIN_SHORT_MS = 80
+KEYING_MAX_SHORT_MS = 700
+KEYING_MIN_SPACE_MS = 120
+KEYING_MAX_SPACE_MS = 1500
+KEYING_MIN_TIMEOUT_MS = 400
+KEYING_MAX_TIMEOUT_MS = 3000
+EARLY_WRONG_CODE = True  # end a round as soon as the press being keyed can't be right any more
+
+MENU_CLICK_SHORT_THR_MS = 400
+MENU_CLICK_LONG_THR_MS = 500
+MAIN_MENU_TEXT_PAD = 12
+MENU_TITLE_LINE_MAX_LENGTH = 35
+
+MENU_ITEM_EASY = "Easy"
+MENU_ITEM_HARD = "Hard"
+MENU_ITEM_OPEN = "Open"  # a first letter is shown, any word of the banks starting with it counts (morse_trie.py)
+MENU_ITEM_FREE = "Free"  # key anything, it is decoded as it comes in (morse_decoder.py)
+MENU_ITEM_HOW_TO = "How To"
+MENU_ITEM_MAX_WIDTH = 40
+MENU_ITEM_MAX_HEIGHT = 10
+MENU_VISIBLE_ITEMS = 3  # the menu scrolls with the selector past this many items
+
+FREE_KEYING_EXIT_HOLD_MS = 2000  # holding the button this long leaves free keying
+WPM_TEXT = "wpm"
+OPEN_CLUE_SUFFIX = "..."  # after the first letter of the open answer mode
+
+SOUND_TEXT_ON = "on"
+SOUND_TEXT_OFF = "off"
+POSITIVE_WORDS = ("awesome", "great", "nice", "correct", "good", "amazing")
+NEGATIVE_WORDS = ("wrong", "nope", "incorrect")
+TIMES_UP_TEXT = "Time Is Up!"
+SCORE_TEXT = "score "
+
+GAME_TIMER_S = 30
+EASY_POINTS_MODIFY = 3
+HARD_POINTS_MODIFY = 5
+
+GAME_OVER_SPLASH_SCREEN_DISPLAY_MS = 3000
+NEW_WORD_DELAY_MS = 450
+FEEDBACK_DISPLAY_MS = 800
+ANIMATION_SPEED = 2
+SIGNAL_ANIMATION_MAX_RADIUS = 20
+# a code strip wider than the screen scrolls, keeping the symbol to key this far from its left edge
+CODE_SCROLL_LEAD_PX = 40
+CODE_SCROLL_STEP_PX = 3  # per frame, the strip glides to a new position instead of jumping
+HIGH_SCORE_FILE_NAME = 'morse_hs.txt'  # legacy, imported into the stats store once
+STATS_FILE_NAME = 'morse_stats.bin'
+DEFAULT_HIGH_SCORE = 64
+ADAPTIVE_WORDS = True  # words with the letters the player misses come up more often
+WORD_DICT_ADAPTIVE_TRIES = 8  # uniform draws from the dictionary before taking whatever came
+WORD_DICT_FILE_NAME = 'morse_words.bin'  # optional, built by tools/build_word_dict.py
+MORSE_TRIE_FILE_NAME = 'morse_trie.bin'  # optional, built by tools/build_morse_trie.py - else built from the banks
+
+SPRITE_CACHE_BUDGET_BYTES = 2048
+PRINT_SPRITE_CACHE_STATS = False  # hit/miss counters after every game, to size the budget
+
+# numbers are drawn digit by digit from constant strings and a word's sprites are built before its
+# round starts, so drawing a frame allocates nothing and can't trigger the gc
+ZERO_ALLOC_FRAMES = True
+GC_AT_SAFE_POINTS = True  # collect between words and after the end splash, where a pause can't be seen
+HEAP_STATS = False  # bytes allocated per frame and the gc pauses, printed after every game
+
+TRACE_RECORDING = False  # every button edge of every game goes to a binary trace, see input_trace.py and replay.py
+TRACE_FILE_NAME = 'morse_trace.bin'
+
+BUZZ_MENU_SHORT_CLICK_FREQ_HZ = 1220
+
+BUZZ_SHORT_CLICK_FREQ_HZ = 440
+BUZZ_SHORT_CLICK_DUR_MS = 65
+
+BUZZ_LONG_CLICK_FREQ_HZ = 440
+BUZZ_LONG_CLICK_DUR_MS = 250
@@ -0,0 +1,102 @@
+# headless host simulation of the board. install() puts stand-ins for machine, ssd1306, framebuf,
+# micropython and a virtual-clock time module into sys.modules, after which the game modules
+# import unchanged and every sleep_ms() only moves the virtual clock:
+#
+#     import sim
+#     clock = sim.install()
+#     game = sim.load_main()
+#     sim.keyer.press(clock, at_ms=500, duration_ms=100)
+#     sim.run(game.main_game_loop(game.MENU_ITEM_EASY, False))
+#
+# run() drives the game's coroutines on an asyncio loop whose time is the virtual clock.
+# _thread is the real one - worker threads sleep on the virtual clock until the thread that
+# called install() has moved it far enough
+import importlib
+import os
+import sys
+import time as host_time
+import types
+
+from sim.clock import VirtualClock, SimulationEnd, ticks_diff, ticks_add  # noqa: F401
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+clock = None
+
+
+def make_time_module(virtual_clock):
+    vtime = types.ModuleType('time')
+
+    def sleep_ms(ms):
+        virtual_clock.sleep_us(int(ms) * 1000)
+
+    def sleep_us(us):
+        virtual_clock.sleep_us(int(us))
+
+    def sleep(seconds):
+        virtual_clock.sleep_us(int(seconds * 1000000))
+
+    def time_s():
+        return virtual_clock.now_us // 1000000
+
+    vtime.ticks_ms = virtual_clock.ticks_ms
+    vtime.ticks_us = virtual_clock.ticks_us
+    vtime.ticks_cpu = virtual_clock.ticks_us
+    vtime.ticks_diff = ticks_diff
+    vtime.ticks_add = ticks_add
+    vtime.sleep_ms = sleep_ms
+    vtime.sleep_us = sleep_us
+    vtime.sleep = sleep
+    vtime.time = time_s
+    # anything else (monotonic, perf_counter, ...) is the host's, for the stdlib's sake
+    vtime.__getattr__ = lambda name: getattr(host_time, name)
+    return vtime
+
+
+def install(start_ms=0):
+    global clock
+    from sim import framebuf, machine, micropython, ssd1306
+
+    clock = VirtualClock(start_ms * 1000)
+    machine.pins.clear()
+    sys.modules['time'] = make_time_module(clock)
+    sys.modules['utime'] = sys.modules['time']
+    sys.modules['machine'] = machine
+    sys.modules['framebuf'] = framebuf
+    sys.modules['micropython'] = micropython
+    sys.modules['ssd1306'] = ssd1306
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    return clock
+
+
+def uninstall():
+    if clock is not None:
+        clock.stop()
+    sys.modules['time'] = host_time
+    for name in ('utime', 'machine', 'framebuf', 'micropython', 'ssd1306'):
+        sys.modules.pop(name, None)
+
+
+def run(coro):
+    from sim import aio
+    return aio.run(clock, coro)
+
+
+def load_main(settings=None):
+    # imports the game and runs game.init(), so the simulated hardware is set up but the menu isn't
+    # entered. game modules imported under an earlier install() are dropped so they bind to the
+    # current clock. settings ({NAME: value}) override settings.py before the game imports it
+    repo_dir = os.path.realpath(REPO_DIR)
+    sim_dir = os.path.dirname(os.path.realpath(__file__))
+    for name, module in list(sys.modules.items()):
+        path = os.path.realpath(getattr(module, '__file__', None) or '')
+        if path.startswith(repo_dir + os.sep) and not path.startswith(sim_dir + os.sep):
+            del sys.modules[name]
+    if settings:
+        game_settings = importlib.import_module('settings')
+        for name, value in settings.items():
+            setattr(game_settings, name, value)
+    game = importlib.import_module('game')
+    game.init()
+    return game
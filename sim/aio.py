@@ -0,0 +1,51 @@
+# asyncio on the virtual clock: the loop reads its time from the clock, and when no task is
+# ready the selector moves the clock to the next timer instead of blocking
+import asyncio
+import math
+import selectors
+
+from sim.clock import SimulationEnd
+
+
+class VirtualSelector(selectors.SelectSelector):
+
+    def __init__(self, virtual_clock):
+        super().__init__()
+        self.clock = virtual_clock
+
+    def select(self, timeout=None):
+        # the loop's self-pipe still has to be served, so poll it without blocking
+        ready = super().select(0)
+        if ready or timeout == 0:
+            return ready
+        if timeout is None:
+            raise SimulationEnd('nothing scheduled on the virtual clock')
+        self.clock.advance_us(math.ceil(timeout * 1000000))
+        return ready
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+
+    def __init__(self, virtual_clock):
+        super().__init__(VirtualSelector(virtual_clock))
+        self.clock = virtual_clock
+
+    def time(self):
+        return self.clock.now_us / 1000000
+
+
+def run(virtual_clock, coro):
+    # runs coro to completion, or until the clock hits its run_for() deadline (SimulationEnd);
+    # either way the tasks left behind are cancelled
+    loop = VirtualTimeEventLoop(virtual_clock)
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        virtual_clock.deadline_us = None
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+        asyncio.set_event_loop(None)
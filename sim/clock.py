@@ -0,0 +1,107 @@
+import heapq
+import _thread
+
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALF_PERIOD = TICKS_PERIOD // 2
+
+
+class SimulationEnd(Exception):
+    pass
+
+
+class VirtualClock:
+    # virtual microsecond clock. the thread that created it drives time forward from its sleeps;
+    # any other thread sleeping on it just waits until the driver has moved time far enough.
+    # scheduled callbacks (button edges, ...) fire at their exact virtual time
+
+    def __init__(self, start_us=0):
+        self.now_us = start_us
+        self.driver_thread = _thread.get_ident()
+        self.events = []
+        self.event_seq = 0
+        self.deadline_us = None
+        self.stopped = False
+        self.condition_lock = _thread.allocate_lock()
+        self.waiters = []
+
+    def ticks_us(self):
+        return self.now_us & TICKS_MAX
+
+    def ticks_ms(self):
+        return (self.now_us // 1000) & TICKS_MAX
+
+    def now_ms(self):
+        return self.now_us // 1000
+
+    def schedule(self, at_us, callback):
+        self.event_seq += 1
+        heapq.heappush(self.events, (at_us, self.event_seq, callback))
+
+    def schedule_in(self, delay_us, callback):
+        self.schedule(self.now_us + delay_us, callback)
+
+    def run_for(self, duration_ms):
+        # the driver's next sleep past this point raises SimulationEnd
+        self.deadline_us = self.now_us + duration_ms * 1000
+
+    def stop(self):
+        self.stopped = True
+        self._wake_waiters()
+
+    def sleep_us(self, duration_us):
+        if _thread.get_ident() == self.driver_thread:
+            self.advance_us(duration_us)
+        else:
+            self._wait_until(self.now_us + duration_us)
+
+    def advance_us(self, duration_us):
+        target_us = self.now_us + max(duration_us, 0)
+        if self.deadline_us is not None and target_us > self.deadline_us:
+            target_us = self.deadline_us
+            self._fire_events_until(target_us)
+            self.now_us = target_us
+            self._wake_waiters()
+            raise SimulationEnd()
+        self._fire_events_until(target_us)
+        self.now_us = target_us
+        self._wake_waiters()
+
+    def _fire_events_until(self, target_us):
+        while self.events and self.events[0][0] <= target_us:
+            at_us, _, callback = heapq.heappop(self.events)
+            if at_us > self.now_us:
+                self.now_us = at_us
+            callback()
+
+    def _wait_until(self, target_us):
+        # worker threads end quietly once the simulation is over
+        lock = _thread.allocate_lock()
+        lock.acquire()
+        with self.condition_lock:
+            if self.stopped:
+                raise SystemExit()
+            if self.now_us >= target_us:
+                return
+            self.waiters.append((target_us, lock))
+        lock.acquire()
+        if self.stopped:
+            raise SystemExit()
+
+    def _wake_waiters(self):
+        with self.condition_lock:
+            still_waiting = []
+            for target_us, lock in self.waiters:
+                if self.stopped or self.now_us >= target_us:
+                    lock.release()
+                else:
+                    still_waiting.append((target_us, lock))
+            self.waiters = still_waiting
+
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + TICKS_HALF_PERIOD) & TICKS_MAX) - TICKS_HALF_PERIOD
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
@@ -0,0 +1,200 @@
+# pure python stand-in for micropython's framebuf module, MONO_VLSB only (the ssd1306 layout:
+# one byte is a column of 8 vertical pixels, bytes run left to right, then page by page).
+# text() uses a generated placeholder font, not micropython's 8x8 font - the glyphs are 8x8
+# cells like the real ones and every character renders differently, which is all the
+# simulator needs
+MONO_VLSB = 0
+
+FONT_CELL = 8
+
+
+def _glyph(code):
+    if code <= 32 or code > 126:
+        return bytes(FONT_CELL)
+    cols = bytearray(FONT_CELL)
+    for c in range(6):
+        cols[c] = ((code * (c + 3) * 37) >> (c % 3)) & 0x7F | 0x01
+    return bytes(cols)
+
+
+FONT = [_glyph(code) for code in range(128)]
+
+_mask_tables = {}
+
+
+def _mask_table(mask, c):
+    # byte translation table that sets (or clears) the mask bits, so a whole row of columns is
+    # updated by one bytes.translate()
+    table = _mask_tables.get((mask, c))
+    if table is None:
+        if c:
+            table = bytes(b | mask for b in range(256))
+        else:
+            table = bytes(b & ~mask & 0xFF for b in range(256))
+        _mask_tables[(mask, c)] = table
+    return table
+
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, buf_format=MONO_VLSB, stride=None):
+        if buf_format != MONO_VLSB:
+            raise ValueError('only MONO_VLSB is simulated')
+        self._buf = buffer
+        self._width = width
+        self._height = height
+        self._stride = stride or width
+        self._pages = (height + 7) // 8
+
+    def fill(self, c):
+        value = 0xFF if c else 0
+        buf = self._buf
+        buf[:self._pages * self._stride] = bytes([value]) * (self._pages * self._stride)
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return None
+        idx = (y >> 3) * self._stride + x
+        bit = 1 << (y & 7)
+        if c is None:
+            return 1 if self._buf[idx] & bit else 0
+        if c:
+            self._buf[idx] |= bit
+        else:
+            self._buf[idx] &= ~bit & 0xFF
+
+    def fill_rect(self, x, y, w, h, c):
+        if w < 0:
+            x, w = x + w + 1, -w
+        if h < 0:
+            y, h = y + h + 1, -h
+        x0 = max(x, 0)
+        x1 = min(x + w, self._width)
+        y0 = max(y, 0)
+        y1 = min(y + h, self._height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        buf = self._buf
+        stride = self._stride
+        y = y0
+        while y < y1:
+            page = y >> 3
+            page_end = min((page + 1) << 3, y1)
+            mask = ((0xFF << (y & 7)) & 0xFF) & (0xFF >> (8 - (page_end - (page << 3))))
+            start = page * stride + x0
+            end = page * stride + x1
+            buf[start:end] = bytes(buf[start:end]).translate(_mask_table(mask, c))
+            y = page_end
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.fill_rect(x, y, w, 1, c)
+        self.fill_rect(x, y + h - 1, w, 1, c)
+        self.fill_rect(x, y, 1, h, c)
+        self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        if x1 == x2:
+            self.fill_rect(x1, min(y1, y2), 1, abs(y2 - y1) + 1, c)
+            return
+        if y1 == y2:
+            self.fill_rect(min(x1, x2), y1, abs(x2 - x1) + 1, 1, c)
+            return
+        dx = abs(x2 - x1)
+        dy = -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        pixel = self.pixel
+        while True:
+            pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def text(self, s, x, y, c=1):
+        # glyph columns are or-ed (or cleared) a page at a time instead of pixel by pixel
+        buf = self._buf
+        stride = self._stride
+        shift = y & 7
+        page = y >> 3
+        pages = ((page, shift), (page + 1, shift - 8))
+        for ch in s:
+            glyph = FONT[ord(ch) & 0x7F]
+            for col in range(FONT_CELL):
+                tx = x + col
+                bits = glyph[col]
+                if not bits or not 0 <= tx < self._width:
+                    continue
+                for p, p_shift in pages:
+                    if not 0 <= p < self._pages:
+                        continue
+                    mask = ((bits << p_shift) if p_shift >= 0 else (bits >> -p_shift)) & 0xFF
+                    if p == self._pages - 1 and self._height & 7:
+                        mask &= 0xFF >> (8 - (self._height & 7))
+                    if c:
+                        buf[p * stride + tx] |= mask
+                    else:
+                        buf[p * stride + tx] &= ~mask & 0xFF
+            x += FONT_CELL
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if key == 0 and palette is None:
+            # transparent background (sprites) - the set source bits are or-ed in a byte at a time
+            src = fbuf._buf
+            src_stride = fbuf._stride
+            buf = self._buf
+            stride = self._stride
+            for page in range(fbuf._pages):
+                row = page * src_stride
+                dy = y + (page << 3)
+                shift = dy & 7
+                dest_page = dy >> 3
+                for sx in range(fbuf._width):
+                    bits = src[row + sx]
+                    tx = x + sx
+                    if not bits or not 0 <= tx < self._width:
+                        continue
+                    if 0 <= dest_page < self._pages:
+                        buf[dest_page * stride + tx] |= (bits << shift) & 0xFF
+                    if shift and 0 <= dest_page + 1 < self._pages:
+                        buf[(dest_page + 1) * stride + tx] |= bits >> (8 - shift)
+            return
+        for sy in range(fbuf._height):
+            ty = y + sy
+            if not 0 <= ty < self._height:
+                continue
+            for sx in range(fbuf._width):
+                tx = x + sx
+                if not 0 <= tx < self._width:
+                    continue
+                c = fbuf.pixel(sx, sy)
+                if palette is not None:
+                    c = palette.pixel(c, 0)
+                if c != key:
+                    self.pixel(tx, ty, c)
+
+    def scroll(self, xstep, ystep):
+        width = self._width
+        height = self._height
+        xs = range(width - 1, -1, -1) if xstep > 0 else range(width)
+        ys = range(height - 1, -1, -1) if ystep > 0 else range(height)
+        for y in ys:
+            for x in xs:
+                sx = x - xstep
+                sy = y - ystep
+                if 0 <= sx < width and 0 <= sy < height:
+                    self.pixel(x, y, self.pixel(sx, sy))
@@ -0,0 +1,104 @@
+# scripted button input for the simulator. the button is active low, a press pulls the pin to 0
+import random
+
+from sim import machine
+
+BUTTON_PIN = 4
+
+
+def press(clock, at_ms, duration_ms, pin_id=BUTTON_PIN):
+    pin = machine.pins[pin_id]
+    clock.schedule(at_ms * 1000, lambda: pin.drive(0))
+    clock.schedule((at_ms + duration_ms) * 1000, lambda: pin.drive(1))
+
+
+def play_script(clock, presses, start_ms=None, pin_id=BUTTON_PIN):
+    # presses: (offset_ms, duration_ms) pairs relative to start_ms (default: now)
+    if start_ms is None:
+        start_ms = clock.now_ms()
+    for offset_ms, duration_ms in presses:
+        press(clock, start_ms + offset_ms, duration_ms, pin_id)
+
+
+def parse_script(text):
+    # "500:100,800:400" -> [(500, 100), (800, 400)]
+    presses = []
+    for item in text.split(','):
+        if item.strip():
+            offset_ms, duration_ms = item.split(':')
+            presses.append((int(offset_ms), int(duration_ms)))
+    return presses
+
+
+class KeyerBot:
+    # keys the code of every new word like a player would, with optional timing jitter
+    # (a fraction of each duration), by hooking gen_new_word of the loaded game's engines
+
+    def __init__(self, clock, dot_ms=100, dash_ms=400, symbol_gap_ms=150, letter_gap_ms=800, lead_ms=600,
+                 jitter=0.0, seed=None, pin_id=BUTTON_PIN):
+        self.clock = clock
+        self.dot_ms = dot_ms
+        self.dash_ms = dash_ms
+        self.symbol_gap_ms = symbol_gap_ms
+        self.letter_gap_ms = letter_gap_ms
+        self.lead_ms = lead_ms
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.pin_id = pin_id
+        self.round_id = 0
+        self.words_keyed = 0
+
+    def attach(self, game):
+        gen_new_word = game.engine.GameEngine.gen_new_word
+        bot = self
+
+        def keyed_gen_new_word(ge):
+            gen_new_word(ge)
+            bot.key_code(ge.code)
+
+        def keyed_open_answer(ge):
+            # any word of the banks starting with the clue letter
+            open_gen_new_word(ge)
+            words = [word for bank in game.engine.word_banks.values() for word in bank.words
+                     if word[0].upper() == ge.word[0]]
+            bot.key_code(game.engine.translate_to_morse(bot.rng.choice(words)))
+
+        game.engine.GameEngine.gen_new_word = keyed_gen_new_word
+        open_gen_new_word = game.engine.OpenAnswerEngine.gen_new_word
+        game.engine.OpenAnswerEngine.gen_new_word = keyed_open_answer
+
+    def _vary(self, ms):
+        if not self.jitter:
+            return ms
+        return max(1, int(ms * (1 + self.rng.uniform(-self.jitter, self.jitter))))
+
+    def key_code(self, code):
+        # what is still scheduled for an earlier round is skipped, a press it left held is let go
+        self.round_id += 1
+        self.words_keyed += 1
+        round_id = self.round_id
+        pin = machine.pins[self.pin_id]
+        pin.drive(1)
+        t_ms = self.clock.now_ms() + self.lead_ms
+        last = ''
+        for symbol in code.rstrip():
+            if symbol == ' ':
+                # the word gap of a phrase is keyed as a letter gap, like the game takes it
+                if last != ' ':
+                    t_ms += self._vary(self.letter_gap_ms) - self.symbol_gap_ms
+                last = symbol
+                continue
+            last = symbol
+            duration_ms = self._vary(self.dot_ms if symbol == '.' else self.dash_ms)
+
+            def press_down(round_id=round_id):
+                if round_id == self.round_id:
+                    pin.drive(0)
+
+            def release(round_id=round_id):
+                if round_id == self.round_id:
+                    pin.drive(1)
+
+            self.clock.schedule(t_ms * 1000, press_down)
+            self.clock.schedule((t_ms + duration_ms) * 1000, release)
+            t_ms += duration_ms + self._vary(self.symbol_gap_ms)
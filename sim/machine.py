@@ -0,0 +1,161 @@
+# stand-ins for the parts of micropython's machine module the game uses. pins keep a level that
+# the simulation drives (see sim.keyer), irq handlers fire at the virtual time of the edge
+from collections import deque
+
+import sim
+from sim.panel import Ssd1306Panel
+
+PWM_NOTE_LOG_SIZE = 256
+
+pins = {}
+bus_hz = 0  # when set, every i2c and spi write takes the virtual time it needs on a bus clocked this fast
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 2
+    PULL_DOWN = 1
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, pin_id, mode=-1, pull=-1, value=None):
+        self.id = pin_id
+        self.mode = mode
+        self.pull = pull
+        self.level = 1 if pull == Pin.PULL_UP else 0
+        if value is not None:
+            self.level = 1 if value else 0
+        self.irq_handler = None
+        self.irq_trigger = 0
+        pins[pin_id] = self
+
+    def init(self, mode=-1, pull=-1, value=None):
+        self.mode = mode
+        if value is not None:
+            self.level = 1 if value else 0
+
+    def value(self, level=None):
+        if level is None:
+            return self.level
+        self.level = 1 if level else 0
+
+    def __call__(self, level=None):
+        return self.value(level)
+
+    def on(self):
+        self.level = 1
+
+    def off(self):
+        self.level = 0
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self.irq_handler = handler
+        self.irq_trigger = trigger
+
+    def drive(self, level):
+        # simulation side: an external signal sets the pin level
+        level = 1 if level else 0
+        if level == self.level:
+            return
+        self.level = level
+        edge = Pin.IRQ_RISING if level else Pin.IRQ_FALLING
+        if self.irq_handler is not None and self.irq_trigger & edge:
+            self.irq_handler(self)
+
+
+class SoftI2C:
+    # routes writes to simulated devices by address, an ssd1306 panel sits at 0x3c by default
+    def __init__(self, scl=None, sda=None, freq=400000, timeout=50000):
+        self.freq = freq
+        self.devices = {0x3C: Ssd1306Panel()}
+        self.transactions = 0
+        self.bytes = 0
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def writeto(self, addr, buf, stop=True):
+        return self.writevto(addr, (buf,), stop)
+
+    def writevto(self, addr, vector, stop=True):
+        payload = b''.join(bytes(buf) for buf in vector)
+        self.transactions += 1
+        self.bytes += len(payload)
+        if bus_hz:
+            # 9 clocks per byte, the address byte included
+            sim.clock.sleep_us((len(payload) + 1) * 9 * 1000000 // bus_hz)
+        device = self.devices.get(addr)
+        if device is None:
+            raise OSError(19)  # ENODEV, what the board raises on a missing ack
+        device.receive(payload)
+        return len(payload)
+
+
+class I2C(SoftI2C):
+    # the hardware peripheral, its id comes first
+    def __init__(self, i2c_id=0, scl=None, sda=None, freq=400000, timeout=50000):
+        super().__init__(scl, sda, freq, timeout)
+        self.id = i2c_id
+
+
+class SPI:
+    # a 4-wire ssd1306 module, wired like settings.py says: the level of the dc pin tells commands
+    # from data
+    def __init__(self, spi_id=1, baudrate=1000000, sck=None, mosi=None, miso=None, **kwargs):
+        import settings
+
+        self.dc_pin_id = settings.DISPLAY_DC_PIN
+        self.panel = Ssd1306Panel()
+        self.transactions = 0
+        self.bytes = 0
+
+    def write(self, buf):
+        self.transactions += 1
+        self.bytes += len(buf)
+        if bus_hz:
+            sim.clock.sleep_us(len(buf) * 8 * 1000000 // bus_hz)
+        dc = pins.get(self.dc_pin_id)
+        # the panel's own stream format: a control byte with Co=0 and D/C#, then the bytes
+        self.panel.receive(bytes((0x40 if dc is not None and dc.level else 0x00,)) + bytes(buf))
+
+
+class PWM:
+    def __init__(self, pin, freq=5000, duty=0):
+        self.pin = pin
+        self._freq = freq
+        self._duty = duty
+        self.notes = deque(maxlen=PWM_NOTE_LOG_SIZE)  # (virtual ms, freq, duty) of the last duty changes
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = value
+
+    def duty(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = value
+        self.notes.append((sim.clock.now_ms(), self._freq, value))
+
+    def deinit(self):
+        self._duty = 0
+
+
+class RTC:
+    def __init__(self):
+        self._datetime = (2000, 1, 1, 5, 0, 0, 0, 0)
+
+    def datetime(self, value=None):
+        if value is None:
+            return self._datetime
+        self._datetime = value
+
+
+def freq(value=None):
+    return 240000000
+
+
+def reset():
+    raise SystemExit('machine.reset()')
@@ -0,0 +1,24 @@
+# stand-in for the micropython builtin module
+def const(value):
+    return value
+
+
+def native(f):
+    return f
+
+
+def viper(f):
+    return f
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def schedule(func, arg):
+    func(arg)
+    return True
+
+
+def mem_info(verbose=False):
+    pass
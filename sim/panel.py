@@ -0,0 +1,93 @@
+# model of the ssd1306 controller as seen from the i2c bus: decodes the command/data stream into
+# the 128x64 graphic ram, so the simulator can check what the panel really shows
+SET_MEM_ADDR = 0x20
+SET_COL_ADDR = 0x21
+SET_PAGE_ADDR = 0x22
+
+# commands followed by argument bytes
+COMMAND_ARG_COUNTS = {
+    0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0xA8: 1, 0xD3: 1, 0xDA: 1, 0xD5: 1, 0xD9: 1, 0xDB: 1, 0x8D: 1,
+    0xAD: 1, 0x26: 6, 0x27: 6, 0x29: 5, 0x2A: 5, 0xA3: 2,
+}
+
+PANEL_WIDTH = 128
+PANEL_PAGES = 8
+
+
+class Ssd1306Panel:
+    def __init__(self):
+        self.gram = bytearray(PANEL_WIDTH * PANEL_PAGES)
+        self.col_start = 0
+        self.col_end = PANEL_WIDTH - 1
+        self.page_start = 0
+        self.page_end = PANEL_PAGES - 1
+        self.col = 0
+        self.page = 0
+        self.pending_cmd = None
+        self.pending_args = []
+        self.transactions = 0
+        self.bytes = 0
+        self.data_bytes = 0
+
+    def receive(self, payload):
+        # one i2c write transaction, without the address byte
+        self.transactions += 1
+        self.bytes += len(payload)
+        i = 0
+        while i < len(payload):
+            control = payload[i]
+            i += 1
+            continuation = control & 0x80
+            is_data = control & 0x40
+            if continuation:
+                # a single byte follows, then another control byte
+                if i < len(payload):
+                    self._byte(payload[i], is_data)
+                    i += 1
+            else:
+                for b in payload[i:]:
+                    self._byte(b, is_data)
+                i = len(payload)
+
+    def _byte(self, b, is_data):
+        if is_data:
+            self._data(b)
+        else:
+            self._command(b)
+
+    def _command(self, b):
+        if self.pending_cmd is not None:
+            self.pending_args.append(b)
+            if len(self.pending_args) == COMMAND_ARG_COUNTS[self.pending_cmd]:
+                self._apply(self.pending_cmd, self.pending_args)
+                self.pending_cmd = None
+                self.pending_args = []
+            return
+        if b in COMMAND_ARG_COUNTS:
+            self.pending_cmd = b
+            self.pending_args = []
+
+    def _apply(self, cmd, args):
+        if cmd == SET_COL_ADDR:
+            self.col_start, self.col_end = args
+            self.col = self.col_start
+        elif cmd == SET_PAGE_ADDR:
+            self.page_start, self.page_end = args
+            self.page = self.page_start
+
+    def _data(self, b):
+        # horizontal addressing mode, wrapping inside the column and page windows
+        self.data_bytes += 1
+        self.gram[self.page * PANEL_WIDTH + self.col] = b
+        if self.col >= self.col_end:
+            self.col = self.col_start
+            self.page = self.page_start if self.page >= self.page_end else self.page + 1
+        else:
+            self.col += 1
+
+    def pixel(self, x, y):
+        return (self.gram[(y >> 3) * PANEL_WIDTH + x] >> (y & 7)) & 1
+
+    def render(self, on='#', off='.'):
+        return '\n'.join(''.join(on if self.pixel(x, y) else off for x in range(PANEL_WIDTH))
+                         for y in range(PANEL_PAGES * 8))
@@ -0,0 +1,169 @@
+# runs the game headless on the virtual clock:
+#   python -m sim.run games --count 1000 --difficulty Hard --jitter 0.2 --seed 1 [--trace traces.bin]
+#   python -m sim.run games --count 20 --difficulty Open --trace open.bin
+#   python -m sim.run games --count 20 --render-thread --bus-khz 400 [--display-bus spi]
+#     (exits non-zero when the render thread loses a frame or leaves the panel behind)
+#   python -m sim.run menu --script 500:900 --duration-ms 40000
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time as host_time
+
+import sim
+from sim import keyer, machine
+
+# settings.py's DISPLAY_BUS_ values
+DISPLAY_BUSES = {'soft_i2c': 0, 'i2c': 1, 'spi': 2, 'memory': 3}
+# --difficulty to the game's menu item
+DIFFICULTIES = {'easy': 'MENU_ITEM_EASY', 'hard': 'MENU_ITEM_HARD', 'open': 'MENU_ITEM_OPEN'}
+RENDER_BURST_FRAMES = 20
+RENDER_BURST_BUS_KHZ = 400  # the bus speed of the burst when the games ran without bus times
+
+
+def run_games(args):
+    clock = sim.install()
+    machine.bus_hz = args.bus_khz * 1000
+    game = sim.load_main({'RENDER_THREAD': args.render_thread, 'DISPLAY_BUS': DISPLAY_BUSES[args.display_bus]})
+    bot = keyer.KeyerBot(clock, dot_ms=args.dot_ms, dash_ms=args.dash_ms, symbol_gap_ms=args.symbol_gap_ms,
+                         letter_gap_ms=args.letter_gap_ms, jitter=args.jitter, seed=args.seed)
+    bot.attach(game)
+    random.seed(args.seed)
+    difficulty = getattr(game, DIFFICULTIES[args.difficulty])
+    if args.trace:
+        from input_trace import TraceRecorder
+        game.recorder = TraceRecorder(args.trace)
+
+    scores = []
+
+    async def play_games():
+        game.scheduler.create_task(game.hardware.audio.run_async())
+        for _ in range(args.count):
+            scores.append(await game.main_game_loop(difficulty, args.sound))
+
+    start = host_time.perf_counter()
+    start_ms = clock.now_ms()
+    sim.run(play_games())
+    wall_s = host_time.perf_counter() - start
+    virtual_s = (clock.now_ms() - start_ms) / 1000
+
+    print('{} {} games, {} words keyed'.format(args.count, difficulty, bot.words_keyed))
+    print('points: mean {:.1f} min {} max {}'.format(sum(scores) / len(scores), min(scores), max(scores)))
+    print('virtual {:.0f} s in {:.2f} s wall ({:.0f}x real time, {:.1f} ms per game)'.format(
+        virtual_s, wall_s, virtual_s / wall_s, wall_s * 1000 / args.count))
+    print(game.hardware.display_bus.stats())
+    failures = check_render_thread(clock, game) if game.render_pipeline is not None else []
+    machine.bus_hz = 0
+    sim.uninstall()
+    if failures:
+        sys.exit('render thread check failed: ' + ', '.join(failures))
+
+
+def drain_render_thread(clock, pipeline):
+    # lets the render thread send what is still pending, False if it doesn't get there
+    for _ in range(1000):
+        if pipeline.shown + pipeline.dropped == pipeline.submitted:
+            return True
+        clock.advance_us(1000)
+        host_time.sleep(0.001)
+    return False
+
+
+def check_render_thread(clock, game):
+    # every frame submitted is either shown or dropped and the panel ends up showing the last one,
+    # after the games and after a burst of frames submitted faster than the bus sends them - the
+    # virtual clock stands still during the burst, so the worker can take one frame at most and
+    # the others have to be dropped instead of queued. returns what failed
+    pipeline = game.render_pipeline
+    canvas = pipeline.canvas
+    failures = []
+
+    def check(name):
+        if not drain_render_thread(clock, pipeline) or pipeline.shown + pipeline.dropped != pipeline.submitted:
+            failures.append(name + ': frames neither shown nor dropped')
+        if panel_gram(game) != canvas.buffer:
+            failures.append(name + ': panel does not show the last frame')
+
+    check('games')
+    print(pipeline.stats())
+
+    if not machine.bus_hz:
+        machine.bus_hz = RENDER_BURST_BUS_KHZ * 1000
+    dropped = pipeline.dropped
+    for i in range(RENDER_BURST_FRAMES):
+        canvas.fill(i & 1)
+        canvas.text('{:03}'.format(i), 40, 28, (i & 1) ^ 1)
+        canvas.show()
+    burst_dropped = pipeline.dropped - dropped
+    check('burst')
+    if burst_dropped == 0:
+        failures.append('burst: no frame dropped')
+    print('burst of {} frames: {} dropped, {}'.format(RENDER_BURST_FRAMES, burst_dropped, pipeline.stats()))
+    print('render thread check: {}'.format('; '.join(failures) if failures else 'ok'))
+    return failures
+
+
+def panel_gram(game):
+    bus = game.hardware.display_bus
+    if hasattr(bus, 'gram'):
+        return bus.gram
+    if hasattr(bus, 'spi'):
+        return bus.spi.panel.gram
+    return bus.i2c.devices[0x3C].gram
+
+
+def run_menu(args):
+    clock = sim.install()
+    game = sim.load_main()
+    keyer.play_script(clock, keyer.parse_script(args.script))
+    clock.run_for(args.duration_ms)
+    try:
+        sim.run(game.app())
+    except sim.SimulationEnd:
+        pass
+    print('menu ran {} virtual ms'.format(clock.now_ms()))
+    if args.show:
+        print(game.hardware.i2c.devices[0x3C].render())
+    sim.uninstall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='headless game simulation on a virtual clock')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    games = commands.add_parser('games', help='play whole games with a keyer bot')
+    games.add_argument('--count', type=int, default=100)
+    games.add_argument('--difficulty', type=str.lower, choices=sorted(DIFFICULTIES), default='easy')
+    games.add_argument('--dot-ms', type=int, default=100)
+    games.add_argument('--dash-ms', type=int, default=400)
+    games.add_argument('--symbol-gap-ms', type=int, default=150)
+    games.add_argument('--letter-gap-ms', type=int, default=800)
+    games.add_argument('--jitter', type=float, default=0.0, help='timing jitter as a fraction of each duration')
+    games.add_argument('--sound', action='store_true')
+    games.add_argument('--seed', type=int, default=0)
+    games.add_argument('--trace', help='record the input of the games to this trace file')
+    games.add_argument('--render-thread', action='store_true', help='send the frames from a second thread')
+    games.add_argument('--bus-khz', '--i2c-khz', dest='bus_khz', type=int, default=0,
+                       help='give the display writes their time on a bus this fast')
+    games.add_argument('--display-bus', choices=sorted(DISPLAY_BUSES), default='soft_i2c')
+    games.set_defaults(func=run_games)
+
+    menu = commands.add_parser('menu', help='drive the main menu with a press script')
+    menu.add_argument('--script', default='', help='offset_ms:duration_ms,... presses')
+    menu.add_argument('--duration-ms', type=int, default=10000)
+    menu.add_argument('--show', action='store_true', help='print what the panel shows at the end')
+    menu.set_defaults(func=run_menu)
+
+    args = parser.parse_args()
+    if getattr(args, 'trace', None):
+        args.trace = os.path.abspath(args.trace)
+    # the game keeps its high score next to itself, keep that out of the working tree
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sys.path.insert(0, os.path.realpath(sim.REPO_DIR))
+        os.chdir(tmp_dir)
+        args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import framebuf
+
+
+class SpriteCache:
+    # pre-rendered MONO_VLSB strips (text labels, code strips, ...) under a fixed byte budget,
+    # the least recently used ones are dropped to make room. sprites are looked up by a kind and
+    # a value, so a lookup allocates nothing - not even a key tuple
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.kinds = {}  # kind -> {value: [sprite, size in bytes, last use]}
+        self.use_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, kind, value):
+        entries = self.kinds.get(kind)
+        entry = entries.get(value) if entries is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.use_count += 1
+        entry[2] = self.use_count
+        return entry[0]
+
+    def put(self, kind, value, width, height):
+        # returns an empty sprite to render into, or None if it can never fit the budget
+        size = width * ((height + 7) // 8)
+        if size > self.budget_bytes or size == 0:
+            return None
+        while self.used_bytes + size > self.budget_bytes:
+            self._evict()
+        sprite = framebuf.FrameBuffer(bytearray(size), width, height, framebuf.MONO_VLSB)
+        self.use_count += 1
+        if kind not in self.kinds:
+            self.kinds[kind] = {}
+        self.kinds[kind][value] = [sprite, size, self.use_count]
+        self.used_bytes += size
+        return sprite
+
+    def _evict(self):
+        lru_entries = None
+        lru_value = None
+        lru_use = -1
+        for entries in self.kinds.values():
+            for value, entry in entries.items():
+                if lru_use < 0 or entry[2] < lru_use:
+                    lru_entries = entries
+                    lru_value = value
+                    lru_use = entry[2]
+        self.used_bytes -= lru_entries.pop(lru_value)[1]
+        self.evictions += 1
+
+    def clear(self):
+        self.kinds = {}
+        self.used_bytes = 0
+
+    def stats(self):
+        return 'sprites: {} hits {} misses {} evictions {}/{} bytes'.format(
+            self.hits, self.misses, self.evictions, self.used_bytes, self.budget_bytes)
@@ -0,0 +1,210 @@
+import os
+import struct
+from array import array
+
+# append-only player stats log, little endian:
+#   header  : magic
+#   records : type byte, payload, checksum byte (sum of type and payload bytes)
+# every record is a delta that is added on load (high scores take the max), so appending a game
+# or rewriting the totals as a snapshot are the same kind of write. a torn write at the end of the
+# log only loses that last record
+STATS_MAGIC = b'MST1'
+STATS_RECORD_GAME = 1
+STATS_RECORD_LETTER = 2
+STATS_GAME_FORMAT = '<BhI'  # difficulty, high score, games played
+STATS_LETTER_FORMAT = '<BIIII'  # letter, hits, misses, presses, total press ms
+STATS_GAME_SIZE = struct.calcsize(STATS_GAME_FORMAT)
+STATS_LETTER_SIZE = struct.calcsize(STATS_LETTER_FORMAT)
+STATS_LETTERS = 26
+STATS_COMPACT_BYTES = 2048  # the log is rewritten as a snapshot once it grows past this
+STATS_DIFFICULTIES = 3  # easy, hard, open - the records of a later one are skipped by older firmware
+
+
+def checksum(data):
+    total = 0
+    for b in data:
+        total += b
+    return total & 0xFF
+
+
+def letter_index(ch):
+    idx = (ord(ch) | 0x20) - 97  # case-insensitive a-z
+    return idx if 0 <= idx < STATS_LETTERS else -1
+
+
+class StatsStore:
+    # everything is loaded once at boot and kept in ram. recording only touches ram, the
+    # records collected since the last flush() are written together in one append
+
+    def __init__(self, filename, default_high_score=0, legacy_high_score_file=None):
+        self.filename = filename
+        self.default_high_score = default_high_score
+        self.high_scores = array('h', [default_high_score] * STATS_DIFFICULTIES)
+        self.games = array('I', [0] * STATS_DIFFICULTIES)
+        self.hits = array('I', [0] * STATS_LETTERS)
+        self.misses = array('I', [0] * STATS_LETTERS)
+        self.presses = array('I', [0] * STATS_LETTERS)
+        self.press_ms = array('I', [0] * STATS_LETTERS)
+
+        # deltas since the last flush
+        self.pending_games = []
+        self.pending_hits = array('I', [0] * STATS_LETTERS)
+        self.pending_misses = array('I', [0] * STATS_LETTERS)
+        self.pending_presses = array('I', [0] * STATS_LETTERS)
+        self.pending_press_ms = array('I', [0] * STATS_LETTERS)
+        self.dirty = False
+
+        self.log_bytes = 0
+        self.needs_compaction = False
+        if not self.load() and legacy_high_score_file is not None:
+            self.import_legacy_high_score(legacy_high_score_file)
+
+    def load(self):
+        try:
+            with open(self.filename, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+        if data[:len(STATS_MAGIC)] != STATS_MAGIC:
+            self.needs_compaction = True
+            return False
+
+        pos = len(STATS_MAGIC)
+        while pos < len(data):
+            record_type = data[pos]
+            if record_type == STATS_RECORD_GAME:
+                size = STATS_GAME_SIZE
+            elif record_type == STATS_RECORD_LETTER:
+                size = STATS_LETTER_SIZE
+            else:
+                break
+            end = pos + 1 + size
+            if end >= len(data) or checksum(data[pos:end]) != data[end]:
+                break
+            if record_type == STATS_RECORD_GAME:
+                self._apply_game(*struct.unpack_from(STATS_GAME_FORMAT, data, pos + 1))
+            else:
+                self._apply_letter(*struct.unpack_from(STATS_LETTER_FORMAT, data, pos + 1))
+            pos = end + 1
+        # a damaged tail is dropped by rewriting the log on the next flush
+        self.needs_compaction = pos < len(data)
+        self.log_bytes = pos
+        return True
+
+    def import_legacy_high_score(self, filename):
+        # the single high score of morse_hs.txt becomes the high score of every difficulty
+        try:
+            with open(filename, 'r') as f:
+                high_score = int(f.read())
+        except (OSError, ValueError):
+            return
+        for difficulty in range(STATS_DIFFICULTIES):
+            self.high_scores[difficulty] = high_score
+        self.needs_compaction = True
+        self.dirty = True
+
+    def _apply_game(self, difficulty, high_score, games):
+        if difficulty >= STATS_DIFFICULTIES:
+            return
+        if high_score > self.high_scores[difficulty]:
+            self.high_scores[difficulty] = high_score
+        self.games[difficulty] += games
+
+    def _apply_letter(self, letter, hits, misses, presses, press_ms):
+        if letter >= STATS_LETTERS:
+            return
+        self.hits[letter] += hits
+        self.misses[letter] += misses
+        self.presses[letter] += presses
+        self.press_ms[letter] += press_ms
+
+    def high_score(self, difficulty):
+        return self.high_scores[difficulty]
+
+    def games_played(self, difficulty):
+        return self.games[difficulty]
+
+    def record_game(self, difficulty, points):
+        self._apply_game(difficulty, points, 1)
+        self.pending_games.append((difficulty, points))
+        self.dirty = True
+
+    def record_letter(self, letter, hit):
+        if letter < 0:
+            return
+        if hit:
+            self.hits[letter] += 1
+            self.pending_hits[letter] += 1
+        else:
+            self.misses[letter] += 1
+            self.pending_misses[letter] += 1
+        self.dirty = True
+
+    def record_press(self, letter, duration_ms):
+        if letter < 0:
+            return
+        self.presses[letter] += 1
+        self.press_ms[letter] += duration_ms
+        self.pending_presses[letter] += 1
+        self.pending_press_ms[letter] += duration_ms
+        self.dirty = True
+
+    def flush(self):
+        # never call this while a game runs - it writes to flash
+        if not self.dirty:
+            return False
+        if self.needs_compaction or self.log_bytes > STATS_COMPACT_BYTES:
+            self.compact()
+        else:
+            with open(self.filename, 'ab') as f:
+                if self.log_bytes == 0:
+                    f.write(STATS_MAGIC)
+                    self.log_bytes = len(STATS_MAGIC)
+                for difficulty, points in self.pending_games:
+                    self.log_bytes += self._write_record(f, STATS_RECORD_GAME, STATS_GAME_FORMAT, difficulty, points, 1)
+                for letter in range(STATS_LETTERS):
+                    if self.pending_hits[letter] or self.pending_misses[letter] or self.pending_presses[letter]:
+                        self.log_bytes += self._write_record(
+                            f, STATS_RECORD_LETTER, STATS_LETTER_FORMAT, letter, self.pending_hits[letter],
+                            self.pending_misses[letter], self.pending_presses[letter], self.pending_press_ms[letter])
+        self._clear_pending()
+        return True
+
+    def compact(self):
+        # the totals are written to a new file that then atomically replaces the log
+        tmp_filename = self.filename + '.tmp'
+        with open(tmp_filename, 'wb') as f:
+            f.write(STATS_MAGIC)
+            size = len(STATS_MAGIC)
+            for difficulty in range(STATS_DIFFICULTIES):
+                if self.games[difficulty] or self.high_scores[difficulty] != self.default_high_score:
+                    size += self._write_record(f, STATS_RECORD_GAME, STATS_GAME_FORMAT, difficulty,
+                                               self.high_scores[difficulty], self.games[difficulty])
+            for letter in range(STATS_LETTERS):
+                if self.hits[letter] or self.misses[letter] or self.presses[letter]:
+                    size += self._write_record(f, STATS_RECORD_LETTER, STATS_LETTER_FORMAT, letter, self.hits[letter],
+                                               self.misses[letter], self.presses[letter], self.press_ms[letter])
+        try:
+            os.rename(tmp_filename, self.filename)
+        except OSError:
+            # file systems that don't rename over an existing file
+            os.remove(self.filename)
+            os.rename(tmp_filename, self.filename)
+        self.log_bytes = size
+        self.needs_compaction = False
+        self._clear_pending()
+
+    def _write_record(self, f, record_type, record_format, *values):
+        record = bytes([record_type]) + struct.pack(record_format, *values)
+        f.write(record)
+        f.write(bytes([checksum(record)]))
+        return len(record) + 1
+
+    def _clear_pending(self):
+        self.pending_games = []
+        for letter in range(STATS_LETTERS):
+            self.pending_hits[letter] = 0
+            self.pending_misses[letter] = 0
+            self.pending_presses[letter] = 0
+            self.pending_press_ms[letter] = 0
+        self.dirty = False
@@ -0,0 +1,68 @@
+# builds the open answer mode's morse trie from word lists (one word per line, '#' starts a comment)
+# and/or a word dictionary built by tools/build_word_dict.py, plus the built in word banks:
+#   python tools/build_morse_trie.py morse_trie.bin [--words words.txt] [--dict morse_words.bin] [--no-banks]
+# then copy morse_trie.bin next to main.py on the board
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from morse_code import MORSE_LETTERS, translate_to_morse  # noqa: E402
+from morse_trie import MorseTrie  # noqa: E402
+from word_dict import WordDict  # noqa: E402
+from words import EASY_WORDS, HARD_WORDS  # noqa: E402
+
+
+def list_words(paths):
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                word = line.split('#', 1)[0].strip()
+                if word:
+                    yield word
+
+
+def dict_words(paths):
+    for path in paths:
+        word_dict = WordDict(path)
+        for difficulty in sorted(word_dict.totals):
+            for idx in range(word_dict.count(difficulty)):
+                yield word_dict.word_at(difficulty, idx)
+        word_dict.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='build the morse trie of the open answer mode')
+    parser.add_argument('output')
+    parser.add_argument('--words', action='append', default=[], help='word list file')
+    parser.add_argument('--dict', action='append', default=[], help='word dictionary file')
+    parser.add_argument('--no-banks', action='store_true', help='leave out the built in word banks')
+    args = parser.parse_args()
+
+    seen = set()
+    rejected = []
+    sources = [list_words(args.words), dict_words(args.dict)]
+    if not args.no_banks:
+        sources.append(EASY_WORDS + HARD_WORDS)
+    for source in sources:
+        for word in source:
+            if not all(c.upper() in MORSE_LETTERS for c in word):
+                rejected.append(word)
+                continue
+            seen.add(word.lower())
+    if not seen:
+        sys.exit('no words')
+
+    trie = MorseTrie.build(translate_to_morse(word) for word in seen)
+    with open(args.output, 'wb') as f:
+        trie.write(f)
+
+    print('{}: {} words, {} nodes, {} byte index, {} bytes'.format(args.output, len(seen), len(trie),
+                                                                     trie.first.itemsize, os.path.getsize(args.output)))
+    if rejected:
+        print('{} words dropped (not a-z): {}'.format(len(rejected), ' '.join(rejected)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# precompiles the game modules to .mpy with mpy-cross, so the board doesn't compile them from
+# source at every boot:
+#   python tools/build_mpy.py [--mpy-cross path/to/mpy-cross] [--march xtensawin] [--out build]
+# then copy the contents of the output directory to the board. main.py stays source - it is tiny
+# and the board only runs a main.py. for a firmware image with the modules frozen in flash use
+# tools/manifest.py instead
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# keep in sync with tools/manifest.py
+FIRMWARE_MODULES = ('audio', 'button_input', 'display_bus', 'engine', 'game', 'hardware', 'heap', 'input_trace',
+                    'keying_speed', 'layers', 'log', 'morse_code', 'morse_decoder', 'morse_trie', 'oled', 'profiler',
+                    'render', 'render_thread', 'replay', 'scheduler', 'settings', 'sprites', 'stats_store',
+                    'word_dict', 'word_select', 'words')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='precompile the game modules to .mpy')
+    parser.add_argument('--mpy-cross', default='mpy-cross', help='mpy-cross executable')
+    # oled.py uses @native, which needs the target architecture
+    parser.add_argument('--march', default='xtensawin', help='mpy-cross -march (xtensawin for the ESP32)')
+    parser.add_argument('--out', default=os.path.join(REPO_DIR, 'build'))
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    source_bytes = 0
+    mpy_bytes = 0
+    for name in FIRMWARE_MODULES:
+        source = os.path.join(REPO_DIR, name + '.py')
+        output = os.path.join(args.out, name + '.mpy')
+        try:
+            subprocess.run([args.mpy_cross, '-march=' + args.march, '-o', output, source], check=True)
+        except FileNotFoundError:
+            sys.exit('mpy-cross not found - build it from the micropython repo or pip install mpy-cross')
+        except subprocess.CalledProcessError as e:
+            sys.exit('mpy-cross failed on {}.py ({})'.format(name, e.returncode))
+        source_bytes += os.path.getsize(source)
+        mpy_bytes += os.path.getsize(output)
+    shutil.copy(os.path.join(REPO_DIR, 'main.py'), args.out)
+
+    print('{} modules: {} source bytes -> {} mpy bytes in {}'.format(len(FIRMWARE_MODULES), source_bytes, mpy_bytes,
+                                                                      args.out))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# builds the on-flash word dictionary from plain word lists (one word or phrase per line, '#' starts
+# a comment):
+#   python tools/build_word_dict.py morse_words.bin --easy easy.txt --hard hard.txt
+# then copy morse_words.bin next to main.py on the board
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from morse_code import MORSE_LETTERS  # noqa: E402
+from word_dict import write_word_dict, DIFFICULTY_EASY, DIFFICULTY_HARD  # noqa: E402
+
+
+def load_words(paths, seen, rejected):
+    words = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                # the words of a phrase are keyed with one word gap between them
+                word = ' '.join(line.split('#', 1)[0].split())
+                if not word:
+                    continue
+                if word.lower() in seen:
+                    continue
+                seen.add(word.lower())
+                if not all(c == ' ' or c.upper() in MORSE_LETTERS for c in word) or len(word) > 0xFF:
+                    rejected.append(word)
+                    continue
+                words.append(word)
+    return words
+
+
+def main():
+    parser = argparse.ArgumentParser(description='build the on-flash morse word dictionary')
+    parser.add_argument('output')
+    parser.add_argument('--easy', action='append', default=[], help='easy word list file')
+    parser.add_argument('--hard', action='append', default=[], help='hard word list file')
+    args = parser.parse_args()
+
+    # a word listed in both tiers is kept in the first one only
+    seen = set()
+    rejected = []
+    words = {
+        DIFFICULTY_EASY: load_words(args.easy, seen, rejected),
+        DIFFICULTY_HARD: load_words(args.hard, seen, rejected),
+    }
+
+    with open(args.output, 'wb') as f:
+        write_word_dict(f, words)
+
+    print('{}: {} easy, {} hard words, {} bytes'.format(args.output, len(words[DIFFICULTY_EASY]),
+                                                        len(words[DIFFICULTY_HARD]), os.path.getsize(args.output)))
+    if rejected:
+        print('{} words dropped (not a-z): {}'.format(len(rejected), ', '.join(rejected)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+# frozen firmware build - the game modules are compiled into the firmware image and their code and
+# constant data (the word banks) stay in flash instead of being loaded into ram:
+#   make -C ports/esp32 BOARD=ESP32_GENERIC FROZEN_MANIFEST=/path/to/tools/manifest.py
+# then only main.py goes on the board's file system
+include("$(PORT_DIR)/boards/manifest.py")
+require("ssd1306")
+
+# keep in sync with FIRMWARE_MODULES in tools/build_mpy.py
+for name in ('audio', 'button_input', 'display_bus', 'engine', 'game', 'hardware', 'heap', 'input_trace',
+             'keying_speed', 'layers', 'log', 'morse_code', 'morse_decoder', 'morse_trie', 'oled', 'profiler',
+             'render', 'render_thread', 'replay', 'scheduler', 'settings', 'sprites', 'stats_store', 'word_dict',
+             'word_select', 'words'):
+    module(name + '.py', base_path='..')
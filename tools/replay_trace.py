@@ -0,0 +1,64 @@
+# replays an input trace recorded on the board (TRACE_RECORDING in settings.py) through the
+# game's classifier and engine, and shows where the replay differs from what was recorded:
+#   python tools/replay_trace.py morse_trace.bin
+#   python tools/replay_trace.py morse_trace.bin --space-ms 500 --timeout-ms 1300 -v
+# with other thresholds every round is replayed from its recorded edges, so the differences
+# are the rounds the new thresholds would have classified differently
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import sim  # noqa: E402
+
+OUTCOME_NAMES = ('complete', 'wrong', 'time up')
+EVENT_NAMES = '?.-_!'  # none, short, long, space, timeout
+
+
+def event_string(events):
+    return ''.join(EVENT_NAMES[e] if e < len(EVENT_NAMES) else '?' for e in events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='replay recorded input traces')
+    parser.add_argument('trace')
+    parser.add_argument('--short-ms', type=int, help='short click threshold, the game\'s if not given')
+    parser.add_argument('--space-ms', type=int, help='space threshold, the difficulty\'s if not given')
+    parser.add_argument('--timeout-ms', type=int, help='sequence end threshold, the difficulty\'s if not given')
+    parser.add_argument('-v', '--verbose', action='store_true', help='every round, not just the differing ones')
+    args = parser.parse_args()
+
+    # the game modules want micropython's time and const
+    sim.install()
+    import engine
+    import replay
+    from input_trace import read_trace
+
+    games = read_trace(args.trace)
+    results = []
+    for game in games:
+        difficulty = replay.DIFFICULTY_ITEMS[game.difficulty]
+        thresholds = None
+        if args.short_ms or args.space_ms or args.timeout_ms:
+            short_ms, space_ms, timeout_ms = engine.keying_thresholds(difficulty)
+            thresholds = (args.short_ms or short_ms, args.space_ms or space_ms, args.timeout_ms or timeout_ms)
+        replays = replay.replay_game(game, thresholds)
+        results.append((game, replays))
+
+        print('{} game, seed {}, {} rounds, {} points recorded, {} replayed'.format(
+            difficulty, game.seed, len(game.rounds), game.points, replays[-1].points if replays else 0))
+        for replay_round in replays:
+            rnd = replay_round.recorded
+            if not args.verbose and replay_round.matches():
+                continue
+            print('  {:<12} recorded {:<8} {:>4} {:<16} replayed {:<8} {:>4} {}{}'.format(
+                rnd.word, OUTCOME_NAMES[rnd.outcome], rnd.points, event_string(rnd.events),
+                OUTCOME_NAMES[replay_round.outcome], replay_round.points, event_string(replay_round.events),
+                ' (incomplete)' if rnd.lost else ''))
+    print(replay.summary(results))
+    sim.uninstall()
+
+
+if __name__ == '__main__':
+    main()
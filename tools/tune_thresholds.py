@@ -0,0 +1,286 @@
+# finds dot/dash, space and sequence end thresholds that fit recorded play, with numpy:
+#   python tools/tune_thresholds.py morse_trace.bin more_traces/*.bin [--check] [--csv curves.csv]
+# needs numpy on the host (pip install numpy). traces are recorded on the board with
+# TRACE_RECORDING, or in the simulation with python -m sim.run games --trace traces.bin
+#
+# every press of a round is taken as meant to be the matching symbol of the word's code. the
+# classifier's rules then make the thresholds under which a round is keyed right a box:
+#   short click   max dot press   <= short    < min dash press
+#   space         max gap within a letter <= space < min gap between letters
+#   sequence end  max gap         <= timeout
+# all rounds' boxes are added into a 3d difference array over the threshold grid and integrated
+# with cumulative sums, so millions of combinations cost a handful of array passes - that gives
+# the rounds every combination would have scored, exactly as a replay would. a press still held
+# when the round ended counts with EARLY_WRONG_CODE too: the gap before it has to be what the code
+# wants, and a dot held that long must not be past the short click threshold.
+#
+# a recorded round stops where the game ended it, so under other thresholds many rounds are
+# left undecided - the player would have gone on. the proposal therefore comes from the single
+# presses and gaps, which every round contributes without that bias: the short click threshold
+# that classifies most presses as meant, the quickest space threshold within --tolerance of the
+# best gap classification and the quickest sequence end that cuts off at most --tolerance of gaps.
+# with ADAPTIVE_KEYING these are the thresholds a game starts with, --check then only matches
+# traces recorded with it off
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import sim  # noqa: E402
+
+INF_US = 1 << 40
+
+
+def parse_range(text):
+    lo, hi, step = (int(v) for v in text.split(':'))
+    return np.arange(lo, hi + 1, step, dtype=np.int64)
+
+
+def code_symbols(code):
+    # (is dash, ends its letter) of every dot and dash of a code
+    symbols = []
+    for i, c in enumerate(code):
+        if c in '.-':
+            symbols.append((c == '-', i + 1 < len(code) and code[i + 1] == ' '))
+    return symbols
+
+
+def round_timings(rnd, code, edge_press):
+    # the press durations and gaps of a round in us, sorted by what the code wants them to be:
+    # (dots, dashes, gaps within letters, gaps between letters, silence after the last press or
+    # -1, whether the last press ended a letter, whether the presses cover the whole code, how long
+    # a dot still held at the end was held or -1)
+    from time import ticks_diff
+
+    presses = []
+    pressed = rnd.pressed
+    start_us = rnd.reset_us
+    for edge, t_us in rnd.edges:
+        if edge == edge_press:
+            if not pressed:
+                pressed = True
+                start_us = t_us
+        elif pressed:
+            pressed = False
+            presses.append((start_us, t_us))
+    held_start_us = start_us  # of the press still held at the end, if there is one
+    symbols = code_symbols(code)
+    presses = presses[:len(symbols)]  # anything after the last symbol came after the word was done
+
+    dots = []
+    dashes = []
+    in_letter_gaps = []
+    letter_gaps = []
+    for i, (start_us, end_us) in enumerate(presses):
+        is_dash, ends_letter = symbols[i]
+        (dashes if is_dash else dots).append(ticks_diff(end_us, start_us))
+        if i + 1 < len(presses):
+            (letter_gaps if ends_letter else in_letter_gaps).append(ticks_diff(presses[i + 1][0], end_us))
+    complete = len(presses) == len(symbols)
+    silence_us = -1
+    held_dot_us = -1
+    if presses and not complete and not pressed:
+        silence_us = ticks_diff(rnd.end_us, presses[-1][1])
+    last_ends_letter = bool(presses) and symbols[len(presses) - 1][1]
+    if pressed and not complete:
+        # the early wrong check sees the press being held: the gap before it was taken by then,
+        # and a dot is wrong once held past the short click threshold
+        if presses:
+            (letter_gaps if last_ends_letter else in_letter_gaps).append(ticks_diff(held_start_us, presses[-1][1]))
+        if not symbols[len(presses)][0]:
+            held_dot_us = ticks_diff(rnd.end_us, held_start_us)
+    return dots, dashes, in_letter_gaps, letter_gaps, silence_us, last_ends_letter, complete, held_dot_us
+
+
+def round_box(timings):
+    # (short lo, short hi, space lo, space hi, timeout lo) in us, a threshold x is inside when
+    # lo <= x < hi (timeout has no upper bound)
+    dots, dashes, in_letter_gaps, letter_gaps, silence_us, last_ends_letter, complete, held_dot_us = timings
+    space_lo = max(in_letter_gaps, default=0)
+    timeout_lo = max(max(in_letter_gaps, default=0), max(letter_gaps, default=0))
+    if silence_us >= 0:
+        # the silence until the recorded round ended must not end it under the new thresholds
+        timeout_lo = max(timeout_lo, silence_us)
+        if not last_ends_letter:
+            space_lo = max(space_lo, silence_us)
+    return (max(max(dots, default=0), held_dot_us), min(dashes, default=INF_US), space_lo,
+            min(letter_gaps, default=INF_US), timeout_lo)
+
+
+def le_count(values, grid):
+    # how many values are <= every grid point
+    return np.searchsorted(np.sort(values), grid, 'right')
+
+
+def element_rates(timings, short_grid, space_grid, timeout_grid):
+    # per grid point of each axis, the share of single presses / gaps that come out as meant
+    dots = np.array([d for t in timings for d in t[0]], dtype=np.int64)
+    dashes = np.array([d for t in timings for d in t[1]], dtype=np.int64)
+    in_letter = np.array([g for t in timings for g in t[2]], dtype=np.int64)
+    letter = np.array([g for t in timings for g in t[3]], dtype=np.int64)
+    gaps = np.concatenate((in_letter, letter))
+    presses_right = le_count(dots, short_grid) + len(dashes) - le_count(dashes, short_grid)
+    gaps_right = le_count(in_letter, space_grid) + len(letter) - le_count(letter, space_grid)
+    return (presses_right / max(1, len(dots) + len(dashes)), gaps_right / max(1, len(gaps)),
+            le_count(gaps, timeout_grid) / max(1, len(gaps)))
+
+
+def count_boxes(boxes, weights, short_grid, space_grid, timeout_grid):
+    # how many of the weighted boxes every (short, space, timeout) grid point is inside
+    def index_range(lo, hi, grid):
+        return np.searchsorted(grid, lo, 'left'), np.searchsorted(grid, hi, 'left')
+
+    s0, s1 = index_range(boxes[:, 0], boxes[:, 1], short_grid)
+    p0, p1 = index_range(boxes[:, 2], boxes[:, 3], space_grid)
+    t0 = np.searchsorted(timeout_grid, boxes[:, 4], 'left')
+    t1 = np.full_like(t0, len(timeout_grid))
+    keep = (s0 < s1) & (p0 < p1) & (t0 < t1) & (weights != 0)
+    s0, s1, p0, p1, t0, t1, w = s0[keep], s1[keep], p0[keep], p1[keep], t0[keep], t1[keep], weights[keep]
+
+    diff = np.zeros((len(short_grid) + 1, len(space_grid) + 1, len(timeout_grid) + 1), dtype=np.int32)
+    for s, p, t, sign in ((s0, p0, t0, 1), (s1, p0, t0, -1), (s0, p1, t0, -1), (s0, p0, t1, -1),
+                          (s1, p1, t0, 1), (s1, p0, t1, 1), (s0, p1, t1, 1), (s1, p1, t1, -1)):
+        np.add.at(diff, (s, p, t), sign * w)
+    return diff.cumsum(0).cumsum(1).cumsum(2)[:-1, :-1, :-1]
+
+
+def middle_of_best(rates):
+    best = np.flatnonzero(rates == rates.max())
+    return best[len(best) // 2]
+
+
+def first_within(rates, tolerance):
+    return np.flatnonzero(rates >= rates.max() - tolerance)[0]
+
+
+def load_rounds(paths):
+    # {difficulty: [(game, round, code)]} of every round that ended in the traces
+    from input_trace import read_trace
+    from morse_code import translate_to_morse
+    from settings import MENU_ITEM_OPEN
+    import replay
+
+    rounds = {}
+    for path in paths:
+        for game in read_trace(path):
+            difficulty = replay.DIFFICULTY_ITEMS[game.difficulty]
+            if difficulty == MENU_ITEM_OPEN:
+                continue  # no code to key known up front, any word of the trie counts
+            for rnd in game.rounds:
+                if rnd.outcome >= 0 and not rnd.lost:
+                    rounds.setdefault(difficulty, []).append((game, rnd, translate_to_morse(rnd.word)))
+    return rounds
+
+
+def inside_boxes(boxes, short_us, space_us, timeout_us):
+    # which boxes a single threshold combination is inside
+    return ((boxes[:, 0] <= short_us) & (short_us < boxes[:, 1]) & (boxes[:, 2] <= space_us)
+            & (space_us < boxes[:, 3]) & (boxes[:, 4] <= timeout_us))
+
+
+def check_against_replay(difficulty, rounds, inside, complete, engine, replay):
+    # at the game's own thresholds the boxes have to give the outcomes of replaying the rounds
+    thresholds = engine.keying_thresholds(difficulty)
+    mismatches = 0
+    for i, (_, rnd, _) in enumerate(rounds):
+        ge = engine.GameEngine(difficulty, record_stats=False, adaptive_keying=False)
+        outcome = replay.replay_round(ge, rnd, thresholds).outcome
+        if not inside[i]:
+            model = engine.OUTCOME_WRONG
+        elif complete[i]:
+            model = engine.OUTCOME_COMPLETE
+        else:
+            model = engine.OUTCOME_TIME_UP
+        if model != outcome:
+            mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='tune the keying thresholds on recorded traces')
+    parser.add_argument('traces', nargs='+')
+    parser.add_argument('--short-ms', type=parse_range, default='100:700:5', help='lo:hi:step')
+    parser.add_argument('--space-ms', type=parse_range, default='150:1500:5', help='lo:hi:step')
+    parser.add_argument('--timeout-ms', type=parse_range, default='300:3000:10', help='lo:hi:step')
+    parser.add_argument('--tolerance', type=float, default=0.005, help='accuracy given up for quicker thresholds')
+    parser.add_argument('--check', action='store_true', help='compare with a replay at the current thresholds')
+    parser.add_argument('--csv', help='write the accuracy/latency curves here')
+    args = parser.parse_args()
+
+    # the game modules want micropython's time and const
+    sim.install()
+    import engine
+    import replay
+    from button_input import EDGE_PRESS
+
+    short_grid = args.short_ms * 1000
+    space_grid = args.space_ms * 1000
+    timeout_grid = args.timeout_ms * 1000
+    configs = len(short_grid) * len(space_grid) * len(timeout_grid)
+    curves = []
+
+    for difficulty, rounds in sorted(load_rounds(args.traces).items()):
+        timings = [round_timings(rnd, code, EDGE_PRESS) for _, rnd, code in rounds]
+        complete = np.array([t[6] for t in timings])
+        boxes = np.array([round_box(t) for t in timings], dtype=np.int64)
+
+        start = time.perf_counter()
+        right = count_boxes(boxes, complete.astype(np.int32), short_grid, space_grid, timeout_grid)
+        undecided = count_boxes(boxes, (~complete).astype(np.int32), short_grid, space_grid, timeout_grid)
+        elapsed = time.perf_counter() - start
+        press_rate, gap_rate, no_stall_rate = element_rates(timings, short_grid, space_grid, timeout_grid)
+
+        print('{}: {} rounds, {} threshold combinations in {:.2f} s ({:.1f} M/s)'.format(
+            difficulty, len(rounds), configs, elapsed, configs / elapsed / 1e6))
+
+        def report(name, short_ms, space_ms, timeout_ms, rounds_right, rounds_undecided):
+            print('  {:<8} short {} space {} timeout {} ms: {:.1%} rounds right, {:.1%} undecided'.format(
+                name, short_ms, space_ms, timeout_ms, rounds_right / len(rounds), rounds_undecided / len(rounds)))
+
+        current_ms = engine.keying_thresholds(difficulty)
+        inside = inside_boxes(boxes, *(ms * 1000 for ms in current_ms))
+        report('current', *current_ms, int((inside & complete).sum()), int((inside & ~complete).sum()))
+        if args.check:
+            mismatches = check_against_replay(difficulty, rounds, inside, complete, engine, replay)
+            print('  check against replay: {} of {} rounds differ'.format(mismatches, len(rounds)))
+        s = middle_of_best(press_rate)
+        p = first_within(gap_rate, args.tolerance)
+        t = first_within(no_stall_rate, args.tolerance)
+        report('proposed', args.short_ms[s], args.space_ms[p], args.timeout_ms[t], right[s, p, t], undecided[s, p, t])
+        print('  presses as meant {:.1%}, gaps as meant {:.1%}, gaps cut off {:.1%}'.format(
+            press_rate[s], gap_rate[p], 1 - no_stall_rate[t]))
+        best = np.unravel_index(right.argmax(), right.shape)
+        report('most', *(grid[i] for grid, i in zip((args.short_ms, args.space_ms, args.timeout_ms), best)),
+               right[best], undecided[best])
+
+        # letter latency: how long after a letter the game takes it, stall latency: how long a
+        # stopped sequence keeps the player waiting. rounds right is a lower bound, see above
+        by_space = right.max(axis=(0, 2)) / len(rounds)
+        by_timeout = right.max(axis=(0, 1)) / len(rounds)
+        print('  space threshold (letter latency): gaps as meant, most rounds right')
+        for i in range(0, len(space_grid), max(1, len(space_grid) // 12)):
+            print('    {:>5} ms {:6.1%} {:6.1%}'.format(args.space_ms[i], gap_rate[i], by_space[i]))
+        print('  sequence end threshold (stall latency): gaps cut off, most rounds right')
+        for i in range(0, len(timeout_grid), max(1, len(timeout_grid) // 12)):
+            print('    {:>5} ms {:6.1%} {:6.1%}'.format(args.timeout_ms[i], 1 - no_stall_rate[i], by_timeout[i]))
+        curves.extend((difficulty, 'short', ms, rate, r) for ms, rate, r in
+                      zip(args.short_ms, press_rate, right.max(axis=(1, 2)) / len(rounds)))
+        curves.extend((difficulty, 'space', ms, rate, r) for ms, rate, r in zip(args.space_ms, gap_rate, by_space))
+        curves.extend((difficulty, 'timeout', ms, rate, r) for ms, rate, r in
+                      zip(args.timeout_ms, no_stall_rate, by_timeout))
+
+    if args.csv:
+        with open(args.csv, 'w') as f:
+            # element_rate: presses / gaps classified as meant, or for timeout gaps not cut off
+            f.write('difficulty,threshold,ms,element_rate,rounds_right\n')
+            for row in curves:
+                f.write('{},{},{},{:.5f},{:.5f}\n'.format(*row))
+    sim.uninstall()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import random
+import struct
+from array import array
+
+# on-flash word dictionary, little endian:
+#   header      : magic, group count, reserved
+#   group table : one fixed-width entry per (difficulty, word length) group
+#   blob        : the words of every group packed back to back without separators
+# all the words of a group have the same length, so word i of a group starts at
+# group_offset + i * word_length - picking a word is one seek and one small read
+WORD_DICT_MAGIC = b'MWD1'
+WORD_DICT_HEADER_FORMAT = '<4sHH'
+WORD_DICT_GROUP_FORMAT = '<BBHI'  # difficulty, word length, word count, blob offset
+WORD_DICT_HEADER_SIZE = struct.calcsize(WORD_DICT_HEADER_FORMAT)
+WORD_DICT_GROUP_SIZE = struct.calcsize(WORD_DICT_GROUP_FORMAT)
+WORD_DICT_MAX_GROUP_WORDS = 0xFFFF
+
+DIFFICULTY_EASY = 0
+DIFFICULTY_HARD = 1
+DIFFICULTY_OPEN = 2  # no words of its own, only its stats
+
+
+class WordDictError(Exception):
+    pass
+
+
+def write_word_dict(f, words_by_difficulty):
+    # words_by_difficulty: {difficulty: iterable of ascii words}
+    groups = {}
+    for difficulty in sorted(words_by_difficulty):
+        for word in words_by_difficulty[difficulty]:
+            groups.setdefault((difficulty, len(word)), []).append(word.encode())
+
+    keys = []
+    for key in sorted(groups):
+        # a group holding more words than its count field allows is split in chunks
+        words = groups[key]
+        for i in range(0, len(words), WORD_DICT_MAX_GROUP_WORDS):
+            keys.append((key, words[i:i + WORD_DICT_MAX_GROUP_WORDS]))
+
+    f.write(struct.pack(WORD_DICT_HEADER_FORMAT, WORD_DICT_MAGIC, len(keys), 0))
+    offset = WORD_DICT_HEADER_SIZE + len(keys) * WORD_DICT_GROUP_SIZE
+    for (difficulty, length), words in keys:
+        f.write(struct.pack(WORD_DICT_GROUP_FORMAT, difficulty, length, len(words), offset))
+        offset += length * len(words)
+    for _, words in keys:
+        f.write(b''.join(words))
+
+
+class WordDict:
+    # only the group table is held in ram, the words stay on flash
+
+    def __init__(self, filename):
+        self.f = open(filename, 'rb')
+        magic, group_count, _ = struct.unpack(WORD_DICT_HEADER_FORMAT, self.f.read(WORD_DICT_HEADER_SIZE))
+        if magic != WORD_DICT_MAGIC:
+            self.f.close()
+            raise WordDictError('not a word dictionary: ' + filename)
+
+        self.difficulties = bytearray(group_count)
+        self.lengths = bytearray(group_count)
+        self.counts = array('H', [0] * group_count)
+        self.offsets = array('I', [0] * group_count)
+        self.totals = {}
+        table = self.f.read(group_count * WORD_DICT_GROUP_SIZE)
+        for i in range(group_count):
+            difficulty, length, count, offset = struct.unpack_from(WORD_DICT_GROUP_FORMAT, table,
+                                                                   i * WORD_DICT_GROUP_SIZE)
+            self.difficulties[i] = difficulty
+            self.lengths[i] = length
+            self.counts[i] = count
+            self.offsets[i] = offset
+            self.totals[difficulty] = self.totals.get(difficulty, 0) + count
+
+    def count(self, difficulty):
+        return self.totals.get(difficulty, 0)
+
+    def word_at(self, difficulty, idx):
+        for i in range(len(self.counts)):
+            if self.difficulties[i] != difficulty:
+                continue
+            if idx < self.counts[i]:
+                length = self.lengths[i]
+                self.f.seek(self.offsets[i] + idx * length)
+                return self.f.read(length).decode()
+            idx -= self.counts[i]
+        raise IndexError('word index out of range')
+
+    def random_word(self, difficulty):
+        # uniform over every word of the difficulty, whatever its length group
+        return self.word_at(difficulty, random.randrange(self.count(difficulty)))
+
+    def close(self):
+        self.f.close()
@@ -0,0 +1,116 @@
+import random
+from array import array
+
+from stats_store import STATS_LETTERS, letter_index
+
+# a letter's weight grows with its (smoothed) error rate, a mastered letter keeps the base weight
+# so it still comes up now and then
+LETTER_BASE_WEIGHT = 8
+LETTER_ERROR_WEIGHT = 256
+LETTER_MAX_WEIGHT = LETTER_BASE_WEIGHT + LETTER_ERROR_WEIGHT
+
+
+def letter_weight(hits, misses):
+    return LETTER_BASE_WEIGHT + LETTER_ERROR_WEIGHT * (misses + 1) // (hits + misses + 2)
+
+
+def letter_weights(hits, misses):
+    return array('I', [letter_weight(hits[i], misses[i]) for i in range(STATS_LETTERS)])
+
+
+def distinct_letters(word):
+    letters = []
+    mask = 0
+    for ch in word:
+        letter = letter_index(ch)
+        if letter >= 0 and not mask & (1 << letter):
+            mask |= 1 << letter
+            letters.append(letter)
+    return letters
+
+
+class FenwickTree:
+    # prefix sums over non-negative integer weights with O(log n) updates and sampling
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = array('I', [0] * (size + 1))
+        self.weights = array('I', [0] * size)
+        self.total = 0
+        self.top_bit = 1
+        while self.top_bit * 2 <= size:
+            self.top_bit *= 2
+
+    def set(self, idx, weight):
+        delta = weight - self.weights[idx]
+        self.weights[idx] = weight
+        self.total += delta
+        i = idx + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, value):
+        # index whose prefix range holds value, 0 <= value < total
+        pos = 0
+        bit = self.top_bit
+        while bit:
+            nxt = pos + bit
+            if nxt <= self.size and self.tree[nxt] <= value:
+                pos = nxt
+                value -= self.tree[nxt]
+            bit >>= 1
+        return pos
+
+
+class AdaptiveSampler:
+    # picks a word with probability proportional to the summed weights of its distinct letters,
+    # in two stages: a letter weighted by its weight times the number of words containing it,
+    # then a uniform word of that letter's posting list. a letter's weight change is one tree
+    # update, whatever the size of the bank
+
+    def __init__(self, words, weights):
+        self.weights = weights  # shared, updated by the caller before update_letter()
+        counts = array('I', [0] * STATS_LETTERS)
+        for word in words:
+            for letter in distinct_letters(word):
+                counts[letter] += 1
+
+        # every letter's posting list is a slice of one flat array
+        self.offsets = array('I', [0] * (STATS_LETTERS + 1))
+        for letter in range(STATS_LETTERS):
+            self.offsets[letter + 1] = self.offsets[letter] + counts[letter]
+        self.postings = array('H' if len(words) <= 0xFFFF else 'I', [0] * self.offsets[STATS_LETTERS])
+        fill = array('I', self.offsets)
+        for idx in range(len(words)):
+            for letter in distinct_letters(words[idx]):
+                self.postings[fill[letter]] = idx
+                fill[letter] += 1
+
+        self.tree = FenwickTree(STATS_LETTERS)
+        for letter in range(STATS_LETTERS):
+            self.update_letter(letter)
+
+    def update_letter(self, letter):
+        self.tree.set(letter, self.weights[letter] * (self.offsets[letter + 1] - self.offsets[letter]))
+
+    def sample(self):
+        # -1 if no word has a letter
+        if self.tree.total == 0:
+            return -1
+        letter = self.tree.find(random.randrange(self.tree.total))
+        start = self.offsets[letter]
+        return self.postings[start + random.randrange(self.offsets[letter + 1] - start)]
+
+
+def accept_word(word, weights):
+    # rejection step for words drawn uniformly from a source too big to index (the on-flash
+    # dictionary): accepted with the mean weight of its distinct letters over the largest weight
+    total = 0
+    count = 0
+    for letter in distinct_letters(word):
+        total += weights[letter]
+        count += 1
+    if count == 0:
+        return True
+    return random.randrange(count * LETTER_MAX_WEIGHT) < total
@@ -0,0 +1,21 @@
+# the built in word banks, kept apart from the code so they can be frozen into the firmware
+#TODO add tons of words here
+EASY_WORDS = ("zap", "zip", "PTK", "jog", "CPU", "JER", "guy", "wax", "fox", "joe", "seq", "jay", "jig", "job",
+              "fab", "bow", "tax", "use", "IDC", "man", "reg", "eps", "csr", "bug", "dev", "val", "ant", "bat",
+              "bed", "can", "cup", "day", "dog", "eat", "eye", "fly", "god", "hat", "hip", "hit", "hue", "ink",
+              "jar", "key", "law", "lie", "mix", "mud", "nap", "nut", "oil", "old", "owe", "own", "pie", "pig",
+              "pin", "pot", "put", "red", "saw", "sea", "set", "sew", "she", "sit", "six", "sky", "son", "sun",
+              "tie", "tin", "ace", "ago", "aid", "air", "all", "and", "arc", "arm", "art", "ask", "axe", "bad",
+              "bay", "big", "bin", "bit", "box", "boy", "bus", "buy", "cab", "cap", "car", "cat", "cry", "cub",
+              "cut", "dad", "dam", "den", "did", "dig", "doe", "dug", "ear", "elf", "end", "eve", "far", "fat",
+              "few", "fix", "foe", "fog", "for", "fun")
+
+HARD_WORDS = ("hello", "intel", "collect", "world", "forward", "option", "songs", "other", "system", "wifi", "point",
+              "resume", "both", "support", "blue", "badge", "make", "menu", "morse", "game", "about", "after",
+              "again", "basic", "better", "could", "every", "first", "found", "great", "human", "known", "large",
+              "learn", "never", "plant", "power", "quite", "ready", "really", "seems", "small", "sound", "space",
+              "speak", "still", "study", "terms", "their", "think", "those", "three", "tools", "which", "whole",
+              "young", "yours", "cause", "color", "doubt", "early", "enjoy", "exist", "force", "fresh", "glass",
+              "grant", "happy", "heard", "horse", "house", "humor", "image", "issue", "lunch", "maybe", "merry",
+              "night", "noise", "offer", "often", "paint", "peace", "place", "price", "teach", "thank", "touch",
+              "train", "value", "visit", "watch", "white", "woman")